@@ -4,17 +4,19 @@ Defines REST API endpoints for LawBot
 """
 
 from fastapi import APIRouter, HTTPException, Depends
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import List, Dict, Any, Optional
+import json
 import logging
 from backend.services.lawbot_service import LawBotService
+from backend.services.registry import get_lawbot_service
+from config.settings import DEADLINE_CONFIG
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
-# Global service instance
-lawbot_service = LawBotService()
-
 # Pydantic models
 class ChatRequest(BaseModel):
     query: str
@@ -25,10 +27,13 @@ class ChatResponse(BaseModel):
     citations: List[str]
     tools_used: List[Dict[str, Any]]
     confidence: str
+    prompt_tokens: Optional[int] = None
+    faq_match: Optional[Dict[str, Any]] = None
     error: Optional[str] = None
 
 class HealthResponse(BaseModel):
     status: str
+    ready: Dict[str, bool]
     components: Dict[str, Any]
 
 class ToolLookupRequest(BaseModel):
@@ -36,9 +41,11 @@ class ToolLookupRequest(BaseModel):
     query: str
     parameters: Optional[Dict[str, Any]] = None
 
-# Dependency to get service
-def get_lawbot_service():
-    return lawbot_service
+class DeadlineRequest(BaseModel):
+    start_dates: List[str]
+    periods: List[int]
+    unit: str = "days"
+    court: Optional[str] = None
 
 @router.post("/chat", response_model=ChatResponse)
 async def chat_with_lawbot(
@@ -47,12 +54,26 @@ async def chat_with_lawbot(
 ):
     """Chat with LawBot - main endpoint"""
     try:
-        result = service.chat(request.query, request.conversation_history)
+        # Run off the event loop so other requests are served during generation
+        result = await run_in_threadpool(service.chat, request.query, request.conversation_history)
         return ChatResponse(**result)
     except Exception as e:
         logger.error(f"Chat error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/chat/stream")
+async def chat_with_lawbot_stream(
+    request: ChatRequest,
+    service: LawBotService = Depends(get_lawbot_service)
+):
+    """Chat with LawBot - streams newline-delimited JSON events as tokens are generated"""
+    def event_stream():
+        for event in service.chat_stream(request.query, request.conversation_history):
+            yield json.dumps(event, ensure_ascii=False) + "\n"
+    
+    # Sync iterators are consumed in a threadpool, keeping the event loop free
+    return StreamingResponse(event_stream(), media_type="application/x-ndjson")
+
 @router.get("/health", response_model=HealthResponse)
 async def health_check(service: LawBotService = Depends(get_lawbot_service)):
     """Health check endpoint"""
@@ -60,6 +81,7 @@ async def health_check(service: LawBotService = Depends(get_lawbot_service)):
         status = service.get_system_status()
         return HealthResponse(
             status="healthy" if status["is_initialized"] else "degraded",
+            ready=status["components_ready"],
             components=status
         )
     except Exception as e:
@@ -94,9 +116,15 @@ async def lookup_tool(
         elif request.tool_type == "date_calculator":
             days = request.parameters.get("days", 30) if request.parameters else 30
             start_date = request.parameters.get("start_date") if request.parameters else None
-            result = tools_manager.calculate_deadline(days, start_date)
+            court = request.parameters.get("court") if request.parameters else None
+            unit = request.parameters.get("unit", "days") if request.parameters else "days"
+            result = tools_manager.calculate_deadline(days, start_date, court, unit)
         elif request.tool_type == "case_lookup":
-            result = tools_manager.lookup_legal_case(request.query)
+            references = request.parameters.get("references") if request.parameters else None
+            if references:
+                result = {"results": await tools_manager.lookup_legal_cases_async(references)}
+            else:
+                result = await tools_manager.lookup_legal_case_async(request.query)
         else:
             raise HTTPException(status_code=400, detail=f"Unknown tool type: {request.tool_type}")
         
@@ -106,6 +134,24 @@ async def lookup_tool(
         logger.error(f"Tool lookup error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/tools/deadlines")
+async def calculate_deadlines(
+    request: DeadlineRequest,
+    service: LawBotService = Depends(get_lawbot_service)
+):
+    """Batch limitation deadlines over a court's holiday calendar"""
+    count = max(len(request.start_dates), len(request.periods))
+    if count > DEADLINE_CONFIG["max_batch"]:
+        raise HTTPException(status_code=400, detail=f"At most {DEADLINE_CONFIG['max_batch']} deadlines per request")
+    
+    result = await run_in_threadpool(
+        service.tools_manager.calculate_deadlines,
+        request.start_dates, request.periods, request.unit, request.court
+    )
+    if not result["success"]:
+        raise HTTPException(status_code=400, detail=result["error"])
+    return result
+
 @router.get("/tools/info")
 async def get_tools_info(service: LawBotService = Depends(get_lawbot_service)):
     """Get available tools information"""
@@ -0,0 +1,360 @@
+"""
+LawBot Continuous Batching Scheduler
+Batches concurrent generation requests and admits new ones as slots free up
+"""
+
+import queue
+import threading
+import time
+import logging
+from concurrent.futures import Future
+from typing import List, Dict, Any
+
+import torch
+
+logger = logging.getLogger(__name__)
+
+class GenerationRequest:
+    """A single prompt waiting for (or undergoing) generation"""
+
+    def __init__(self, input_ids: List[int], max_new_tokens: int, stream: bool = False, prefix=None):
+        self.input_ids = input_ids
+        self.prefix = prefix
+        self.max_new_tokens = max_new_tokens
+        self.generated: List[int] = []
+        self.future = Future()
+        self.tokens = queue.Queue() if stream else None
+        self.cancelled = threading.Event()
+        self.enqueued_at = time.perf_counter()
+
+    def cancel(self):
+        """Drop this request from the running batch at the next step"""
+        self.cancelled.set()
+
+def to_legacy_cache(past_key_values):
+    """Normalize a model cache into a tuple of (key, value) per layer"""
+    if hasattr(past_key_values, "to_legacy_cache"):
+        return past_key_values.to_legacy_cache()
+    if hasattr(past_key_values, "layers"):
+        # transformers 5: iterating the cache yields (keys, values, sliding_window) per layer
+        return tuple((layer.keys, layer.values) for layer in past_key_values.layers)
+    return tuple(past_key_values)
+
+def from_legacy_cache(cache):
+    """Convert a legacy tuple cache into whatever the installed transformers expects"""
+    try:
+        from transformers import DynamicCache
+    except ImportError:
+        return cache
+    if hasattr(DynamicCache, "from_legacy_cache"):
+        return DynamicCache.from_legacy_cache(cache)
+    # transformers 5 dropped from_legacy_cache; the constructor takes the layer tuples
+    return DynamicCache(cache)
+
+def _select_rows(cache, attention_mask: torch.Tensor, next_tokens: torch.Tensor, keep: List[int]):
+    """Keep only the given batch rows and drop columns that are padding for all of them"""
+    index = torch.tensor(keep, dtype=torch.long, device=attention_mask.device)
+    attention_mask = attention_mask.index_select(0, index)
+    next_tokens = next_tokens.index_select(0, index)
+    cache = tuple((k.index_select(0, index), v.index_select(0, index)) for k, v in cache)
+
+    first_used = int(attention_mask.any(dim=0).nonzero()[0])
+    if first_used > 0:
+        attention_mask = attention_mask[:, first_used:]
+        cache = tuple((k[:, :, first_used:], v[:, :, first_used:]) for k, v in cache)
+
+    return cache, attention_mask, next_tokens
+
+class ContinuousBatchScheduler:
+    """
+    Runs a manual decode loop over a dynamic batch.
+
+    Pending prompts are prefilled together with left padding, merged into the
+    running batch's KV cache, and decoded one token per step. Rows leave the
+    batch independently on EOS or max_new_tokens, and their slots are given
+    to the next queued requests without waiting for the batch to drain.
+    """
+
+    def __init__(self, model, tokenizer, device: str, max_batch_size: int = 8,
+                 max_wait_ms: float = 10, temperature: float = 0.7, top_p: float = 0.9,
+                 prefix_cache=None):
+        self.model = model
+        self.prefix_cache = prefix_cache
+        self.tokenizer = tokenizer
+        self.device = device
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.temperature = temperature
+        self.top_p = top_p
+        self.eos_token_id = tokenizer.eos_token_id
+        self.pad_token_id = tokenizer.pad_token_id if tokenizer.pad_token_id is not None else tokenizer.eos_token_id
+
+        self._pending = queue.Queue()
+        self._thread = None
+        self._stop = threading.Event()
+
+        # Running batch state, row-aligned with self._active
+        self._active: List[GenerationRequest] = []
+        self._cache = None
+        self._attention_mask = None
+        self._next_tokens = None
+
+        self.stats = {
+            "requests": 0,
+            "prefill_batches": 0,
+            "decode_steps": 0,
+            "decoded_rows": 0,
+            "max_active": 0,
+        }
+
+    def start(self):
+        """Start the scheduler thread"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="lawbot-batch-scheduler", daemon=True)
+        self._thread.start()
+        logger.info(f"Continuous batching scheduler started (max_batch_size={self.max_batch_size})")
+
+    def stop(self):
+        """Stop the scheduler thread"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def submit(self, input_ids: List[int], max_new_tokens: int, stream: bool = False,
+               prefix=None) -> GenerationRequest:
+        """Queue a tokenized prompt for generation, optionally starting from a cached prefix"""
+        self.start()
+        request = GenerationRequest(input_ids, max_new_tokens, stream, prefix)
+        self._pending.put(request)
+        self.stats["requests"] += 1
+        return request
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Scheduler counters for status reporting"""
+        steps = self.stats["decode_steps"]
+        return {
+            **self.stats,
+            "active": len(self._active),
+            "queued": self._pending.qsize(),
+            "avg_batch_size": round(self.stats["decoded_rows"] / steps, 2) if steps else 0.0,
+            "max_batch_size": self.max_batch_size,
+        }
+
+    def _run(self):
+        while not self._stop.is_set():
+            new_requests = self._collect_new_requests()
+            try:
+                if new_requests:
+                    self._prefill(new_requests)
+                if self._active:
+                    self._decode_step()
+            except Exception as e:
+                logger.error(f"Batch generation failed: {e}")
+                self._fail_all(new_requests, e)
+
+    def _collect_new_requests(self) -> List[GenerationRequest]:
+        """Take queued requests for the free slots in the batch"""
+        free_slots = self.max_batch_size - len(self._active)
+        requests = []
+        if free_slots <= 0:
+            return requests
+
+        if not self._active:
+            # Idle: block for the first request, then wait briefly so concurrent arrivals share a prefill
+            try:
+                requests.append(self._pending.get(timeout=0.5))
+            except queue.Empty:
+                return requests
+            deadline = time.perf_counter() + self.max_wait
+            while len(requests) < free_slots:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    requests.append(self._pending.get(timeout=remaining))
+                except queue.Empty:
+                    break
+        else:
+            # Busy: never stall running rows, just admit whatever is already waiting
+            while len(requests) < free_slots:
+                try:
+                    requests.append(self._pending.get_nowait())
+                except queue.Empty:
+                    break
+
+        live = []
+        for request in requests:
+            if request.cancelled.is_set():
+                self._finish(request)
+            else:
+                live.append(request)
+        return live
+
+    def _prefill(self, requests: List[GenerationRequest]):
+        """Prefill new prompts, one forward pass per shared prefix"""
+        groups: Dict[Any, List[GenerationRequest]] = {}
+        for request in requests:
+            groups.setdefault(request.prefix.key if request.prefix else None, []).append(request)
+        for group in groups.values():
+            self._prefill_group(group)
+
+    def _prefill_group(self, requests: List[GenerationRequest]):
+        """Encode prompts together and merge them into the running batch"""
+        prefix = requests[0].prefix
+        prefix_len = prefix.length if prefix else 0
+
+        # Left-pad the uncached part; padding between prefix and prompt is masked out
+        max_len = max(len(r.input_ids) - prefix_len for r in requests)
+        input_ids = torch.full((len(requests), max_len), self.pad_token_id, dtype=torch.long)
+        attention_mask = torch.zeros((len(requests), prefix_len + max_len), dtype=torch.long)
+        attention_mask[:, :prefix_len] = 1
+        for row, request in enumerate(requests):
+            suffix = request.input_ids[prefix_len:]
+            input_ids[row, max_len - len(suffix):] = torch.tensor(suffix, dtype=torch.long)
+            attention_mask[row, prefix_len + max_len - len(suffix):] = 1
+
+        input_ids = input_ids.to(self.device)
+        attention_mask = attention_mask.to(self.device)
+        position_ids = (attention_mask.cumsum(-1) - 1).clamp(min=0)[:, prefix_len:]
+
+        past_key_values = None
+        if prefix is not None:
+            rows = len(requests)
+            past_key_values = from_legacy_cache(tuple(
+                (k.expand(rows, -1, -1, -1), v.expand(rows, -1, -1, -1)) for k, v in prefix.past_key_values
+            ))
+            if self.prefix_cache is not None:
+                self.prefix_cache.record_hit(prefix, rows)
+
+        with torch.no_grad():
+            outputs = self.model(
+                input_ids=input_ids,
+                attention_mask=attention_mask,
+                position_ids=position_ids,
+                past_key_values=past_key_values,
+                use_cache=True,
+            )
+
+        next_tokens = self._sample(outputs.logits[:, -1, :])
+        self.stats["prefill_batches"] += 1
+
+        keep = [row for row, (request, token) in enumerate(zip(requests, next_tokens.tolist()))
+                if not self._accept(request, token)]
+        if not keep:
+            return
+
+        cache, attention_mask, next_tokens = _select_rows(
+            to_legacy_cache(outputs.past_key_values), attention_mask, next_tokens, keep
+        )
+        self._merge([requests[row] for row in keep], cache, attention_mask, next_tokens)
+        self.stats["max_active"] = max(self.stats["max_active"], len(self._active))
+
+    def _decode_step(self):
+        """Feed every row its last sampled token and sample the next one"""
+        ones = torch.ones((len(self._active), 1), dtype=self._attention_mask.dtype, device=self._attention_mask.device)
+        self._attention_mask = torch.cat([self._attention_mask, ones], dim=1)
+        position_ids = self._attention_mask.sum(-1, keepdim=True) - 1
+
+        with torch.no_grad():
+            outputs = self.model(
+                input_ids=self._next_tokens.unsqueeze(-1),
+                attention_mask=self._attention_mask,
+                position_ids=position_ids,
+                past_key_values=from_legacy_cache(self._cache),
+                use_cache=True,
+            )
+
+        self._cache = to_legacy_cache(outputs.past_key_values)
+        self._next_tokens = self._sample(outputs.logits[:, -1, :])
+        self.stats["decode_steps"] += 1
+        self.stats["decoded_rows"] += len(self._active)
+
+        keep = [row for row, (request, token) in enumerate(zip(self._active, self._next_tokens.tolist()))
+                if not self._accept(request, token)]
+        if len(keep) == len(self._active):
+            return
+        if not keep:
+            self._reset()
+            return
+
+        self._active = [self._active[row] for row in keep]
+        self._cache, self._attention_mask, self._next_tokens = _select_rows(
+            self._cache, self._attention_mask, self._next_tokens, keep
+        )
+
+    def _merge(self, requests: List[GenerationRequest], cache, attention_mask: torch.Tensor,
+               next_tokens: torch.Tensor):
+        """Left-pad the running and new caches to a common length and stack them"""
+        if not self._active:
+            self._active = list(requests)
+            self._cache = cache
+            self._attention_mask = attention_mask
+            self._next_tokens = next_tokens
+            return
+
+        target_len = max(self._attention_mask.shape[1], attention_mask.shape[1])
+
+        def pad_left(tensor: torch.Tensor, dim: int) -> torch.Tensor:
+            missing = target_len - tensor.shape[dim]
+            if missing == 0:
+                return tensor
+            shape = list(tensor.shape)
+            shape[dim] = missing
+            return torch.cat([tensor.new_zeros(shape), tensor], dim=dim)
+
+        self._cache = tuple(
+            (
+                torch.cat([pad_left(old_k, 2), pad_left(new_k, 2)], dim=0),
+                torch.cat([pad_left(old_v, 2), pad_left(new_v, 2)], dim=0),
+            )
+            for (old_k, old_v), (new_k, new_v) in zip(self._cache, cache)
+        )
+        self._attention_mask = torch.cat([pad_left(self._attention_mask, 1), pad_left(attention_mask, 1)], dim=0)
+        self._next_tokens = torch.cat([self._next_tokens, next_tokens], dim=0)
+        self._active.extend(requests)
+
+    def _accept(self, request: GenerationRequest, token: int) -> bool:
+        """Record a sampled token; returns True once the request is finished"""
+        done = request.cancelled.is_set() or token == self.eos_token_id
+        if not done:
+            request.generated.append(token)
+            if request.tokens is not None:
+                request.tokens.put(token)
+            done = len(request.generated) >= request.max_new_tokens
+        if done:
+            self._finish(request)
+        return done
+
+    def _sample(self, logits: torch.Tensor) -> torch.Tensor:
+        """Temperature + nucleus sampling, one token per row"""
+        logits = logits.float() / max(self.temperature, 1e-5)
+        probs = torch.softmax(logits, dim=-1)
+        sorted_probs, sorted_idx = torch.sort(probs, descending=True, dim=-1)
+        cumulative = sorted_probs.cumsum(dim=-1)
+        # Keep the smallest prefix whose mass reaches top_p (always at least one token)
+        sorted_probs[(cumulative - sorted_probs) > self.top_p] = 0.0
+        choice = torch.multinomial(sorted_probs / sorted_probs.sum(dim=-1, keepdim=True), 1)
+        return sorted_idx.gather(-1, choice).squeeze(-1)
+
+    def _finish(self, request: GenerationRequest):
+        if not request.future.done():
+            request.future.set_result(request.generated)
+        if request.tokens is not None:
+            request.tokens.put(None)
+
+    def _fail_all(self, new_requests: List[GenerationRequest], error: Exception):
+        for request in set(self._active) | set(new_requests):
+            if not request.future.done():
+                request.future.set_exception(error)
+            if request.tokens is not None:
+                request.tokens.put(error)
+        self._reset()
+
+    def _reset(self):
+        self._active = []
+        self._cache = None
+        self._attention_mask = None
+        self._next_tokens = None
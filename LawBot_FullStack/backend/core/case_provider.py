@@ -0,0 +1,205 @@
+"""
+LawBot Case Provider Client
+Shared async HTTP client for a remote case-law search API (Indian Kanoon compatible)
+
+One pooled keep-alive client per event loop, a per-host concurrency limit,
+connect/read timeouts, a TTL cache of search results and single-flight
+coalescing: concurrent lookups of the same query share one upstream call.
+"""
+
+import re
+import time
+import asyncio
+import threading
+import logging
+from collections import OrderedDict, deque
+from typing import Any, Dict, List, Optional
+
+import httpx
+import numpy as np
+
+from backend.core.case_store import PARTIES_PATTERN
+from backend.core.response_cache import normalize_query
+
+logger = logging.getLogger(__name__)
+
+TAG_PATTERN = re.compile(r"<[^>]+>")
+DOCUMENT_URL = "https://indiankanoon.org/doc/{tid}/"
+
+class CaseProviderClient:
+    """Cached, coalescing search client; search() is async, peek()/prefetch() are safe from worker threads"""
+
+    def __init__(self, base_url: str, api_key: str = "", timeout: float = 5.0, connect_timeout: float = 2.0,
+                 max_connections: int = 20, max_keepalive: int = 10, per_host_limit: int = 8,
+                 cache_ttl: float = 3600, cache_size: int = 2048, max_results: int = 5,
+                 latency_window: int = 1000, transport: Optional[httpx.AsyncBaseTransport] = None):
+        self.base_url = base_url.rstrip("/")
+        self.api_key = api_key
+        self.timeout = httpx.Timeout(timeout, connect=connect_timeout)
+        self.limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_keepalive)
+        self.per_host_limit = per_host_limit
+        self.cache_ttl = cache_ttl
+        self.cache_size = cache_size
+        self.max_results = max_results
+        self.transport = transport
+
+        # httpx clients, semaphores and futures belong to the loop they were created on
+        self._client: Optional[httpx.AsyncClient] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._host_limits: Dict[str, asyncio.Semaphore] = {}
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+        self._cache: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=latency_window)
+        self.stats = {"lookups": 0, "cache_hits": 0, "coalesced": 0, "upstream_calls": 0,
+                      "errors": 0, "timeouts": 0}
+
+    def _http(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._loop is not loop:
+            headers = {"Accept": "application/json"}
+            if self.api_key:
+                headers["Authorization"] = f"Token {self.api_key}"
+            self._client = httpx.AsyncClient(base_url=self.base_url, headers=headers, timeout=self.timeout,
+                                             limits=self.limits, transport=self.transport)
+            self._loop = loop
+            self._host_limits = {}
+            self._inflight = {}
+        return self._client
+
+    def attach(self, loop: asyncio.AbstractEventLoop):
+        """Serve prefetch() on this loop before the first search() has run on it"""
+        if self._loop is not loop:
+            self._client = None
+            self._loop = loop
+
+    def peek(self, query: str) -> Optional[List[Dict[str, Any]]]:
+        """Cached results for a query, or None; never touches the network"""
+        key = normalize_query(query)
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                return None
+            expires, results = entry
+            if expires < time.monotonic():
+                del self._cache[key]
+                return None
+            self._cache.move_to_end(key)
+            return results
+
+    def _store(self, key: str, results: List[Dict[str, Any]]):
+        with self._lock:
+            self._cache[key] = (time.monotonic() + self.cache_ttl, results)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    async def search(self, query: str) -> List[Dict[str, Any]]:
+        """Cases matching a query; cached, and coalesced with identical lookups already in flight"""
+        key = normalize_query(query)
+        client = self._http()
+        with self._lock:
+            self.stats["lookups"] += 1
+        cached = self.peek(query)
+        if cached is not None:
+            with self._lock:
+                self.stats["cache_hits"] += 1
+            return cached
+
+        pending = self._inflight.get(key)
+        if pending is not None:
+            with self._lock:
+                self.stats["coalesced"] += 1
+            # A follower giving up must not cancel the shared call
+            return await asyncio.shield(pending)
+
+        future = asyncio.get_running_loop().create_future()
+        # Errors reach every follower; this keeps an unawaited one from being logged as lost
+        future.add_done_callback(lambda done: done.cancelled() or done.exception())
+        self._inflight[key] = future
+        try:
+            results = await self._fetch(client, query)
+            self._store(key, results)
+            future.set_result(results)
+            return results
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        except BaseException:
+            future.cancel()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+    async def _fetch(self, client: httpx.AsyncClient, query: str) -> List[Dict[str, Any]]:
+        host = client.base_url.host
+        limit = self._host_limits.setdefault(host, asyncio.Semaphore(self.per_host_limit))
+        async with limit:
+            started = time.perf_counter()
+            try:
+                response = await client.post("/search/", params={"formInput": query, "pagenum": 0})
+                response.raise_for_status()
+                data = response.json()
+            except httpx.TimeoutException:
+                with self._lock:
+                    self.stats["timeouts"] += 1
+                raise
+            except (httpx.HTTPError, ValueError):
+                with self._lock:
+                    self.stats["errors"] += 1
+                raise
+            finally:
+                with self._lock:
+                    self.stats["upstream_calls"] += 1
+                    self._latencies.append((time.perf_counter() - started) * 1000)
+        return [self._case(doc) for doc in data.get("docs", [])[:self.max_results]]
+
+    def _case(self, doc: Dict[str, Any]) -> Dict[str, Any]:
+        """Provider document -> the case shape CaseStore returns"""
+        title = TAG_PATTERN.sub("", doc.get("title", "")).strip()
+        parties = PARTIES_PATTERN.split(title, maxsplit=1)
+        return {
+            "title": title,
+            "petitioner": parties[0].strip() if len(parties) == 2 else None,
+            "respondent": parties[1].strip() if len(parties) == 2 else None,
+            "court": doc.get("docsource"),
+            "date": doc.get("publishdate"),
+            "citations": [doc["citation"]] if doc.get("citation") else [],
+            "headnote": TAG_PATTERN.sub("", doc.get("headline", "")).strip() or None,
+            "url": DOCUMENT_URL.format(tid=doc["tid"]) if doc.get("tid") else None,
+        }
+
+    def prefetch(self, query: str) -> bool:
+        """
+        Start a background lookup from a worker thread without waiting for it.
+
+        Only possible once the client is attached to (or has searched on)
+        the serving loop; returns whether a lookup was scheduled.
+        """
+        loop = self._loop
+        if loop is None or loop.is_closed() or self.peek(query) is not None:
+            return False
+        asyncio.run_coroutine_threadsafe(self._prefetch(query), loop)
+        return True
+
+    async def _prefetch(self, query: str):
+        try:
+            await self.search(query)
+        except Exception as e:
+            logger.debug(f"Case provider prefetch failed for '{query}': {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            latencies = np.array(self._latencies, dtype="float64")
+            stats = dict(self.stats)
+            stats["cached_queries"] = len(self._cache)
+        stats["upstream_ms_p50"] = round(float(np.percentile(latencies, 50)), 2) if len(latencies) else None
+        stats["upstream_ms_p99"] = round(float(np.percentile(latencies, 99)), 2) if len(latencies) else None
+        return stats
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            self._loop = None
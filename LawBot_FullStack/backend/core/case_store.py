@@ -0,0 +1,253 @@
+"""
+LawBot Case Store
+Offline case-law metadata (citations, parties, court, date, headnote) in SQLite
+
+Tables:
+    cases      id, title, petitioner, respondent, court, decided (ISO date), headnote, url, source
+    citations  normalized citation -> case id (a case is reported in several reporters), with the display form
+    cases_fts  FTS5 index over title, parties and headnote
+
+A reference is resolved by its citations first - "(1978) 1 SCC 248",
+"AIR 1978 SC 597" - which are normalized the same way on import and lookup,
+then by a full-text match on the case name.
+"""
+
+import re
+import sqlite3
+import threading
+from datetime import datetime
+from itertools import islice
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS cases (
+    id INTEGER PRIMARY KEY,
+    title TEXT NOT NULL,
+    petitioner TEXT,
+    respondent TEXT,
+    court TEXT,
+    decided TEXT,
+    headnote TEXT,
+    url TEXT,
+    source TEXT
+);
+CREATE TABLE IF NOT EXISTS citations (
+    citation TEXT NOT NULL,
+    case_id INTEGER NOT NULL,
+    display TEXT NOT NULL,
+    PRIMARY KEY (citation, case_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS citations_case ON citations (case_id);
+CREATE VIRTUAL TABLE IF NOT EXISTS cases_fts USING fts5(
+    title, petitioner, respondent, headnote, content='cases', content_rowid='id'
+);
+"""
+
+# Reported citations as they appear in queries and judgments
+CITATION_PATTERN = re.compile(
+    r"\bAIR\s+\d{4}\s+[A-Z][A-Za-z]*\.?\s+\d+\b"                          # AIR 1978 SC 597
+    r"|[\(\[]\d{4}[\)\]]\s*\d+\s+(?:SCC|SCR|SCALE)\s+(?:\(Cri\)\s+)?\d+\b"  # (1978) 1 SCC 248, [1978] 2 SCR 621
+    r"|\b\d{4}\s+SCC\s+OnLine\s+[A-Z][A-Za-z]*\s+\d+\b"                   # 2020 SCC OnLine SC 123
+    r"|\b\d{4}\s+INSC\s+\d+\b"                                            # 2023 INSC 45
+)
+PARTIES_PATTERN = re.compile(r"\s+(?:v\.?|vs\.?|versus)\s+", re.I)
+# Words in case names that say nothing about which case is meant
+NAME_STOPWORDS = frozenset("v vs versus and of the state union india ors anr others another case judgment".split())
+DATE_FORMATS = ("%Y-%m-%d", "%d-%m-%Y", "%d/%m/%Y", "%d.%m.%Y", "%d %B %Y", "%d %b %Y", "%B %d, %Y")
+
+def normalize_citation(citation: str) -> str:
+    """Case-, bracket- and punctuation-insensitive citation key ("(1978) 1 SCC 248" -> "1978 1 scc 248")"""
+    return " ".join(re.findall(r"[a-z0-9]+", citation.lower()))
+
+def extract_citations(text: str) -> List[str]:
+    """Reported citations in free text, in order of appearance"""
+    return [match.group(0) for match in CITATION_PATTERN.finditer(text)]
+
+def normalize_date(value: Optional[str]) -> Optional[str]:
+    """ISO date for the common judgment date formats; other values are kept as given"""
+    if not value:
+        return None
+    value = str(value).strip()
+    for date_format in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, date_format).date().isoformat()
+        except ValueError:
+            continue
+    return value
+
+class CaseStore:
+    """Read-mostly case-law database; one connection shared behind a lock"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM cases").fetchone()[0]
+
+    def import_cases(self, records: Iterable[Dict[str, Any]], replace: bool = False, batch_size: int = 5000) -> int:
+        """
+        Insert case records in one transaction; returns cases written.
+
+        A record needs a title or both parties. A record sharing a citation
+        with a stored case updates that case instead of adding a duplicate.
+        """
+        written = 0
+        with self._lock, self._conn:
+            if replace:
+                self._conn.execute("DELETE FROM citations")
+                self._conn.execute("DELETE FROM cases")
+            records = iter(records)
+            while True:
+                batch = [case for case in map(self._prepare, islice(records, batch_size)) if case]
+                if not batch:
+                    break
+                for case in batch:
+                    self._write_case(case)
+                written += len(batch)
+            # External-content FTS index is rebuilt from cases in one pass
+            self._conn.execute("INSERT INTO cases_fts (cases_fts) VALUES ('rebuild')")
+        return written
+
+    @staticmethod
+    def _prepare(record: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        citations = record.get("citations") or record.get("citation") or []
+        if isinstance(citations, str):
+            citations = [citations]
+        petitioner = (record.get("petitioner") or "").strip()
+        respondent = (record.get("respondent") or "").strip()
+        title = (record.get("title") or "").strip()
+        if not title and petitioner and respondent:
+            title = f"{petitioner} v. {respondent}"
+        if title and not (petitioner or respondent):
+            parties = PARTIES_PATTERN.split(title, maxsplit=1)
+            if len(parties) == 2:
+                petitioner, respondent = parties[0].strip(), parties[1].strip()
+        if not title:
+            return None
+        return {
+            "title": title,
+            "petitioner": petitioner or None,
+            "respondent": respondent or None,
+            "court": record.get("court"),
+            "decided": normalize_date(record.get("date") or record.get("decided")),
+            "headnote": record.get("headnote") or record.get("summary"),
+            "url": record.get("url"),
+            "source": record.get("source"),
+            "citations": {normalize_citation(c): c.strip() for c in citations if normalize_citation(c)},
+        }
+
+    def _write_case(self, case: Dict[str, Any]):
+        keys = list(case["citations"])
+        existing = self._conn.execute(
+            f"SELECT case_id FROM citations WHERE citation IN ({','.join('?' * len(keys))}) LIMIT 1", keys
+        ).fetchone() if keys else None
+        columns = ("title", "petitioner", "respondent", "court", "decided", "headnote", "url", "source")
+        values = [case[column] for column in columns]
+        if existing:
+            case_id = existing["case_id"]
+            self._conn.execute(
+                f"UPDATE cases SET {', '.join(f'{column} = ?' for column in columns)} WHERE id = ?",
+                (*values, case_id),
+            )
+        else:
+            case_id = self._conn.execute(
+                f"INSERT INTO cases ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})", values
+            ).lastrowid
+        self._conn.executemany(
+            "INSERT OR IGNORE INTO citations (citation, case_id, display) VALUES (?, ?, ?)",
+            [(key, case_id, display) for key, display in case["citations"].items()],
+        )
+
+    def lookup(self, reference: str, limit: int = 5) -> List[Dict[str, Any]]:
+        """Cases for one reference (a citation or a case name), best first"""
+        return self.lookup_many([reference], limit)[0]
+
+    def lookup_many(self, references: Sequence[str], limit: int = 5) -> List[List[Dict[str, Any]]]:
+        """
+        Cases for each reference, best first.
+
+        Citations in every reference are resolved with one indexed IN query;
+        references with no citation in them fall back to a full-text match on
+        the case name (title and parties weighted above the headnote). A
+        reference whose citations are all unknown finds nothing rather than
+        whichever case shares a word with it.
+        """
+        keys_per_reference, has_citation = [], []
+        for reference in references:
+            found = extract_citations(reference)
+            keys = [normalize_citation(citation) for citation in found or [reference]]
+            keys_per_reference.append(list(dict.fromkeys(key for key in keys if key)))
+            has_citation.append(bool(found))
+        all_keys = list({key for keys in keys_per_reference for key in keys})
+
+        with self._lock:
+            case_ids_by_key: Dict[str, List[int]] = {}
+            for start in range(0, len(all_keys), 500):
+                chunk = all_keys[start:start + 500]
+                for row in self._conn.execute(
+                    f"SELECT citation, case_id FROM citations WHERE citation IN ({','.join('?' * len(chunk))})", chunk
+                ):
+                    case_ids_by_key.setdefault(row["citation"], []).append(row["case_id"])
+
+            matches = []
+            for reference, keys, cited in zip(references, keys_per_reference, has_citation):
+                case_ids = list(dict.fromkeys(case_id for key in keys for case_id in case_ids_by_key.get(key, [])))
+                if case_ids:
+                    matches.append([(case_id, "citation") for case_id in case_ids[:limit]])
+                elif cited:
+                    matches.append([])
+                else:
+                    matches.append([(case_id, "name") for case_id in self._search_names(reference, limit)])
+
+            cases = self._cases({case_id for found in matches for case_id, _ in found})
+        return [[dict(cases[case_id], match=match) for case_id, match in found if case_id in cases]
+                for found in matches]
+
+    def _search_names(self, reference: str, limit: int) -> List[int]:
+        words = [word for word in re.findall(r"\w+", reference.lower()) if word not in NAME_STOPWORDS]
+        if not words:
+            return []
+        for operator in (" AND ", " OR "):
+            rows = self._conn.execute(
+                "SELECT rowid FROM cases_fts WHERE cases_fts MATCH ? "
+                "ORDER BY bm25(cases_fts, 10.0, 5.0, 5.0, 1.0) LIMIT ?",
+                (operator.join(f'"{word}"' for word in words), limit),
+            ).fetchall()
+            if rows:
+                return [row["rowid"] for row in rows]
+        return []
+
+    def _cases(self, case_ids) -> Dict[int, Dict[str, Any]]:
+        case_ids = list(case_ids)
+        if not case_ids:
+            return {}
+        placeholders = ",".join("?" * len(case_ids))
+        citations: Dict[int, List[str]] = {}
+        for row in self._conn.execute(
+            f"SELECT case_id, display FROM citations WHERE case_id IN ({placeholders})", case_ids
+        ):
+            citations.setdefault(row["case_id"], []).append(row["display"])
+        return {
+            row["id"]: {
+                "title": row["title"],
+                "petitioner": row["petitioner"],
+                "respondent": row["respondent"],
+                "court": row["court"],
+                "date": row["decided"],
+                "citations": citations.get(row["id"], []),
+                "headnote": row["headnote"],
+                "url": row["url"],
+            }
+            for row in self._conn.execute(f"SELECT * FROM cases WHERE id IN ({placeholders})", case_ids)
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
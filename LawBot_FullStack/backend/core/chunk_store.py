@@ -0,0 +1,225 @@
+"""
+LawBot Chunk Store
+Compact, memory-mapped on-disk format for vectorstore chunk text and sources
+
+Layout (little endian):
+    header      magic "LBCS", version, count, num_sources,
+                offsets_pos, source_ids_pos, sources_pos, blob_pos, ids_pos
+    offsets     (count + 1) x uint64 byte offsets into the blob
+    source_ids  count x uint32 indices into the sources table
+    sources     JSON list of interned source names
+    blob        concatenated UTF-8 chunk text
+    ids         count x uint64 chunk ids, ascending (version 2)
+
+Only the offsets table is touched at open time; chunk text is decoded on
+access, so a query decodes just its top-k hits.
+
+Chunks are addressed by the ids stored in the FAISS index. A fresh build
+uses ids 0..N-1; incremental updates remove and append ids, so the id space
+can have gaps. len(store) is the size of the id space (max id + 1) so the
+usual `idx < len(chunks)` guards keep working; `store.count` is the number
+of stored chunks.
+"""
+
+import json
+import mmap
+import os
+import struct
+from pathlib import Path
+from typing import List, Dict, Any, Tuple, Sequence
+
+import numpy as np
+
+MAGIC = b"LBCS"
+VERSION = 2
+HEADER_V1 = struct.Struct("<4sIIIQQQQ")
+HEADER = struct.Struct("<4sIIIQQQQQ")
+CHUNK_STORE_FILE = "chunkstore.bin"
+
+class ChunkMetadataView:
+    """Sequence of metadata dicts backed by a ChunkStore (drop-in for metadata.json lists)"""
+
+    def __init__(self, store: "ChunkStore"):
+        self._store = store
+
+    def __len__(self) -> int:
+        return len(self._store)
+
+    def __getitem__(self, idx: int) -> Dict[str, Any]:
+        return {"source": self._store.get_source(idx)}
+
+class ChunkStore:
+    """Read-only, mmapped chunk store; indexing returns the chunk text"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._file = open(self.path, "rb")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version = struct.unpack_from("<4sI", self._mmap, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{self.path} is not a LawBot chunk store")
+        if version == 1:
+            (_, _, count, num_sources, offsets_pos, source_ids_pos,
+             sources_pos, blob_pos) = HEADER_V1.unpack_from(self._mmap, 0)
+            ids_pos = None
+        elif version == VERSION:
+            (_, _, count, num_sources, offsets_pos, source_ids_pos,
+             sources_pos, blob_pos, ids_pos) = HEADER.unpack_from(self._mmap, 0)
+        else:
+            raise ValueError(f"Unsupported chunk store version {version} in {self.path}")
+
+        self.count = count
+        self._offsets = np.frombuffer(self._mmap, dtype="<u8", count=count + 1, offset=offsets_pos)
+        self._source_ids = np.frombuffer(self._mmap, dtype="<u4", count=count, offset=source_ids_pos)
+        self.sources: List[str] = json.loads(self._mmap[sources_pos:blob_pos].decode("utf-8"))
+        self._blob_pos = blob_pos
+
+        self._ids = None
+        self.id_bound = count
+        if ids_pos is not None and count:
+            ids = np.frombuffer(self._mmap, dtype="<u8", count=count, offset=ids_pos)
+            self.id_bound = int(ids[-1]) + 1
+            # Dense ids (a fresh build) need no lookup table
+            if self.id_bound != count:
+                self._ids = ids
+        self.metadata = ChunkMetadataView(self)
+
+    def __len__(self) -> int:
+        return self.id_bound
+
+    def __getitem__(self, chunk_id: int) -> str:
+        return self.get_text(chunk_id)
+
+    def row_for_id(self, chunk_id: int) -> int:
+        """Storage row of a chunk id (IndexError if the id is not stored)"""
+        chunk_id = int(chunk_id)
+        if self._ids is None:
+            if chunk_id < 0 or chunk_id >= self.count:
+                raise IndexError(chunk_id)
+            return chunk_id
+        row = int(np.searchsorted(self._ids, chunk_id))
+        if row >= self.count or int(self._ids[row]) != chunk_id:
+            raise IndexError(chunk_id)
+        return row
+
+    def ids(self) -> np.ndarray:
+        """All stored chunk ids in storage order"""
+        return np.array(self._ids) if self._ids is not None else np.arange(self.count, dtype="int64")
+
+    def get_text(self, chunk_id: int) -> str:
+        return self.text_at(self.row_for_id(chunk_id))
+
+    def get_source(self, chunk_id: int) -> str:
+        return self.source_at(self.row_for_id(chunk_id))
+
+    def text_at(self, row: int) -> str:
+        start = self._blob_pos + int(self._offsets[row])
+        end = self._blob_pos + int(self._offsets[row + 1])
+        return self._mmap[start:end].decode("utf-8")
+
+    def source_at(self, row: int) -> str:
+        return self.sources[int(self._source_ids[row])]
+
+    def close(self):
+        # Drop numpy views before closing the map they point into
+        self._offsets = None
+        self._source_ids = None
+        self._ids = None
+        self._mmap.close()
+        self._file.close()
+
+    @staticmethod
+    def write(path, chunks: Sequence[str], sources: Sequence[str], ids: Sequence[int] = None):
+        """Write chunks, their source names and (optionally) their ids, replacing the file atomically"""
+        path = Path(path)
+        if len(chunks) != len(sources):
+            raise ValueError("chunks and sources must have the same length")
+
+        ids = np.arange(len(chunks), dtype="<u8") if ids is None else np.asarray(ids, dtype="<u8")
+        if len(ids) != len(chunks):
+            raise ValueError("chunks and ids must have the same length")
+        if len(ids) > 1 and not np.all(ids[1:] > ids[:-1]):
+            # Keep rows sorted by id so lookups can binary-search
+            order = np.argsort(ids, kind="stable")
+            chunks = [chunks[i] for i in order]
+            sources = [sources[i] for i in order]
+            ids = ids[order]
+
+        source_table: Dict[str, int] = {}
+        source_ids = np.fromiter(
+            (source_table.setdefault(source, len(source_table)) for source in sources),
+            dtype="<u4",
+            count=len(sources),
+        )
+
+        encoded = [chunk.encode("utf-8") for chunk in chunks]
+        offsets = np.zeros(len(encoded) + 1, dtype="<u8")
+        np.cumsum([len(data) for data in encoded], out=offsets[1:])
+        sources_json = json.dumps(list(source_table), ensure_ascii=False).encode("utf-8")
+
+        offsets_pos = HEADER.size
+        source_ids_pos = offsets_pos + offsets.nbytes
+        sources_pos = source_ids_pos + source_ids.nbytes
+        blob_pos = sources_pos + len(sources_json)
+        ids_pos = blob_pos + int(offsets[-1])
+
+        tmp_path = path.with_suffix(path.suffix + ".tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, VERSION, len(encoded), len(source_table),
+                                offsets_pos, source_ids_pos, sources_pos, blob_pos, ids_pos))
+            f.write(offsets.tobytes())
+            f.write(source_ids.tobytes())
+            f.write(sources_json)
+            for data in encoded:
+                f.write(data)
+            f.write(ids.tobytes())
+        os.replace(tmp_path, path)
+
+def convert_json_store(chunks_path, metadata_path, output_path) -> int:
+    """Convert chunks.json (+ optional metadata.json) into a chunk store; returns chunk count"""
+    with open(chunks_path, "r", encoding="utf-8") as f:
+        chunks = json.load(f)
+
+    if metadata_path and Path(metadata_path).exists():
+        with open(metadata_path, "r", encoding="utf-8") as f:
+            sources = [item.get("source", "Unknown") for item in json.load(f)]
+    else:
+        sources = [_source_from_text(chunk) for chunk in chunks]
+
+    # Older stores can have fewer metadata rows than chunks
+    sources = (sources + ["Unknown"] * len(chunks))[:len(chunks)]
+    ChunkStore.write(output_path, chunks, sources)
+    return len(chunks)
+
+def load_chunks(vectorstore_dir, chunks_path=None, metadata_path=None) -> Tuple[Sequence[str], Sequence[Dict[str, Any]]]:
+    """
+    Return (chunks, metadata) sequences for a vectorstore directory.
+
+    Prefers the binary chunk store and falls back to chunks.json/metadata.json
+    for vectorstores built before it existed.
+    """
+    vectorstore_dir = Path(vectorstore_dir)
+    store_file = vectorstore_dir / CHUNK_STORE_FILE
+    if store_file.exists():
+        store = ChunkStore(store_file)
+        return store, store.metadata
+
+    chunks_path = Path(chunks_path) if chunks_path else vectorstore_dir / "chunks.json"
+    metadata_path = Path(metadata_path) if metadata_path else vectorstore_dir / "metadata.json"
+    with open(chunks_path, "r", encoding="utf-8") as f:
+        chunks = json.load(f)
+    metadata = []
+    if metadata_path.exists():
+        with open(metadata_path, "r", encoding="utf-8") as f:
+            metadata = json.load(f)
+    return chunks, metadata
+
+def _source_from_text(chunk: str) -> str:
+    """Recover the source from the 'Source: X' line chunks are built with"""
+    marker = "\nSource: "
+    pos = chunk.rfind(marker)
+    if pos == -1:
+        return "Unknown"
+    source = chunk[pos + len(marker):].strip()
+    return source.splitlines()[0] if source else "Unknown"
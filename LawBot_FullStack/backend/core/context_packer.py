@@ -0,0 +1,109 @@
+"""
+LawBot Context Packer
+Fits retrieved chunks into a fixed prompt-token budget without ever cutting the question or template
+"""
+
+import threading
+from typing import Callable, List, Dict, Any
+
+from backend.core.text_chunker import SENTENCE_BOUNDARY, split_after
+
+class ContextPacker:
+    """
+    Assembles the RAG context for one prompt under max_prompt_tokens.
+
+    render(context) must return the complete model input (chat template,
+    question and instructions around the context). The template is measured
+    with an empty context first; chunks then fill the remaining budget in
+    relevance order, and the first chunk that does not fit is trimmed to
+    whole sentences before packing stops.
+    """
+
+    def __init__(self, tokenizer, max_prompt_tokens: int = 1536, separator: str = "\n\n"):
+        self.tokenizer = tokenizer
+        self.max_prompt_tokens = max_prompt_tokens
+        self.separator = separator
+        self._lock = threading.Lock()
+        self.stats = {
+            "requests": 0,
+            "prompt_tokens_total": 0,
+            "prompt_tokens_max": 0,
+            "chunks_offered": 0,
+            "chunks_packed": 0,
+            "chunks_trimmed": 0,
+            "over_budget": 0,
+        }
+
+    def count(self, text: str) -> int:
+        return len(self.tokenizer(text, add_special_tokens=False)["input_ids"])
+
+    def pack(self, chunks: List[str], render: Callable[[str], str]) -> Dict[str, Any]:
+        """Return the packed prompt, its context and token accounting"""
+        template_tokens = self.count(render(""))
+        budget = self.max_prompt_tokens - template_tokens
+        separator_tokens = self.count(self.separator)
+
+        parts = []
+        used = 0
+        trimmed = False
+        for chunk in chunks:
+            cost = self.count(chunk) + (separator_tokens if parts else 0)
+            if used + cost <= budget:
+                parts.append(chunk)
+                used += cost
+                continue
+            # Keep as many leading sentences of this chunk as still fit, then stop
+            partial = self._trim(chunk, budget - used - (separator_tokens if parts else 0))
+            if partial:
+                parts.append(partial)
+                trimmed = True
+            break
+
+        context = self.separator.join(parts)
+        prompt = render(context)
+        prompt_tokens = self.count(prompt)
+        # Token counts are not perfectly additive across joins; drop trailing parts if needed
+        while prompt_tokens > self.max_prompt_tokens and parts:
+            parts.pop()
+            context = self.separator.join(parts)
+            prompt = render(context)
+            prompt_tokens = self.count(prompt)
+
+        with self._lock:
+            self.stats["requests"] += 1
+            self.stats["prompt_tokens_total"] += prompt_tokens
+            self.stats["prompt_tokens_max"] = max(self.stats["prompt_tokens_max"], prompt_tokens)
+            self.stats["chunks_offered"] += len(chunks)
+            self.stats["chunks_packed"] += len(parts)
+            self.stats["chunks_trimmed"] += int(trimmed)
+            # The template alone can exceed the budget (very long question); it is never cut
+            self.stats["over_budget"] += int(prompt_tokens > self.max_prompt_tokens)
+
+        return {
+            "prompt": prompt,
+            "context": context,
+            "prompt_tokens": prompt_tokens,
+            "template_tokens": template_tokens,
+            "chunks_packed": len(parts),
+            "chunks_offered": len(chunks),
+            "trimmed": trimmed,
+        }
+
+    def _trim(self, chunk: str, budget: int) -> str:
+        """Leading whole sentences of chunk within budget tokens"""
+        if budget <= 0:
+            return ""
+        kept = ""
+        for sentence in split_after(chunk, SENTENCE_BOUNDARY):
+            if self.count(kept + sentence) > budget:
+                break
+            kept += sentence
+        return kept.strip()
+
+    def get_stats(self) -> Dict[str, Any]:
+        requests = self.stats["requests"]
+        return {
+            **self.stats,
+            "max_prompt_tokens": self.max_prompt_tokens,
+            "avg_prompt_tokens": round(self.stats["prompt_tokens_total"] / requests, 1) if requests else 0.0,
+        }
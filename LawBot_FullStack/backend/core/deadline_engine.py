@@ -0,0 +1,225 @@
+"""
+LawBot Deadline Engine
+Vectorized limitation deadlines over a precomputed per-court calendar bitmap
+
+A court calendar is one bool per day over a fixed range (True = court open),
+built from a weekmask and the court's holidays and vacations. Deadlines for a
+whole batch are computed with numpy.datetime64 arithmetic and index lookups
+into that bitmap:
+
+    days        start + n calendar days (the start day is excluded); when the
+                period expires on a closed day the deadline moves to the day
+                the court reopens (Limitation Act, s. 4)
+    months      start + n calendar months, clipped to the end of shorter
+                months (General Clauses Act), then rolled forward the same way
+    years       12 * n months
+    court_days  the n-th day the court is open after start
+
+Calendar files (data/calendars/<court>.txt):
+    # comments
+    weekmask 1111110                      Mon..Sun, 1 = court sits (default from config)
+    2024-01-26  Republic Day              one holiday
+    2024-05-20..2024-07-07  Vacation      inclusive range
+Compiled bitmaps (<court>.npz, scripts/build_court_calendar.py) load without parsing.
+"""
+
+import re
+import threading
+import logging
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+UNITS = ("days", "court_days", "months", "years")
+DATE_RANGE = re.compile(r"^(\d{4}-\d{2}-\d{2})(?:\s*\.\.\s*(\d{4}-\d{2}-\d{2}))?(?:\s|$)")
+
+class CourtCalendar:
+    """Open-day bitmap of one court over [range_start, range_end]"""
+
+    def __init__(self, range_start, open_days: np.ndarray, weekmask: str = "1111100", name: str = "default"):
+        self.name = name
+        self.weekmask = weekmask
+        self.range_start = np.datetime64(range_start, "D")
+        self.open = np.asarray(open_days, dtype=bool)
+        self.range_end = self.range_start + (len(self.open) - 1)
+        # Day index of every open day, open days up to and including each day,
+        # and for each day the first open day on or after it
+        self._open_positions = np.flatnonzero(self.open)
+        self._open_through = np.cumsum(self.open, dtype="int64")
+        self._next_open = self._open_through - self.open
+        # Month of each day, day of month (0-based), and the first day index of each month
+        days = self.range_start + np.arange(len(self.open))
+        months = days.astype("M8[M]")
+        self._month_of = (months - months[0]).astype("int64")
+        self._day_of_month = (days - months.astype("M8[D]")).astype("int64")
+        month_starts = np.arange(months[0], months[-1] + 2).astype("M8[D]")
+        self._month_start = (month_starts - self.range_start).astype("int64")
+        self._labels = None
+
+    @classmethod
+    def from_holidays(cls, holidays: Iterable[Tuple[str, Optional[str]]], weekmask: str,
+                      range_start: str, range_end: str, name: str = "default") -> "CourtCalendar":
+        """Bitmap from a weekmask and (first, last) closed-day ranges; last None = single day"""
+        start, end = np.datetime64(range_start, "D"), np.datetime64(range_end, "D")
+        days = np.arange(start, end + 1, dtype="M8[D]")
+        # 1970-01-01 was a Thursday: weekday 0 = Monday
+        weekdays = (days.astype("int64") + 3) % 7
+        open_days = np.array([flag == "1" for flag in weekmask], dtype=bool)[weekdays]
+        for first, last in holidays:
+            first = np.datetime64(first, "D")
+            last = np.datetime64(last, "D") if last else first
+            lo, hi = max(first, start), min(last, end)
+            if lo <= hi:
+                open_days[(lo - start).astype("int64"):(hi - start).astype("int64") + 1] = False
+        return cls(start, open_days, weekmask, name)
+
+    @classmethod
+    def load(cls, path, weekmask: str, range_start: str, range_end: str) -> "CourtCalendar":
+        """Compiled .npz bitmap, or a holiday list (.txt) compiled over the configured range"""
+        path = Path(path)
+        if path.suffix == ".npz":
+            with np.load(path) as data:
+                length = int(data["length"])
+                open_days = np.unpackbits(data["bitmap"], count=length).astype(bool)
+                return cls(str(data["range_start"]), open_days, str(data["weekmask"]), path.stem)
+
+        holidays = []
+        with open(path, "r", encoding="utf-8") as f:
+            for line_number, line in enumerate(f, 1):
+                line = line.split("#", 1)[0].strip()
+                if not line:
+                    continue
+                if line.lower().startswith("weekmask"):
+                    weekmask = line.split()[1]
+                    continue
+                match = DATE_RANGE.match(line)
+                if not match:
+                    raise ValueError(f"{path}:{line_number}: expected a date or date..date, got '{line}'")
+                holidays.append((match.group(1), match.group(2)))
+        if not re.fullmatch(r"[01]{7}", weekmask):
+            raise ValueError(f"{path}: weekmask must be 7 digits of 0/1 (Mon..Sun), got '{weekmask}'")
+        return cls.from_holidays(holidays, weekmask, range_start, range_end, path.stem)
+
+    def save(self, path):
+        """Write the compiled bitmap (.npz)"""
+        np.savez_compressed(path, bitmap=np.packbits(self.open), length=len(self.open),
+                            range_start=str(self.range_start), weekmask=self.weekmask)
+
+    def _check(self, index: np.ndarray) -> np.ndarray:
+        if len(index) and (index.min() < 0 or index.max() >= len(self.open)):
+            raise ValueError(f"Dates must fall between {self.range_start} and {self.range_end} "
+                             f"for the '{self.name}' calendar")
+        return index
+
+    def _roll_forward(self, index: np.ndarray) -> np.ndarray:
+        """First open day on or after each day index"""
+        nearest = self._next_open[self._check(index)]
+        if len(nearest) and nearest.max() >= len(self._open_positions):
+            raise ValueError(f"No open court day before {self.range_end} in the '{self.name}' calendar")
+        return self._open_positions[nearest]
+
+    def deadlines(self, starts: np.ndarray, periods: np.ndarray, unit: str = "days") -> Tuple[np.ndarray, np.ndarray]:
+        """
+        (deadline, nominal expiry) day indexes for datetime64[D] starts and integer periods.
+
+        The nominal expiry is where the period runs out on the calendar; the
+        deadline differs from it only when the court is closed that day.
+        """
+        start_index = self._check((starts - self.range_start).astype("int64"))
+        periods = periods.astype("int64")
+        if unit == "court_days":
+            # Open days strictly after start, then step n - 1 further open days
+            position = self._open_through[start_index] + np.maximum(periods, 1) - 1
+            if len(position) and position.max() >= len(self._open_positions):
+                raise ValueError(f"Deadline falls after {self.range_end} in the '{self.name}' calendar")
+            nominal = self._open_positions[position]
+            return nominal, nominal
+
+        if unit in ("months", "years"):
+            target = self._month_of[start_index] + (periods * 12 if unit == "years" else periods)
+            if len(target) and target.max() >= len(self._month_start) - 1:
+                raise ValueError(f"Deadline falls after {self.range_end} in the '{self.name}' calendar")
+            month_length = self._month_start[target + 1] - self._month_start[target]
+            nominal = self._month_start[target] + np.minimum(self._day_of_month[start_index], month_length - 1)
+        elif unit == "days":
+            nominal = start_index + periods
+            if len(nominal) and nominal.max() >= len(self.open):
+                raise ValueError(f"Deadline falls after {self.range_end} in the '{self.name}' calendar")
+        else:
+            raise ValueError(f"Unknown period unit '{unit}' (expected one of {', '.join(UNITS)})")
+        return self._roll_forward(nominal), nominal
+
+    def labels(self, index: np.ndarray) -> list:
+        """ISO strings for day indexes, from a table built once per calendar"""
+        if self._labels is None:
+            days = self.range_start + np.arange(len(self.open))
+            self._labels = np.datetime_as_string(days).astype(object)
+        return self._labels[index].tolist()
+
+class DeadlineEngine:
+    """Court calendars loaded on first use from calendar_dir and kept for the process"""
+
+    def __init__(self, calendar_dir, default_court: str = "default", weekmask: str = "1111100",
+                 range_start: str = "1950-01-01", range_end: str = "2100-12-31"):
+        self.calendar_dir = Path(calendar_dir)
+        self.default_court = default_court
+        self.weekmask = weekmask
+        self.range_start = range_start
+        self.range_end = range_end
+        self._calendars: Dict[str, CourtCalendar] = {}
+        self._lock = threading.Lock()
+
+    def calendar(self, court: Optional[str] = None) -> CourtCalendar:
+        """Calendar for a court: compiled bitmap, holiday list, or weekmask only when neither file exists"""
+        court = court or self.default_court
+        if not re.fullmatch(r"[\w-]+", court):
+            raise ValueError(f"Invalid court name '{court}'")
+        with self._lock:
+            calendar = self._calendars.get(court)
+            if calendar is None:
+                for suffix in (".npz", ".txt"):
+                    path = self.calendar_dir / f"{court}{suffix}"
+                    if path.is_file():
+                        calendar = CourtCalendar.load(path, self.weekmask, self.range_start, self.range_end)
+                        logger.info(f"✅ Court calendar loaded: {path} ({int(calendar.open.sum())} open days)")
+                        break
+                else:
+                    if court != self.default_court:
+                        raise ValueError(f"No calendar for court '{court}' in {self.calendar_dir}")
+                    calendar = CourtCalendar.from_holidays([], self.weekmask, self.range_start,
+                                                           self.range_end, court)
+                self._calendars[court] = calendar
+            return calendar
+
+    def loaded_courts(self) -> List[str]:
+        with self._lock:
+            return sorted(self._calendars)
+
+    def compute(self, start_dates: Sequence[str], periods: Sequence[int], unit: str = "days",
+                court: Optional[str] = None) -> Dict[str, list]:
+        """
+        Deadlines for parallel lists of ISO start dates and periods.
+
+        A single start date or period is broadcast over the other list.
+        """
+        calendar = self.calendar(court)
+        starts = np.array(start_dates, dtype="M8[D]").reshape(-1)
+        periods = np.array(periods, dtype="int64").reshape(-1)
+        if len(starts) != len(periods) and 1 not in (len(starts), len(periods)):
+            raise ValueError("start_dates and periods must have the same length, or one of them a single value")
+        starts, periods = np.broadcast_arrays(starts, periods)
+        if len(periods) and periods.min() < 0:
+            raise ValueError("Periods must not be negative")
+        # Longer periods can only end past range_end, and would overflow int64 as months/years
+        if len(periods) and periods.max() > len(calendar.open):
+            raise ValueError(f"Deadline falls after {calendar.range_end} in the '{calendar.name}' calendar")
+        deadline, nominal = calendar.deadlines(starts, periods, unit)
+        return {
+            "court": calendar.name,
+            "deadlines": calendar.labels(deadline),
+            "rolled_forward": (deadline != nominal).tolist(),
+            "nominal": calendar.labels(nominal),
+        }
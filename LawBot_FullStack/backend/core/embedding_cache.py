@@ -0,0 +1,136 @@
+"""
+LawBot Embedding Cache
+Persistent chunk-embedding cache for the ingestion scripts, keyed by content hash and model
+
+One directory per embedding model holds:
+    meta.json    model name, dimension, dtype and row count
+    keys.bin     row x 32-byte SHA-256 digests of the chunk text
+    vectors.bin  row x dimension embeddings (float32 or float16)
+
+New rows are appended and meta.json is rewritten last, so an interrupted run
+only loses the rows it had not committed yet.
+"""
+
+import re
+import json
+import hashlib
+import logging
+from pathlib import Path
+from typing import Callable, Dict, Any, List, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DIGEST_SIZE = 32
+
+def chunk_digest(text: str) -> bytes:
+    return hashlib.sha256(text.encode("utf-8")).digest()
+
+class EmbeddingCache:
+    """On-disk embeddings for one model; lookups by SHA-256 of the chunk text"""
+
+    def __init__(self, cache_dir, model_name: str, dtype: str = "float32"):
+        if dtype not in ("float32", "float16"):
+            raise ValueError(f"Unsupported embedding cache dtype '{dtype}'")
+        self.model_name = model_name
+        self.dtype = np.dtype(dtype)
+        self.dir = Path(cache_dir) / re.sub(r"[^\w.-]+", "_", model_name)
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self._meta_file = self.dir / "meta.json"
+        self._keys_file = self.dir / "keys.bin"
+        self._vectors_file = self.dir / "vectors.bin"
+
+        self.dimension = None
+        self.count = 0
+        self._rows: Dict[bytes, int] = {}
+        self.stats = {"hits": 0, "misses": 0}
+        self._load()
+
+    def _load(self):
+        if not self._meta_file.exists():
+            return
+        with open(self._meta_file, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("model_name") != self.model_name or meta.get("dtype") != self.dtype.name:
+            logger.warning(f"Embedding cache at {self.dir} does not match {self.model_name}/{self.dtype.name}; starting fresh")
+            self._reset()
+            return
+
+        self.dimension = meta["dimension"]
+        self.count = meta["count"]
+        keys = np.fromfile(self._keys_file, dtype=np.uint8, count=self.count * DIGEST_SIZE)
+        keys = keys.reshape(self.count, DIGEST_SIZE)
+        self._rows = {keys[row].tobytes(): row for row in range(self.count)}
+
+    def _reset(self):
+        for path in (self._meta_file, self._keys_file, self._vectors_file):
+            path.unlink(missing_ok=True)
+        self.dimension = None
+        self.count = 0
+        self._rows = {}
+
+    def _vectors(self) -> np.ndarray:
+        return np.memmap(self._vectors_file, dtype=self.dtype, mode="r", shape=(self.count, self.dimension))
+
+    def encode(self, texts: Sequence[str], encode_fn: Callable[[List[str]], np.ndarray]) -> np.ndarray:
+        """
+        Return float32 embeddings for texts, calling encode_fn only on uncached ones.
+
+        encode_fn takes a list of texts and returns their embeddings in order.
+        """
+        digests = [chunk_digest(text) for text in texts]
+        missing = {}
+        for i, digest in enumerate(digests):
+            if digest not in self._rows and digest not in missing:
+                missing[digest] = i
+        self.stats["hits"] += len(texts) - len(missing)
+        self.stats["misses"] += len(missing)
+
+        if missing:
+            new_embeddings = np.asarray(encode_fn([texts[i] for i in missing.values()]), dtype=np.float32)
+            self._append(list(missing), new_embeddings)
+
+        if not len(texts):
+            return np.zeros((0, self.dimension or 0), dtype=np.float32)
+        vectors = self._vectors()
+        rows = np.fromiter((self._rows[digest] for digest in digests), dtype=np.int64, count=len(digests))
+        embeddings = np.asarray(vectors[rows], dtype=np.float32)
+        del vectors
+        return embeddings
+
+    def _append(self, digests: List[bytes], embeddings: np.ndarray):
+        if self.dimension is None:
+            self.dimension = int(embeddings.shape[1])
+        elif embeddings.shape[1] != self.dimension:
+            raise ValueError(f"Embedding dimension {embeddings.shape[1]} does not match cache dimension {self.dimension}")
+
+        # Truncate to the committed row count in case a previous run died mid-append
+        with open(self._keys_file, "ab") as f:
+            f.truncate(self.count * DIGEST_SIZE)
+            f.write(b"".join(digests))
+        with open(self._vectors_file, "ab") as f:
+            f.truncate(self.count * self.dimension * self.dtype.itemsize)
+            f.write(embeddings.astype(self.dtype).tobytes())
+
+        for digest in digests:
+            self._rows[digest] = self.count
+            self.count += 1
+
+        tmp_file = self._meta_file.with_suffix(".json.tmp")
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump({
+                "model_name": self.model_name,
+                "dimension": self.dimension,
+                "dtype": self.dtype.name,
+                "count": self.count,
+            }, f)
+        tmp_file.replace(self._meta_file)
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {
+            **self.stats,
+            "entries": self.count,
+            "hit_rate": round(self.stats["hits"] / lookups, 3) if lookups else 0.0,
+        }
@@ -0,0 +1,138 @@
+"""
+LawBot FAQ Index
+Question-only embedding index over the Q&A corpus; near-verbatim questions get their stored answer
+
+Directory layout:
+    faq_index.idx      FAISS inner-product index over unit question embeddings (row = FAQ entry)
+    questions.bin      chunk store of the stored questions
+    answers.bin        chunk store of the stored answers, with their source as the chunk source
+    config.json        embedding model, dimension and entry count
+"""
+
+import json
+import os
+import time
+import threading
+import logging
+from pathlib import Path
+from typing import Dict, Any, Optional, Sequence
+
+import faiss
+import numpy as np
+
+from backend.core.chunk_store import ChunkStore
+from backend.core.response_cache import normalize_query, numeric_tokens
+
+logger = logging.getLogger(__name__)
+
+FAQ_INDEX_FILE = "faq_index.idx"
+FAQ_QUESTIONS_FILE = "questions.bin"
+FAQ_ANSWERS_FILE = "answers.bin"
+FAQ_CONFIG_FILE = "config.json"
+# Nearest stored questions checked for one whose numbers match the query
+FAQ_CANDIDATES = 5
+
+class FAQIndex:
+    """
+    Matches incoming questions against the stored ones.
+
+    A normalized-text match is served without an embedding; otherwise the
+    query embedding (the one already computed for retrieval) is compared with
+    every stored question and the nearest is served when its cosine distance
+    is within max_distance and it mentions the same numbers as the query.
+    Sentence embeddings barely move when only a section number changes, so
+    "section 437" must never be answered with the stored "section 438".
+    """
+
+    def __init__(self, index_dir, max_distance: float = 0.03):
+        self.dir = Path(index_dir)
+        self.max_distance = max_distance
+        with open(self.dir / FAQ_CONFIG_FILE, "r", encoding="utf-8") as f:
+            self.config = json.load(f)
+        self.index = faiss.read_index(str(self.dir / FAQ_INDEX_FILE))
+        self.questions = ChunkStore(self.dir / FAQ_QUESTIONS_FILE)
+        self.answers = ChunkStore(self.dir / FAQ_ANSWERS_FILE)
+        self._exact = {normalize_query(self.questions.text_at(row)): row for row in range(self.questions.count)}
+
+        self._lock = threading.Lock()
+        self.stats = {"lookups": 0, "exact_hits": 0, "semantic_hits": 0, "lookup_ms": 0.0}
+
+    def __len__(self) -> int:
+        return self.answers.count
+
+    @property
+    def embedding_model(self) -> str:
+        return self.config.get("embedding_model")
+
+    def match(self, query: str, query_embedding: Optional[np.ndarray] = None) -> Optional[Dict[str, Any]]:
+        """Stored question, answer, source and distance for a near-verbatim match, else None"""
+        started = time.perf_counter()
+        kind = "exact"
+        distance = 0.0
+        row = self._exact.get(normalize_query(query))
+        if row is None and query_embedding is not None:
+            vector = np.asarray(query_embedding, dtype="float32").reshape(1, -1)
+            vector = vector / max(float(np.linalg.norm(vector)), 1e-12)
+            similarity, rows = self.index.search(vector, FAQ_CANDIDATES)
+            numbers = numeric_tokens(query)
+            for candidate, candidate_similarity in zip(rows[0], similarity[0]):
+                if candidate < 0 or 1.0 - float(candidate_similarity) > self.max_distance:
+                    break
+                if numeric_tokens(self.questions.text_at(int(candidate))) == numbers:
+                    row, kind = int(candidate), "semantic"
+                    distance = 1.0 - float(candidate_similarity)
+                    break
+
+        with self._lock:
+            self.stats["lookups"] += 1
+            self.stats["lookup_ms"] += (time.perf_counter() - started) * 1000
+            if row is not None:
+                self.stats[f"{kind}_hits"] += 1
+        if row is None:
+            return None
+        return {
+            "question": self.questions.text_at(row),
+            "answer": self.answers.text_at(row),
+            "source": self.answers.source_at(row),
+            "distance": round(distance, 4),
+            "match": kind,
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.stats["lookups"]
+            hits = self.stats["exact_hits"] + self.stats["semantic_hits"]
+            return {
+                "entries": len(self),
+                "max_distance": self.max_distance,
+                "lookups": lookups,
+                "exact_hits": self.stats["exact_hits"],
+                "semantic_hits": self.stats["semantic_hits"],
+                "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+                "avg_lookup_ms": round(self.stats["lookup_ms"] / lookups, 3) if lookups else 0.0,
+            }
+
+    @staticmethod
+    def write(index_dir, questions: Sequence[str], answers: Sequence[str], sources: Sequence[str],
+              embeddings: np.ndarray, embedding_model: str):
+        """Write a FAQ index from question embeddings (normalized here) and their answers"""
+        index_dir = Path(index_dir)
+        index_dir.mkdir(parents=True, exist_ok=True)
+        if not len(questions) == len(answers) == len(sources) == len(embeddings):
+            raise ValueError("questions, answers, sources and embeddings must have the same length")
+
+        # Invalidate the old index first; config.json is written last
+        (index_dir / FAQ_CONFIG_FILE).unlink(missing_ok=True)
+        vectors = np.array(embeddings, dtype="float32", order="C")
+        faiss.normalize_L2(vectors)
+        index = faiss.IndexFlatIP(vectors.shape[1])
+        index.add(vectors)
+
+        tmp_index = index_dir / (FAQ_INDEX_FILE + ".tmp")
+        faiss.write_index(index, str(tmp_index))
+        os.replace(tmp_index, index_dir / FAQ_INDEX_FILE)
+        ChunkStore.write(index_dir / FAQ_QUESTIONS_FILE, questions, sources)
+        ChunkStore.write(index_dir / FAQ_ANSWERS_FILE, answers, sources)
+        with open(index_dir / FAQ_CONFIG_FILE, "w", encoding="utf-8") as f:
+            json.dump({"embedding_model": embedding_model, "dimension": int(vectors.shape[1]),
+                       "entries": len(questions)}, f, indent=2)
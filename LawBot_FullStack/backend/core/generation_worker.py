@@ -0,0 +1,66 @@
+"""
+LawBot Generation Worker
+Runs model generation on a dedicated background thread
+"""
+
+import queue
+import threading
+import logging
+from concurrent.futures import Future
+from typing import Callable, Any
+
+logger = logging.getLogger(__name__)
+
+class GenerationWorker:
+    """Single background thread that owns all calls into model.generate()"""
+
+    def __init__(self, name: str = "lawbot-generation"):
+        self.name = name
+        self._jobs = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Start the worker thread if it is not already running"""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+            logger.info(f"Generation worker '{self.name}' started")
+
+    def stop(self):
+        """Ask the worker thread to exit once queued jobs are drained"""
+        with self._lock:
+            if self._thread is None:
+                return
+            self._jobs.put(None)
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def submit(self, fn: Callable[..., Any], *args, **kwargs) -> Future:
+        """Queue a job for the worker thread and return its future"""
+        self.start()
+        future = Future()
+        self._jobs.put((future, fn, args, kwargs))
+        return future
+
+    def pending(self) -> int:
+        """Number of jobs waiting to run"""
+        return self._jobs.qsize()
+
+    def _run(self):
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                break
+
+            future, fn, args, kwargs = job
+            if not future.set_running_or_notify_cancel():
+                continue
+
+            try:
+                future.set_result(fn(*args, **kwargs))
+            except Exception as e:
+                logger.error(f"Generation job failed: {e}")
+                future.set_exception(e)
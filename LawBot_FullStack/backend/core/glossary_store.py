@@ -0,0 +1,222 @@
+"""
+LawBot Glossary Store
+SQLite-backed legal glossary with exact, prefix, word (FTS5) and typo-tolerant lookups
+
+Tables:
+    terms     id, term (normalized, unique b-tree for exact/prefix), display, definition, source, length
+    terms_fts FTS5 index over term, for terms containing the query words
+    deletes   symmetric-delete variants (term with up to d characters deleted) -> term id
+    meta      max_edit_distance the deletes were built with
+
+Two strings within d edits share a delete variant, so fuzzy candidates are
+one indexed IN lookup. Variants cover the whole term rather than a prefix:
+multi-word glossary terms often share a first word, and prefix variants
+made every "bail ..." term a candidate for every "bail" typo.
+"""
+
+import re
+import sqlite3
+import threading
+from itertools import islice
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+# Variants per term grow ~L^d; 1 keeps a 100k-term glossary near 2M rows
+MAX_EDIT_DISTANCE = 1
+# Upper bound of the prefix range scan (sorts after every other character)
+PREFIX_END = "\U0010ffff"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS terms (
+    id INTEGER PRIMARY KEY,
+    term TEXT NOT NULL UNIQUE,
+    display TEXT NOT NULL,
+    definition TEXT NOT NULL,
+    source TEXT,
+    length INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS deletes (
+    variant TEXT NOT NULL,
+    term_id INTEGER NOT NULL,
+    PRIMARY KEY (variant, term_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE VIRTUAL TABLE IF NOT EXISTS terms_fts USING fts5(term, content='terms', content_rowid='id');
+"""
+
+def normalize_term(term: str) -> str:
+    return " ".join(term.lower().split())
+
+def delete_variants(word: str, max_distance: int) -> Set[str]:
+    """The word and every string made by deleting up to max_distance characters from it"""
+    variants = {word}
+    frontier = set(variants)
+    for _ in range(max_distance):
+        frontier = {w[:i] + w[i + 1:] for w in frontier for i in range(len(w))}
+        variants |= frontier
+    return variants
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """Optimal string alignment distance (transpositions count as one edit); limit + 1 once it exceeds limit"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous2 = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        previous2, previous = previous, current
+    return previous[-1]
+
+class GlossaryStore:
+    """Read-mostly glossary database; one connection shared behind a lock"""
+
+    def __init__(self, path, max_edit_distance: int = MAX_EDIT_DISTANCE):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+        meta = dict(self._conn.execute("SELECT key, value FROM meta").fetchall())
+        # An existing database keeps the distance its deletes were built with
+        self.max_edit_distance = int(meta.get("max_edit_distance", max_edit_distance))
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM terms").fetchone()[0]
+
+    def import_terms(self, entries: Iterable[Tuple[str, str, Optional[str]]], replace: bool = False,
+                     batch_size: int = 10000) -> int:
+        """Insert or update (term, definition, source) entries in one transaction; returns rows written"""
+        written = 0
+        with self._lock, self._conn:
+            if replace:
+                self._conn.execute("DELETE FROM deletes")
+                self._conn.execute("DELETE FROM terms")
+            self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('max_edit_distance', ?)",
+                               (str(self.max_edit_distance),))
+            entries = iter(entries)
+            while True:
+                batch = [(normalize_term(term), term.strip(), definition.strip(), source)
+                         for term, definition, source in islice(entries, batch_size) if normalize_term(term)]
+                if not batch:
+                    break
+                self._conn.executemany(
+                    "INSERT INTO terms (term, display, definition, source, length) VALUES (?, ?, ?, ?, ?) "
+                    "ON CONFLICT(term) DO UPDATE SET display = excluded.display, "
+                    "definition = excluded.definition, source = excluded.source",
+                    [(term, display, definition, source, len(term)) for term, display, definition, source in batch],
+                )
+                ids = self._ids_for([term for term, _, _, _ in batch])
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO deletes (variant, term_id) VALUES (?, ?)",
+                    ((variant, ids[term]) for term, _, _, _ in batch
+                     for variant in delete_variants(term, self.max_edit_distance)),
+                )
+                written += len(batch)
+            # External-content FTS index is rebuilt from terms in one pass
+            self._conn.execute("INSERT INTO terms_fts (terms_fts) VALUES ('rebuild')")
+        return written
+
+    def _ids_for(self, terms: List[str]) -> Dict[str, int]:
+        ids = {}
+        for start in range(0, len(terms), 500):
+            chunk = terms[start:start + 500]
+            rows = self._conn.execute(
+                f"SELECT id, term FROM terms WHERE term IN ({','.join('?' * len(chunk))})", chunk
+            ).fetchall()
+            ids.update({row["term"]: row["id"] for row in rows})
+        return ids
+
+    def get(self, term: str) -> Optional[Dict[str, Any]]:
+        """Exact lookup of a normalized term"""
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM terms WHERE term = ?", (normalize_term(term),)).fetchone()
+        return self._entry(row, "exact", 0) if row else None
+
+    def terms(self, limit: Optional[int] = None) -> List[str]:
+        """Normalized terms in import order (the first `limit` of them when given)"""
+        with self._lock:
+            rows = self._conn.execute("SELECT term FROM terms ORDER BY id LIMIT ?",
+                                      (-1 if limit is None else limit,)).fetchall()
+        return [row["term"] for row in rows]
+
+    def lookup(self, term: str, limit: int = 5) -> List[Dict[str, Any]]:
+        """
+        Best glossary entries for a query, best first.
+
+        Order of preference: exact term, terms starting with the query, terms
+        containing every query word (FTS5), then - unless the term exists -
+        terms within max_edit_distance edits (symmetric-delete candidates
+        verified with an edit distance).
+        """
+        query = normalize_term(term)
+        if not query:
+            return []
+        results: List[Dict[str, Any]] = []
+        seen = set()
+
+        def add(rows, match, distance=None):
+            for row in rows:
+                if row["id"] not in seen and len(results) < limit:
+                    seen.add(row["id"])
+                    results.append(self._entry(row, match, distance))
+
+        with self._lock:
+            add(self._conn.execute("SELECT * FROM terms WHERE term = ?", (query,)), "exact", 0)
+            add(self._conn.execute(
+                "SELECT * FROM terms WHERE term > ? AND term < ? ORDER BY term LIMIT ?",
+                (query, query + PREFIX_END, limit),
+            ), "prefix")
+            words = re.findall(r"\w+", query)
+            if words and len(results) < limit:
+                fts_query = " ".join(f'"{word}"' for word in words)
+                add(self._conn.execute(
+                    "SELECT terms.* FROM terms_fts JOIN terms ON terms.id = terms_fts.rowid "
+                    "WHERE terms_fts MATCH ? ORDER BY terms_fts.rank LIMIT ?",
+                    (fts_query, limit),
+                ), "contains")
+            if len(results) < limit and not (results and results[0]["match"] == "exact"):
+                for row, distance in self._fuzzy(query, limit):
+                    add([row], "fuzzy", distance)
+        return results
+
+    def _fuzzy(self, query: str, limit: int) -> List[Tuple[sqlite3.Row, int]]:
+        """(row, distance) for terms within max_edit_distance of query, closest first"""
+        variants = list(delete_variants(query, self.max_edit_distance))
+        rows = self._conn.execute(
+            f"SELECT * FROM terms WHERE id IN ("
+            f"SELECT term_id FROM deletes WHERE variant IN ({','.join('?' * len(variants))})"
+            f") AND length BETWEEN ? AND ?",
+            (*variants, len(query) - self.max_edit_distance, len(query) + self.max_edit_distance),
+        ).fetchall()
+        scored = []
+        for row in rows:
+            distance = edit_distance(query, row["term"], self.max_edit_distance)
+            if distance <= self.max_edit_distance:
+                scored.append((distance, row["term"], row))
+        scored.sort(key=lambda item: item[:2])
+        return [(row, distance) for distance, _, row in scored[:limit]]
+
+    @staticmethod
+    def _entry(row, match: str, distance: Optional[int]) -> Dict[str, Any]:
+        entry = {
+            "term": row["display"],
+            "definition": row["definition"],
+            "source": row["source"],
+            "match": match,
+        }
+        if distance is not None:
+            entry["distance"] = distance
+        return entry
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,105 @@
+"""
+LawBot Index Factory
+Builds exact or approximate FAISS indexes and their query-time search parameters
+"""
+
+import math
+import logging
+from typing import Dict, Any, Optional
+
+import faiss
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+INDEX_TYPES = ("flat", "ivf_flat", "ivf_pq", "hnsw")
+
+def _auto_nlist(num_vectors: int) -> int:
+    """~4*sqrt(N) lists, capped so every centroid gets at least 39 training points"""
+    return max(1, min(int(4 * math.sqrt(num_vectors)), num_vectors // 39))
+
+def build_index(embeddings: np.ndarray, index_type: str = "flat", params: Optional[Dict[str, Any]] = None,
+                ids: Optional[np.ndarray] = None) -> faiss.Index:
+    """
+    Build, train and fill a FAISS index over L2 distance.
+
+    index_type is one of flat, ivf_flat, ivf_pq or hnsw. params carries the
+    build settings (nlist, pq_m, pq_nbits, hnsw_m, ef_construction,
+    train_sample); anything missing falls back to a size-based default.
+    When ids are given the index is ID-mapped (IVF natively, flat/HNSW via
+    IndexIDMap2) so chunks can later be removed and added by id.
+    """
+    params = params or {}
+    embeddings = np.ascontiguousarray(embeddings, dtype="float32")
+    num_vectors, dimension = embeddings.shape
+
+    if index_type == "flat":
+        index = faiss.IndexFlatL2(dimension)
+
+    elif index_type in ("ivf_flat", "ivf_pq"):
+        nlist = params.get("nlist") or _auto_nlist(num_vectors)
+        quantizer = faiss.IndexFlatL2(dimension)
+        if index_type == "ivf_flat":
+            index = faiss.IndexIVFFlat(quantizer, dimension, nlist, faiss.METRIC_L2)
+        else:
+            pq_m = params.get("pq_m", 16)
+            if dimension % pq_m != 0:
+                raise ValueError(f"pq_m={pq_m} must divide the embedding dimension {dimension}")
+            index = faiss.IndexIVFPQ(quantizer, dimension, nlist, pq_m, params.get("pq_nbits", 8))
+
+        # Train on a sample; k-means cost grows with the training set, not the corpus
+        train_sample = params.get("train_sample", 100000)
+        train_vectors = embeddings
+        if num_vectors > train_sample:
+            rng = np.random.default_rng(0)
+            train_vectors = embeddings[rng.choice(num_vectors, train_sample, replace=False)]
+        logger.info(f"Training {index_type} index (nlist={nlist}) on {len(train_vectors)} vectors")
+        index.train(train_vectors)
+        index.nprobe = params.get("nprobe", 16)
+
+    elif index_type == "hnsw":
+        index = faiss.IndexHNSWFlat(dimension, params.get("hnsw_m", 32))
+        index.hnsw.efConstruction = params.get("ef_construction", 200)
+        index.hnsw.efSearch = params.get("ef_search", 64)
+
+    else:
+        raise ValueError(f"Unknown index type '{index_type}', expected one of {INDEX_TYPES}")
+
+    if ids is None:
+        index.add(embeddings)
+        return index
+
+    if not isinstance(index, faiss.IndexIVF):
+        index = faiss.IndexIDMap2(index)
+    index.add_with_ids(embeddings, np.asarray(ids, dtype="int64"))
+    return index
+
+def supports_removal(index: faiss.Index) -> bool:
+    """Whether chunks can be removed by id (needed for incremental updates)"""
+    if isinstance(index, faiss.IndexIVF):
+        return True
+    return isinstance(index, faiss.IndexIDMap2) and not isinstance(faiss.downcast_index(index.index), faiss.IndexHNSW)
+
+def search_parameters(index: faiss.Index, nprobe: Optional[int] = None,
+                      ef_search: Optional[int] = None) -> Optional[faiss.SearchParameters]:
+    """Per-query search parameters for IVF/HNSW indexes (None for exact indexes)"""
+    if isinstance(index, faiss.IndexIDMap):
+        # IDMap passes search parameters through to the wrapped index
+        index = faiss.downcast_index(index.index)
+    if nprobe and isinstance(index, faiss.IndexIVF):
+        return faiss.SearchParametersIVF(nprobe=nprobe)
+    if ef_search and isinstance(index, faiss.IndexHNSW):
+        return faiss.SearchParametersHNSW(efSearch=ef_search)
+    return None
+
+def describe_index(index: faiss.Index) -> Dict[str, Any]:
+    """Type and tuning knobs of a loaded index for status reporting"""
+    info = {"type": type(index).__name__, "ntotal": index.ntotal}
+    if isinstance(index, faiss.IndexIDMap):
+        index = faiss.downcast_index(index.index)
+        info["inner_type"] = type(index).__name__
+    if isinstance(index, faiss.IndexIVF):
+        info.update({"nlist": index.nlist, "nprobe": index.nprobe})
+    if isinstance(index, faiss.IndexHNSW):
+        info.update({"ef_search": index.hnsw.efSearch})
+    return info
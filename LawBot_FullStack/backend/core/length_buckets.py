@@ -0,0 +1,38 @@
+"""
+LawBot Length Buckets
+Token-length ordering of encoder inputs so batches pad to similar lengths
+"""
+
+from typing import Sequence, Dict, Any, Optional
+
+import numpy as np
+
+def token_lengths(tokenizer, texts: Sequence[str], max_length: Optional[int] = None) -> np.ndarray:
+    """Encoder sequence length of every text (special tokens included, capped at max_length)"""
+    encoded = tokenizer(list(texts), add_special_tokens=True, truncation=False)["input_ids"]
+    lengths = np.fromiter((len(ids) for ids in encoded), dtype=np.int64, count=len(encoded))
+    return np.minimum(lengths, max_length) if max_length else lengths
+
+def length_order(lengths: np.ndarray) -> np.ndarray:
+    """Input positions sorted longest first (stable, so equal lengths keep file order)"""
+    return np.argsort(-lengths, kind="stable")
+
+def padding_waste(lengths: np.ndarray, batch_size: int, order: Optional[np.ndarray] = None) -> Dict[str, Any]:
+    """Padding share of the token slots when lengths are batched in the given order"""
+    ordered = lengths if order is None else lengths[order]
+    real = int(ordered.sum())
+    padded = 0
+    for start in range(0, len(ordered), batch_size):
+        batch = ordered[start:start + batch_size]
+        padded += int(batch.max()) * len(batch)
+    return {
+        "real_tokens": real,
+        "padded_tokens": padded,
+        "waste_ratio": round(1 - real / padded, 4) if padded else 0.0,
+    }
+
+def restore_order(embeddings: np.ndarray, order: np.ndarray) -> np.ndarray:
+    """Put embeddings computed in `order` back into input order"""
+    restored = np.empty_like(embeddings)
+    restored[order] = embeddings
+    return restored
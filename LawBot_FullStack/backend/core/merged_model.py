@@ -0,0 +1,66 @@
+"""
+LawBot Merged Model
+Folds the LoRA adapter into the base weights once and caches the result as safetensors
+"""
+
+import os
+import re
+import shutil
+import hashlib
+import logging
+from pathlib import Path
+
+import torch
+from transformers import AutoModelForCausalLM
+
+logger = logging.getLogger(__name__)
+
+def adapter_fingerprint(base_model: str, adapter_path) -> str:
+    """Hash of the base model id and every top-level adapter file (config + weights)"""
+    digest = hashlib.sha256(base_model.encode("utf-8"))
+    for path in sorted(Path(adapter_path).iterdir()):
+        if path.is_file():
+            digest.update(path.name.encode("utf-8"))
+            with open(path, "rb") as f:
+                for block in iter(lambda: f.read(1 << 20), b""):
+                    digest.update(block)
+    return digest.hexdigest()[:16]
+
+def merged_model_path(base_model: str, adapter_path, cache_dir) -> Path:
+    """Cache directory for one base-model + adapter combination"""
+    name = re.sub(r"[^\w.-]+", "_", base_model)
+    return Path(cache_dir) / f"{name}-{adapter_fingerprint(base_model, adapter_path)}"
+
+def load_merged_model(base_model: str, adapter_path, cache_dir, torch_dtype=torch.float32, device_map=None):
+    """
+    Load base model + LoRA adapter as a single merged model.
+
+    The first call merges in float32 (so small LoRA deltas are not rounded
+    away), saves the merged weights as safetensors under cache_dir and loads
+    them back; later calls load the cached checkpoint directly. Changing the
+    adapter files or the base model id produces a new cache entry.
+    """
+    target = merged_model_path(base_model, adapter_path, cache_dir)
+    if not (target / "config.json").exists():
+        from peft import PeftModel
+
+        logger.info(f"Merging LoRA adapter {adapter_path} into {base_model} (one-time)...")
+        base = AutoModelForCausalLM.from_pretrained(base_model, torch_dtype=torch.float32, low_cpu_mem_usage=True)
+        merged = PeftModel.from_pretrained(base, str(adapter_path)).merge_and_unload()
+
+        # Write next to the target and rename so a crash never leaves a half-written cache
+        staging = target.with_name(target.name + ".tmp")
+        shutil.rmtree(staging, ignore_errors=True)
+        merged.save_pretrained(staging, safe_serialization=True)
+        del merged, base
+        os.replace(staging, target)
+        logger.info(f"✅ Merged checkpoint saved to {target}")
+    else:
+        logger.info(f"Loading cached merged checkpoint {target}")
+
+    return AutoModelForCausalLM.from_pretrained(
+        target,
+        torch_dtype=torch_dtype,
+        device_map=device_map,
+        low_cpu_mem_usage=True,
+    )
@@ -0,0 +1,87 @@
+"""
+LawBot Micro-Batcher
+Coalesces concurrent single-item calls arriving within a few milliseconds into one batch call
+"""
+
+import queue
+import threading
+import time
+import logging
+from concurrent.futures import Future
+from typing import Callable, List, Any, Dict
+
+logger = logging.getLogger(__name__)
+
+class MicroBatcher:
+    """
+    Background thread that groups submitted items and runs batch_fn on them.
+
+    batch_fn receives a list of items and must return a list of results in the
+    same order. The first item of a batch waits at most max_wait_ms for
+    companions, so an idle server adds only that much latency.
+    """
+
+    def __init__(self, batch_fn: Callable[[List[Any]], List[Any]], max_batch_size: int = 32,
+                 max_wait_ms: float = 3, name: str = "lawbot-micro-batcher"):
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.name = name
+        self._items = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+        self.stats = {"items": 0, "batches": 0, "max_batch": 0}
+
+    def submit(self, item: Any) -> Future:
+        """Queue one item; the future resolves to its result"""
+        self._ensure_started()
+        future = Future()
+        self._items.put((item, future))
+        return future
+
+    def call(self, item: Any) -> Any:
+        """Submit one item and block until its batch has run"""
+        return self.submit(item).result()
+
+    def get_stats(self) -> Dict[str, Any]:
+        batches = self.stats["batches"]
+        return {
+            **self.stats,
+            "avg_batch": round(self.stats["items"] / batches, 2) if batches else 0.0,
+        }
+
+    def _ensure_started(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            batch = [self._items.get()]
+            deadline = time.perf_counter() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._items.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            items = [item for item, _ in batch]
+            self.stats["items"] += len(items)
+            self.stats["batches"] += 1
+            self.stats["max_batch"] = max(self.stats["max_batch"], len(items))
+
+            try:
+                results = self.batch_fn(items)
+                for (_, future), result in zip(batch, results):
+                    future.set_result(result)
+            except Exception as e:
+                logger.error(f"{self.name} batch failed: {e}")
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
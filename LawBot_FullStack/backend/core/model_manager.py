@@ -4,15 +4,29 @@ Handles loading and inference with the fine-tuned Qwen2.5-1.5B model
 """
 
 import torch
-from transformers import AutoTokenizer, AutoModelForCausalLM
+from transformers import (
+    AutoTokenizer,
+    AutoModelForCausalLM,
+    StoppingCriteria,
+    StoppingCriteriaList,
+    TextIteratorStreamer,
+)
 import logging
-from typing import Optional, Dict, Any
+import threading
+from typing import Optional, Dict, Any, Iterator
 import sys
 import os
 
 # Add the project root to Python path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
 
+from backend.core.generation_worker import GenerationWorker
+from backend.core.batch_scheduler import ContinuousBatchScheduler, from_legacy_cache
+from backend.core.prefix_cache import PrefixCache
+from backend.core.precision import resolve_precision, load_dtype, apply_precision
+from backend.core.merged_model import load_merged_model
+from backend.core.speculative import PromptLookupDecoder
+
 try:
     from config.settings import MODEL_CONFIG
 except ImportError:
@@ -23,48 +37,113 @@ except ImportError:
         "max_length": 2048,
         "temperature": 0.7,
         "top_p": 0.9,
+        "stream_timeout": 120,
+        "continuous_batching": True,
+        "max_batch_size": 8,
+        "max_batch_wait_ms": 10,
+        "prefix_cache": True,
+        "precision": "auto",
+        "merge_adapter": False,
+        "merged_model_dir": "models/merged",
+        "speculative_decoding": False,
+        "prompt_lookup_ngram": 3,
+        "prompt_lookup_draft_tokens": 10,
+        "max_prompt_tokens": 1536,
     }
 
 logger = logging.getLogger(__name__)
 
+SYSTEM_PROMPT = "You are LawBot, an expert legal assistant specializing in Indian law. Provide accurate, helpful responses about Indian legal matters. Always cite relevant laws and be clear about limitations."
+
+class _CancelCriteria(StoppingCriteria):
+    """Stops generation once the consumer of a stream goes away"""
+
+    def __init__(self, cancel_event: threading.Event):
+        self.cancel_event = cancel_event
+
+    def __call__(self, input_ids, scores, **kwargs) -> bool:
+        return self.cancel_event.is_set()
+
 class ModelManager:
     def __init__(self):
         self.model = None
         self.tokenizer = None
         self.device = "cuda" if torch.cuda.is_available() else "cpu"
         self.is_loaded = False
+        self.worker = GenerationWorker()
+        self.scheduler = None
+        self.prefix_cache = None
+        self.speculative = None
+        self.precision = None
+        self.adapter_merged = False
         
     def load_model(self) -> bool:
         """Load the fine-tuned model and tokenizer"""
+        if self.is_loaded:
+            return True
+        
         try:
             logger.info("Loading tokenizer...")
             self.tokenizer = AutoTokenizer.from_pretrained(MODEL_CONFIG["base_model"])
             
-            logger.info("Loading base model...")
-            base_model = AutoModelForCausalLM.from_pretrained(
-                MODEL_CONFIG["base_model"],
-                torch_dtype=torch.float16 if self.device == "cuda" else torch.float32,
-                device_map="auto" if self.device == "cuda" else None,
-            )
+            self.precision = resolve_precision(MODEL_CONFIG.get("precision", "auto"), self.device)
+            torch_dtype = load_dtype(self.precision)
+            device_map = "auto" if self.device == "cuda" else None
             
-            # Load LoRA adapters if they exist
             adapter_path = MODEL_CONFIG["adapter_path"]
             if isinstance(adapter_path, str):
                 adapter_path = os.path.abspath(adapter_path)
             
-            if os.path.exists(adapter_path):
-                logger.info(f"Loading LoRA adapters from {adapter_path}")
+            self.model = None
+            if MODEL_CONFIG.get("merge_adapter", False) and os.path.exists(adapter_path):
+                # Adapter folded into the base weights: no LoRA matmuls per token
+                logger.info(f"Loading merged model ({self.precision})...")
                 try:
-                    from peft import PeftModel
-                    self.model = PeftModel.from_pretrained(base_model, adapter_path)
-                    logger.info("✅ LoRA adapters loaded successfully!")
+                    self.model = load_merged_model(MODEL_CONFIG["base_model"], adapter_path,
+                                                   MODEL_CONFIG["merged_model_dir"], torch_dtype, device_map)
+                    self.adapter_merged = True
                 except ImportError:
-                    logger.warning("PEFT not available, using base model")
-                    self.model = base_model
+                    logger.warning("PEFT not available, cannot merge adapters")
+            if self.model is None:
+                self.model = self._load_with_adapter(adapter_path, torch_dtype, device_map)
+            
+            # Cast/quantize after the adapter is attached so its layers are covered too
+            if self.precision == "int8" and hasattr(self.model, "merge_and_unload"):
+                # int8 merges an attached adapter before quantizing
+                self.adapter_merged = True
+            self.model = apply_precision(self.model, self.precision)
+            self.model.eval()
+            if MODEL_CONFIG.get("prefix_cache", False):
+                # Prefill the system preamble once; every request reuses its KV cache
+                self.prefix_cache = PrefixCache(self.model, self.tokenizer, self.device)
+                self.prefix_cache.get(self._prompt_prefix())
+            
+            if MODEL_CONFIG.get("speculative_decoding", False):
+                # Batch-of-one prompt-lookup decoding on the worker thread (replaces continuous batching)
+                self.speculative = PromptLookupDecoder(
+                    self.model,
+                    self.tokenizer,
+                    self.device,
+                    temperature=MODEL_CONFIG["temperature"],
+                    top_p=MODEL_CONFIG["top_p"],
+                    ngram_max=MODEL_CONFIG.get("prompt_lookup_ngram", 3),
+                    num_draft=MODEL_CONFIG.get("prompt_lookup_draft_tokens", 10),
+                )
+                self.worker.start()
+            elif MODEL_CONFIG.get("continuous_batching", False):
+                self.scheduler = ContinuousBatchScheduler(
+                    self.model,
+                    self.tokenizer,
+                    self.device,
+                    max_batch_size=MODEL_CONFIG.get("max_batch_size", 8),
+                    max_wait_ms=MODEL_CONFIG.get("max_batch_wait_ms", 10),
+                    temperature=MODEL_CONFIG["temperature"],
+                    top_p=MODEL_CONFIG["top_p"],
+                    prefix_cache=self.prefix_cache,
+                )
+                self.scheduler.start()
             else:
-                logger.warning(f"No LoRA adapters found at {adapter_path}")
-                logger.info("Using base model without fine-tuning")
-                self.model = base_model
+                self.worker.start()
             
             self.is_loaded = True
             logger.info("✅ Model loaded successfully!")
@@ -75,49 +154,208 @@ class ModelManager:
             self.is_loaded = False
             return False
     
-    def generate_response(self, prompt: str, max_tokens: int = 256) -> str:
-        """Generate response using the loaded model"""
-        if not self.is_loaded:
-            return "Model not loaded. Please check the model configuration."
+    def _load_with_adapter(self, adapter_path: str, torch_dtype: torch.dtype, device_map):
+        """Base model with the LoRA adapter attached (if present)"""
+        logger.info(f"Loading base model ({self.precision})...")
+        base_model = AutoModelForCausalLM.from_pretrained(
+            MODEL_CONFIG["base_model"],
+            torch_dtype=torch_dtype,
+            device_map=device_map,
+        )
         
-        try:
-            # Format prompt with chat template
-            formatted_prompt = f"""<|im_start|>system
-You are LawBot, an expert legal assistant specializing in Indian law. Provide accurate, helpful responses about Indian legal matters. Always cite relevant laws and be clear about limitations.
+        # Load LoRA adapters if they exist
+        if os.path.exists(adapter_path):
+            logger.info(f"Loading LoRA adapters from {adapter_path}")
+            try:
+                from peft import PeftModel
+                model = PeftModel.from_pretrained(base_model, adapter_path)
+                logger.info("✅ LoRA adapters loaded successfully!")
+                return model
+            except ImportError:
+                logger.warning("PEFT not available, using base model")
+                return base_model
+        
+        logger.warning(f"No LoRA adapters found at {adapter_path}")
+        logger.info("Using base model without fine-tuning")
+        return base_model
+    
+    def _prompt_prefix(self) -> str:
+        """Fixed part of the Qwen chat template that precedes every user prompt"""
+        return f"""<|im_start|>system
+{SYSTEM_PROMPT}
 <|im_end|>
 <|im_start|>user
-{prompt}
+"""
+    
+    def format_prompt(self, prompt: str) -> str:
+        """Complete model input for a user prompt (used to measure prompt tokens)"""
+        return self._format_prompt(prompt)
+    
+    def _format_prompt(self, prompt: str) -> str:
+        """Wrap a user prompt in the Qwen chat template"""
+        return f"""{self._prompt_prefix()}{prompt}
 <|im_end|>
 <|im_start|>assistant
 """
+    
+    def _prompt_ids(self, prompt: str):
+        """Token ids of the formatted prompt plus the cached prefix entry, if any"""
+        if self.prefix_cache is None:
+            return self.tokenizer(self._format_prompt(prompt))["input_ids"], None
+        
+        # Tokenize the prefix and the rest separately so the ids line up with the cached prefix
+        prefix = self.prefix_cache.get(self._prompt_prefix())
+        suffix = self._format_prompt(prompt)[len(self._prompt_prefix()):]
+        return prefix.token_ids + self.tokenizer(suffix, add_special_tokens=False)["input_ids"], prefix
+    
+    def _prepare_inputs(self, prompt: str) -> Dict[str, Any]:
+        """Tokenize a prompt for generate(), attaching the prefix cache when available"""
+        token_ids, prefix = self._prompt_ids(prompt)
+        input_ids = torch.tensor([token_ids], dtype=torch.long, device=self.device)
+        inputs = {"input_ids": input_ids, "attention_mask": torch.ones_like(input_ids)}
+        if prefix is not None:
+            # DynamicCache appends by concatenation, so the shared prefix tensors are never mutated
+            inputs["past_key_values"] = from_legacy_cache(prefix.past_key_values)
+            self.prefix_cache.record_hit(prefix)
+        return inputs
+    
+    def _generation_kwargs(self, max_tokens: int) -> Dict[str, Any]:
+        """Sampling settings shared by blocking and streaming generation"""
+        return {
+            "max_new_tokens": max_tokens,
+            "temperature": MODEL_CONFIG["temperature"],
+            "top_p": MODEL_CONFIG["top_p"],
+            "do_sample": True,
+            "pad_token_id": self.tokenizer.eos_token_id,
+            "eos_token_id": self.tokenizer.eos_token_id,
+        }
+    
+    def _generate(self, prompt: str, max_tokens: int) -> str:
+        """Run generate() for one prompt (called on the worker thread)"""
+        if self.speculative is not None:
+            return self._generate_speculative(prompt, max_tokens)
+        
+        inputs = self._prepare_inputs(prompt)
+        
+        with torch.no_grad():
+            outputs = self.model.generate(**inputs, **self._generation_kwargs(max_tokens))
+        
+        # Decode only the newly generated tokens
+        new_tokens = outputs[0][inputs["input_ids"].shape[1]:]
+        return self.tokenizer.decode(new_tokens, skip_special_tokens=True).strip()
+    
+    def _generate_streaming(self, prompt: str, max_tokens: int, streamer: TextIteratorStreamer,
+                            cancel_event: threading.Event):
+        """Run generate() feeding tokens into a streamer (called on the worker thread)"""
+        try:
+            if self.speculative is not None:
+                self._generate_speculative(prompt, max_tokens, streamer, cancel_event)
+                streamer.end()
+                return
             
-            # Tokenize input
-            inputs = self.tokenizer(formatted_prompt, return_tensors="pt")
-            if self.device == "cuda":
-                inputs = {k: v.to(self.device) for k, v in inputs.items()}
-            
-            # Generate response
+            inputs = self._prepare_inputs(prompt)
             with torch.no_grad():
-                outputs = self.model.generate(
+                self.model.generate(
                     **inputs,
-                    max_new_tokens=max_tokens,
-                    temperature=MODEL_CONFIG["temperature"],
-                    top_p=MODEL_CONFIG["top_p"],
-                    do_sample=True,
-                    pad_token_id=self.tokenizer.eos_token_id,
-                    eos_token_id=self.tokenizer.eos_token_id,
+                    **self._generation_kwargs(max_tokens),
+                    streamer=streamer,
+                    stopping_criteria=StoppingCriteriaList([_CancelCriteria(cancel_event)]),
                 )
-            
-            # Decode response
-            response = self.tokenizer.decode(outputs[0], skip_special_tokens=True)
-            response = response.split("<|im_start|>assistant\n")[-1].strip()
-            
-            return response
+        except Exception:
+            # Unblock the consumer before surfacing the error through the future
+            streamer.end()
+            raise
+    
+    def _generate_speculative(self, prompt: str, max_tokens: int, streamer: Optional[TextIteratorStreamer] = None,
+                              cancel_event: Optional[threading.Event] = None) -> str:
+        """Prompt-lookup speculative decoding for one prompt (called on the worker thread)"""
+        token_ids, prefix = self._prompt_ids(prompt)
+        if prefix is not None:
+            self.prefix_cache.record_hit(prefix)
+        
+        on_tokens = None
+        if streamer is not None:
+            # skip_prompt drops the first put, so hand the streamer the prompt first
+            streamer.put(torch.tensor(token_ids))
+            on_tokens = lambda tokens: streamer.put(torch.tensor(tokens))
+        
+        new_tokens = self.speculative.generate(token_ids, max_tokens, prefix=prefix,
+                                               on_tokens=on_tokens, cancel_event=cancel_event)
+        return self.tokenizer.decode(new_tokens, skip_special_tokens=True).strip()
+    
+    def generate_response(self, prompt: str, max_tokens: int = 256) -> str:
+        """Generate response using the loaded model"""
+        if not self.is_loaded:
+            return "Model not loaded. Please check the model configuration."
+        
+        try:
+            if self.scheduler is not None:
+                token_ids, prefix = self._prompt_ids(prompt)
+                request = self.scheduler.submit(token_ids, max_tokens, prefix=prefix)
+                return self.tokenizer.decode(request.future.result(), skip_special_tokens=True).strip()
+            return self.worker.submit(self._generate, prompt, max_tokens).result()
             
         except Exception as e:
             logger.error(f"Error generating response: {e}")
             return f"I apologize, but I encountered an error processing your question. Please try again."
     
+    def stream_response(self, prompt: str, max_tokens: int = 256) -> Iterator[str]:
+        """Generate a response, yielding decoded text pieces as they are produced"""
+        if not self.is_loaded:
+            yield "Model not loaded. Please check the model configuration."
+            return
+        
+        if self.scheduler is not None:
+            yield from self._stream_from_scheduler(prompt, max_tokens)
+            return
+        
+        streamer = TextIteratorStreamer(
+            self.tokenizer,
+            skip_prompt=True,
+            skip_special_tokens=True,
+            timeout=MODEL_CONFIG.get("stream_timeout", 120),
+        )
+        cancel_event = threading.Event()
+        future = self.worker.submit(self._generate_streaming, prompt, max_tokens, streamer, cancel_event)
+        
+        try:
+            for text in streamer:
+                if text:
+                    yield text
+            # Re-raise anything the worker hit after the stream ended
+            future.result()
+        finally:
+            # Consumer went away (client disconnect) - stop decoding early
+            cancel_event.set()
+            future.cancel()
+    
+    def _stream_from_scheduler(self, prompt: str, max_tokens: int) -> Iterator[str]:
+        """Yield text deltas for a request running in the continuous batch"""
+        token_ids, prefix = self._prompt_ids(prompt)
+        request = self.scheduler.submit(token_ids, max_tokens, stream=True, prefix=prefix)
+        timeout = MODEL_CONFIG.get("stream_timeout", 120)
+        token_ids = []
+        emitted = ""
+        
+        try:
+            while True:
+                item = request.tokens.get(timeout=timeout)
+                if item is None:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                
+                token_ids.append(item)
+                text = self.tokenizer.decode(token_ids, skip_special_tokens=True)
+                # Hold back incomplete multi-byte characters until the next token arrives
+                if text.endswith("\ufffd"):
+                    continue
+                if len(text) > len(emitted):
+                    yield text[len(emitted):]
+                    emitted = text
+        finally:
+            request.cancel()
+    
     def get_model_info(self) -> Dict[str, Any]:
         """Get model information"""
         adapter_path = MODEL_CONFIG["adapter_path"]
@@ -127,7 +365,13 @@ You are LawBot, an expert legal assistant specializing in Indian law. Provide ac
         return {
             "is_loaded": self.is_loaded,
             "device": self.device,
+            "precision": self.precision,
             "base_model": MODEL_CONFIG["base_model"],
             "adapter_path": str(adapter_path),
             "has_adapters": os.path.exists(adapter_path),
+            "adapter_merged": self.adapter_merged,
+            "pending_generations": self.worker.pending(),
+            "batching": self.scheduler.get_stats() if self.scheduler else None,
+            "prefix_cache": self.prefix_cache.get_stats() if self.prefix_cache else None,
+            "speculative": self.speculative.get_stats() if self.speculative else None,
         }
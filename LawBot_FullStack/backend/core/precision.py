@@ -0,0 +1,49 @@
+"""
+LawBot Precision
+Load dtype and post-load quantization for the Qwen model (float32, bfloat16, int8)
+"""
+
+import logging
+
+import torch
+
+logger = logging.getLogger(__name__)
+
+PRECISIONS = ("auto", "float32", "bfloat16", "int8")
+
+def resolve_precision(precision: str, device: str) -> str:
+    """Concrete precision for a device; auto keeps float16 on CUDA and float32 on CPU"""
+    precision = precision or "auto"
+    if precision not in PRECISIONS:
+        raise ValueError(f"Unknown precision '{precision}', expected one of {PRECISIONS}")
+    if precision == "auto":
+        return "float16" if device == "cuda" else "float32"
+    if precision == "int8" and device != "cpu":
+        # Dynamic quantized Linear kernels only exist on CPU
+        logger.warning("int8 precision is CPU-only; falling back to float16 on CUDA")
+        return "float16"
+    return precision
+
+def load_dtype(precision: str) -> torch.dtype:
+    """dtype to pass to from_pretrained for a resolved precision"""
+    return {
+        "float16": torch.float16,
+        "bfloat16": torch.bfloat16,
+        # int8 quantizes from float32 weights
+        "int8": torch.float32,
+    }.get(precision, torch.float32)
+
+def apply_precision(model, precision: str):
+    """Cast or quantize a loaded model (call after the LoRA adapter is attached)"""
+    if precision == "bfloat16":
+        # Adapter weights are loaded in float32; bring them in line with the base model
+        return model.to(torch.bfloat16)
+    if precision == "int8":
+        if hasattr(model, "merge_and_unload"):
+            # Quantizing peft's lora_A/lora_B Linears breaks its forward (their .weight becomes a method);
+            # fold the adapter into the base weights first
+            logger.info("Merging LoRA adapter before int8 quantization")
+            model = model.merge_and_unload()
+        logger.info("Applying dynamic int8 quantization to Linear layers")
+        return torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    return model
@@ -0,0 +1,81 @@
+"""
+LawBot Prefix Cache
+Keeps the KV cache of the fixed system-prompt preamble so it is prefilled once
+"""
+
+import hashlib
+import threading
+import logging
+from typing import Dict, Any, List
+
+import torch
+
+from backend.core.batch_scheduler import to_legacy_cache
+
+logger = logging.getLogger(__name__)
+
+class PrefixEntry:
+    """Token ids and past_key_values for one prompt-template prefix"""
+
+    def __init__(self, key: str, token_ids: List[int], past_key_values):
+        self.key = key
+        self.token_ids = token_ids
+        self.past_key_values = past_key_values
+        self.length = len(token_ids)
+
+class PrefixCache:
+    """Prefix KV caches keyed by a hash of the template text"""
+
+    def __init__(self, model, tokenizer, device: str):
+        self.model = model
+        self.tokenizer = tokenizer
+        self.device = device
+        self._entries: Dict[str, PrefixEntry] = {}
+        self._lock = threading.Lock()
+        self.stats = {
+            "builds": 0,
+            "hits": 0,
+            "prefill_tokens_saved": 0,
+        }
+
+    @staticmethod
+    def template_key(prefix_text: str) -> str:
+        return hashlib.sha256(prefix_text.encode("utf-8")).hexdigest()[:16]
+
+    def get(self, prefix_text: str) -> PrefixEntry:
+        """Return the cached entry for a prefix, building it if the template changed"""
+        key = self.template_key(prefix_text)
+        entry = self._entries.get(key)
+        if entry is not None:
+            return entry
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._build(key, prefix_text)
+                # A new template supersedes the old one; drop stale caches
+                self._entries = {key: entry}
+        return entry
+
+    def record_hit(self, entry: PrefixEntry, rows: int = 1):
+        """Count prefill tokens skipped because the prefix cache was reused"""
+        self.stats["hits"] += rows
+        self.stats["prefill_tokens_saved"] += entry.length * rows
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "templates": list(self._entries.keys()),
+            "prefix_tokens": next(iter(self._entries.values())).length if self._entries else 0,
+        }
+
+    def _build(self, key: str, prefix_text: str) -> PrefixEntry:
+        token_ids = self.tokenizer(prefix_text)["input_ids"]
+        input_ids = torch.tensor([token_ids], dtype=torch.long, device=self.device)
+
+        with torch.no_grad():
+            outputs = self.model(input_ids=input_ids, use_cache=True)
+
+        self.stats["builds"] += 1
+        logger.info(f"Prefix cache built for template {key} ({len(token_ids)} tokens)")
+        return PrefixEntry(key, token_ids, to_legacy_cache(outputs.past_key_values))
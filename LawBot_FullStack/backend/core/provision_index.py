@@ -0,0 +1,135 @@
+"""
+LawBot Provision Index
+Exact (statute, section/article) -> chunk id lookup for queries that name a provision directly
+"""
+
+import os
+import re
+import json
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+PROVISION_INDEX_FILE = "provision_index.json"
+VERSION = 1
+
+STATUTES = {
+    "IPC": r"i\.?\s?p\.?\s?c\.?|indian\s+penal\s+code|penal\s+code",
+    "CrPC": r"cr\.?\s?p\.?\s?c\.?|code\s+of\s+criminal\s+procedure|criminal\s+procedure\s+code",
+    "Constitution": r"constitution(?:\s+of\s+india)?",
+}
+_STATUTE = "|".join(f"(?:{pattern})" for pattern in STATUTES.values())
+_STATUTE_PATTERNS = {name: re.compile(rf"(?:{pattern})", re.I) for name, pattern in STATUTES.items()}
+STATUTE_PATTERN = re.compile(rf"\b(?:{_STATUTE})(?![a-z])", re.I)
+
+# "IPC Section 302", "Section 154 CrPC", "s. 438 of the Cr.P.C.", "Article 21A"
+PROVISION_PATTERN = re.compile(
+    rf"(?:\b(?P<before>{_STATUTE})\s*,?\s*)?"
+    r"\b(?P<kind>sections?|secs?\.?|s\.|articles?|arts?\.?)\s*(?P<number>\d+[a-z]?)\b"
+    rf"(?:\s*,?\s*(?:of\s+)?(?:the\s+)?(?P<after>{_STATUTE})(?![a-z]))?",
+    re.I,
+)
+
+Provision = Tuple[Optional[str], str]
+
+def statute_name(text: Optional[str]) -> Optional[str]:
+    """Canonical statute name ("IPC", "CrPC", "Constitution") for a mention or source label"""
+    if not text:
+        return None
+    for name, pattern in _STATUTE_PATTERNS.items():
+        if pattern.fullmatch(text.strip()):
+            return name
+    return None
+
+def extract_provisions(text: str, default_statute: Optional[str] = None) -> List[Provision]:
+    """
+    (statute, number) pairs named in text, in order of appearance.
+
+    An article without a statute is a constitutional article; a section
+    without one takes default_statute, or None when that is unknown too.
+    """
+    provisions = []
+    for match in PROVISION_PATTERN.finditer(text):
+        statute = statute_name(match.group("before") or match.group("after"))
+        if statute is None:
+            statute = "Constitution" if match.group("kind").lower().startswith("art") else default_statute
+        provisions.append((statute, match.group("number").lower()))
+    return provisions
+
+def provision_key(statute: str, number: str) -> str:
+    return f"{statute}:{number}"
+
+class ProvisionIndex:
+    """In-memory view of provision_index.json"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        with open(self.path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != VERSION:
+            raise ValueError(f"Unsupported provision index version {data.get('version')} in {self.path}")
+        self.provisions: Dict[str, List[int]] = data["provisions"]
+        # Number -> keys, for queries that name a section without its statute
+        self._by_number: Dict[str, List[str]] = defaultdict(list)
+        for key in self.provisions:
+            self._by_number[key.split(":", 1)[1]].append(key)
+
+    def __len__(self) -> int:
+        return len(self.provisions)
+
+    def lookup(self, query: str, limit: int) -> List[int]:
+        """
+        Chunk ids for the provisions a query names, best first.
+
+        Chunks are taken round-robin across the named provisions so that
+        "Section 302 vs Section 304 IPC" gets both sections into the top results.
+        """
+        provisions = extract_provisions(query)
+        named = {statute for statute, _ in provisions if statute}
+        # "Section 302 vs Section 304 IPC": one statute named in the query covers every section
+        default_statute = named.pop() if len(named) == 1 else None
+
+        keys = []
+        for statute, number in dict.fromkeys(provisions):
+            statute = statute or default_statute
+            candidates = [provision_key(statute, number)] if statute else self._by_number.get(number, [])
+            keys.extend(key for key in candidates if key in self.provisions and key not in keys)
+
+        chunk_ids: List[int] = []
+        seen = set()
+        lists = [self.provisions[key] for key in keys]
+        for rank in range(max((len(ids) for ids in lists), default=0)):
+            for ids in lists:
+                if rank < len(ids) and ids[rank] not in seen:
+                    seen.add(ids[rank])
+                    chunk_ids.append(ids[rank])
+                    if len(chunk_ids) >= limit:
+                        return chunk_ids
+        return chunk_ids
+
+    @staticmethod
+    def write(path, texts: Sequence[str], sources: Sequence[str] = None, ids: Sequence[int] = None) -> int:
+        """Index every provision mentioned in each chunk (sections default to the chunk's statute); returns key count"""
+        path = Path(path)
+        ids = list(range(len(texts))) if ids is None else [int(chunk_id) for chunk_id in ids]
+        mentions: Dict[str, Counter] = defaultdict(Counter)
+        for row, text in enumerate(texts):
+            default_statute = statute_name(sources[row]) if sources else None
+            if default_statute is None:
+                # e.g. the trailing "Source: CrPC" line chunks are built with
+                found = STATUTE_PATTERN.findall(text)
+                default_statute = statute_name(found[-1]) if found else None
+            for statute, number in extract_provisions(text, default_statute):
+                if statute:
+                    mentions[provision_key(statute, number)][ids[row]] += 1
+
+        # Chunks that mention a provision most often (usually the ones about it) come first
+        provisions = {
+            key: [chunk_id for chunk_id, _ in sorted(counts.items(), key=lambda item: (-item[1], item[0]))]
+            for key, counts in mentions.items()
+        }
+        tmp_path = path.with_suffix(path.suffix + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": VERSION, "provisions": provisions}, f)
+        os.replace(tmp_path, path)
+        return len(provisions)
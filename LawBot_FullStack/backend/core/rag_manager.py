@@ -3,13 +3,20 @@ LawBot RAG Manager
 Handles document retrieval and context generation using FAISS
 """
 
-import json
+import time
+import threading
 import faiss
 import numpy as np
+from pathlib import Path
 from sentence_transformers import SentenceTransformer
 from typing import List, Dict, Any, Optional
 import logging
 from config.settings import RAG_CONFIG
+from backend.core.chunk_store import load_chunks
+from backend.core.index_factory import search_parameters, describe_index
+from backend.core.micro_batcher import MicroBatcher
+from backend.core.sparse_index import SparseIndex, SPARSE_INDEX_FILE, reciprocal_rank_fusion
+from backend.core.provision_index import ProvisionIndex, PROVISION_INDEX_FILE
 
 logger = logging.getLogger(__name__)
 
@@ -19,27 +26,65 @@ class RAGManager:
         self.index = None
         self.chunks = []
         self.metadata_list = []
+        self.sparse_index = None
+        self.provision_index = None
         self.is_loaded = False
+        self._latency_lock = threading.Lock()
+        self._latency = {"queries": 0, "dense_ms": 0.0, "sparse_ms": 0.0}
+        self._provision_stats = {"queries_matched": 0, "encoder_skipped": 0, "merged_with_dense": 0}
+        self._encode_batcher = None
+        self._retrieve_batcher = None
+        if RAG_CONFIG.get("micro_batching", False):
+            max_size = RAG_CONFIG.get("micro_batch_max_size", 32)
+            max_wait_ms = RAG_CONFIG.get("micro_batch_wait_ms", 3)
+            self._encode_batcher = MicroBatcher(
+                lambda queries: list(self.encode_queries(queries)[:, None, :]),
+                max_size, max_wait_ms, name="lawbot-encode-batcher",
+            )
+            self._retrieve_batcher = MicroBatcher(
+                self._retrieve_batch_items, max_size, max_wait_ms, name="lawbot-retrieve-batcher",
+            )
         
     def load_components(self) -> bool:
         """Load FAISS index, chunks, and metadata"""
+        if self.is_loaded:
+            return True
+        
         try:
             logger.info("Loading embedding model...")
             self.embedding_model = SentenceTransformer(RAG_CONFIG["embedding_model"])
             
             # Load FAISS index
-            if RAG_CONFIG["vectorstore_path"].exists():
-                logger.info(f"Loading FAISS index from {RAG_CONFIG['vectorstore_path']}")
-                self.index = faiss.read_index(str(RAG_CONFIG["vectorstore_path"] / "faiss_index.idx"))
+            vectorstore_path = Path(RAG_CONFIG["vectorstore_path"])
+            if vectorstore_path.exists():
+                logger.info(f"Loading FAISS index from {vectorstore_path}")
+                self.index = faiss.read_index(str(vectorstore_path / "faiss_index.idx"))
                 logger.info(f"✅ FAISS index loaded: {self.index.ntotal} vectors")
                 
-                # Load chunks and metadata
-                with open(RAG_CONFIG["chunks_path"], 'r') as f:
-                    self.chunks = json.load(f)
-                with open(RAG_CONFIG["metadata_path"], 'r') as f:
-                    self.metadata_list = json.load(f)
+                # Load chunks and metadata (mmapped chunk store, JSON for older vectorstores)
+                self.chunks, self.metadata_list = load_chunks(
+                    vectorstore_path, RAG_CONFIG["chunks_path"], RAG_CONFIG["metadata_path"]
+                )
                 logger.info(f"✅ Loaded {len(self.chunks)} chunks and metadata")
                 
+                # BM25 leg of hybrid retrieval (dense-only when the sparse index was never built)
+                sparse_file = vectorstore_path / SPARSE_INDEX_FILE
+                if RAG_CONFIG.get("hybrid_search", False):
+                    if sparse_file.exists():
+                        self.sparse_index = SparseIndex(sparse_file, RAG_CONFIG.get("bm25_k1", 1.2), RAG_CONFIG.get("bm25_b", 0.75))
+                        logger.info(f"✅ Sparse index loaded: {len(self.sparse_index)} chunks, {self.sparse_index.num_terms} terms")
+                    else:
+                        logger.warning(f"No {SPARSE_INDEX_FILE} in {vectorstore_path} - run scripts/build_sparse_index.py for hybrid search")
+                
+                # Exact statute/section lookup for queries that name a provision
+                provision_file = vectorstore_path / PROVISION_INDEX_FILE
+                if RAG_CONFIG.get("provision_lookup", False):
+                    if provision_file.exists():
+                        self.provision_index = ProvisionIndex(provision_file)
+                        logger.info(f"✅ Provision index loaded: {len(self.provision_index)} provisions")
+                    else:
+                        logger.warning(f"No {PROVISION_INDEX_FILE} in {vectorstore_path} - run scripts/build_provision_index.py for exact lookups")
+                
                 self.is_loaded = True
                 return True
             else:
@@ -53,55 +98,187 @@ class RAGManager:
             self.is_loaded = False
             return False
     
-    def retrieve_context(self, query: str, top_k: int = None) -> Dict[str, Any]:
-        """Retrieve relevant context for a query"""
+    def encode_query(self, query: str) -> Optional[np.ndarray]:
+        """Embed a query with the retrieval encoder (None when RAG is unavailable)"""
         if not self.is_loaded:
-            return {
-                "context": "",
-                "citations": [],
-                "confidence": "low",
-                "message": "RAG not available - using model knowledge only"
-            }
+            return None
+        if self._encode_batcher is not None:
+            return self._encode_batcher.call(query)
+        return self.embedding_model.encode([query])
+    
+    def encode_queries(self, queries: List[str]) -> np.ndarray:
+        """Embed many queries in one padded encoder batch"""
+        return self.embedding_model.encode(queries, batch_size=max(len(queries), 1), convert_to_numpy=True)
+    
+    def retrieve_context(self, query: str, top_k: int = None, query_embedding: np.ndarray = None,
+                         nprobe: int = None, ef_search: int = None) -> Dict[str, Any]:
+        """Retrieve relevant context for a query, reusing a precomputed query embedding if given"""
+        if not self.is_loaded:
+            return self._unavailable_result()
+        
+        # Queries naming a provision are served from the exact index without touching the encoder
+        if self.skips_encoder(query):
+            return self.retrieve_context_batch([query], top_k)[0]
+        
+        # Default-parameter lookups from concurrent requests share one encoder pass and FAISS search
+        if self._retrieve_batcher is not None and top_k is None and nprobe is None and ef_search is None:
+            return self._retrieve_batcher.call((query, query_embedding))
+        
+        return self.retrieve_context_batch([query], top_k, [query_embedding], nprobe, ef_search)[0]
+    
+    def retrieve_context_batch(self, queries: List[str], top_k: int = None,
+                               query_embeddings: List[Optional[np.ndarray]] = None,
+                               nprobe: int = None, ef_search: int = None) -> List[Dict[str, Any]]:
+        """Retrieve context for many queries with one encoder batch and one FAISS search"""
+        if not self.is_loaded:
+            return [self._unavailable_result() for _ in queries]
         
         try:
             top_k = top_k or RAG_CONFIG["top_k"]
+            dimension = self.index.d
+            # With hybrid search each leg contributes a deeper candidate list to the fusion
+            candidates = max(top_k, RAG_CONFIG.get("hybrid_candidates", 20)) if self.sparse_index else top_k
             
-            # Generate query embedding
-            query_embedding = self.embedding_model.encode([query])
-            
-            # Search FAISS index
-            scores, indices = self.index.search(query_embedding, top_k)
+            # Exact provision hits; unless merging is on, those queries skip the dense/sparse search
+            exact = [self.provision_hits(query, top_k) for query in queries]
+            merge = RAG_CONFIG.get("provision_merge_dense", False)
+            search_rows = [row for row in range(len(queries)) if merge or not exact[row]]
             
-            # Process results
-            context_parts = []
-            citations = []
+            # Encode only the queries that don't already carry an embedding
+            started = time.perf_counter()
+            query_matrix = np.empty((len(search_rows), dimension), dtype="float32")
+            missing = []
+            for position, row in enumerate(search_rows):
+                embedding = query_embeddings[row] if query_embeddings else None
+                if embedding is None:
+                    missing.append(position)
+                else:
+                    query_matrix[position] = np.asarray(embedding, dtype="float32").reshape(-1)
+            if missing:
+                query_matrix[missing] = self.encode_queries([queries[search_rows[position]] for position in missing])
             
-            for i, (score, idx) in enumerate(zip(scores[0], indices[0])):
-                if idx < len(self.chunks) and score < RAG_CONFIG["similarity_threshold"]:
-                    context_parts.append(f"[{i+1}] {self.chunks[idx]}")
-                    if idx < len(self.metadata_list):
-                        source = self.metadata_list[idx].get('source', 'Unknown')
-                        citations.append(source)
+            # Search FAISS index (nprobe/efSearch only apply to approximate indexes)
+            dense_hits = {}
+            if search_rows:
+                params = search_parameters(
+                    self.index,
+                    nprobe=nprobe or RAG_CONFIG.get("nprobe"),
+                    ef_search=ef_search or RAG_CONFIG.get("ef_search"),
+                )
+                scores, indices = self.index.search(query_matrix, candidates, params=params)
+                # Dense hits within the distance threshold, nearest first
+                dense_hits = {
+                    row: [int(idx) for score, idx in zip(scores[position], indices[position])
+                          if 0 <= idx < len(self.chunks) and score < RAG_CONFIG["similarity_threshold"]]
+                    for position, row in enumerate(search_rows)
+                }
+            dense_ms = (time.perf_counter() - started) * 1000
             
-            context = "\n\n".join(context_parts)
-            unique_citations = list(set(citations))
+            results = []
+            sparse_total_ms = 0.0
+            for row, query in enumerate(queries):
+                if row not in dense_hits:
+                    result = self._build_result(exact[row])
+                    result["message"] = f"Retrieved {len(result['chunks'])} documents by provision lookup"
+                    result["retrieval_ms"] = {"dense": None, "sparse": None}
+                    results.append(result)
+                    continue
+                
+                ranked = dense_hits[row]
+                sparse_ms = None
+                if self.sparse_index is not None:
+                    started = time.perf_counter()
+                    sparse_ids, _ = self.sparse_index.search(query, candidates)
+                    sparse_ms = (time.perf_counter() - started) * 1000
+                    sparse_total_ms += sparse_ms
+                    ranked = reciprocal_rank_fusion([ranked, sparse_ids.tolist()], RAG_CONFIG.get("rrf_k", 60))
+                if exact[row]:
+                    # Named provisions lead, search results fill the remaining slots
+                    named = set(exact[row])
+                    ranked = exact[row] + [idx for idx in ranked if idx not in named]
+                result = self._build_result(ranked[:top_k])
+                result["retrieval_ms"] = {"dense": round(dense_ms, 2),
+                                          "sparse": round(sparse_ms, 2) if sparse_ms is not None else None}
+                results.append(result)
             
-            confidence = "high" if len(context_parts) > 0 else "low"
-            
-            return {
-                "context": context,
-                "citations": unique_citations,
-                "confidence": confidence,
-                "message": f"Retrieved {len(context_parts)} relevant documents"
-            }
+            with self._latency_lock:
+                self._latency["queries"] += len(search_rows)
+                self._latency["dense_ms"] += dense_ms
+                self._latency["sparse_ms"] += sparse_total_ms
+                matched = sum(1 for ids in exact if ids)
+                self._provision_stats["queries_matched"] += matched
+                self._provision_stats["encoder_skipped"] += len(queries) - len(search_rows)
+                self._provision_stats["merged_with_dense"] += matched if merge else 0
+            return results
             
         except Exception as e:
             logger.error(f"Error in RAG retrieval: {e}")
-            return {
+            return [{
                 "context": "",
                 "citations": [],
                 "confidence": "low",
                 "message": f"RAG error: {str(e)}"
+            } for _ in queries]
+    
+    def provision_hits(self, query: str, limit: int = None) -> List[int]:
+        """Chunk ids for the statute sections/articles a query names (empty without a provision index)"""
+        if self.provision_index is None:
+            return []
+        chunk_ids = self.provision_index.lookup(query, limit or RAG_CONFIG["top_k"])
+        return [idx for idx in chunk_ids if idx < len(self.chunks)]
+    
+    def skips_encoder(self, query: str) -> bool:
+        """True when retrieval for this query is served by the provision index alone"""
+        return (self.is_loaded and not RAG_CONFIG.get("provision_merge_dense", False)
+                and bool(self.provision_hits(query)))
+    
+    def _build_result(self, chunk_ids: List[int]) -> Dict[str, Any]:
+        """Turn ranked chunk ids into context, citations and confidence"""
+        context_parts = []
+        citations = []
+        
+        for i, idx in enumerate(chunk_ids):
+            if 0 <= idx < len(self.chunks):
+                context_parts.append(f"[{i+1}] {self.chunks[idx]}")
+                if idx < len(self.metadata_list):
+                    source = self.metadata_list[idx].get('source', 'Unknown')
+                    citations.append(source)
+        
+        context = "\n\n".join(context_parts)
+        unique_citations = list(set(citations))
+        
+        confidence = "high" if len(context_parts) > 0 else "low"
+        
+        return {
+            "context": context,
+            "chunks": context_parts,
+            "citations": unique_citations,
+            "confidence": confidence,
+            "message": f"Retrieved {len(context_parts)} relevant documents"
+        }
+    
+    def _unavailable_result(self) -> Dict[str, Any]:
+        return {
+            "context": "",
+            "chunks": [],
+            "citations": [],
+            "confidence": "low",
+            "message": "RAG not available - using model knowledge only"
+        }
+    
+    def _retrieve_batch_items(self, items: List[tuple]) -> List[Dict[str, Any]]:
+        queries = [query for query, _ in items]
+        embeddings = [embedding for _, embedding in items]
+        return self.retrieve_context_batch(queries, query_embeddings=embeddings)
+    
+    def get_retrieval_latency(self) -> Dict[str, Any]:
+        """Average per-query latency of the dense (encode + FAISS) and sparse (BM25) legs"""
+        with self._latency_lock:
+            queries = self._latency["queries"]
+            return {
+                "queries": queries,
+                "dense_ms_avg": round(self._latency["dense_ms"] / queries, 2) if queries else 0.0,
+                "sparse_ms_avg": round(self._latency["sparse_ms"] / queries, 2) if queries else 0.0,
             }
     
     def get_rag_info(self) -> Dict[str, Any]:
@@ -110,6 +287,22 @@ class RAGManager:
             "is_loaded": self.is_loaded,
             "embedding_model": RAG_CONFIG["embedding_model"],
             "total_vectors": self.index.ntotal if self.index else 0,
-            "total_chunks": len(self.chunks),
+            "index": describe_index(self.index) if self.index else None,
+            "total_chunks": getattr(self.chunks, "count", len(self.chunks)),
             "vectorstore_path": str(RAG_CONFIG["vectorstore_path"]),
+            "hybrid_search": {
+                "sparse_chunks": len(self.sparse_index),
+                "sparse_terms": self.sparse_index.num_terms,
+                "rrf_k": RAG_CONFIG.get("rrf_k", 60),
+                "candidates": RAG_CONFIG.get("hybrid_candidates", 20),
+            } if self.sparse_index else None,
+            "latency": self.get_retrieval_latency(),
+            "provision_lookup": {
+                "provisions": len(self.provision_index),
+                **self._provision_stats,
+            } if self.provision_index else None,
+            "micro_batching": {
+                "encode": self._encode_batcher.get_stats(),
+                "retrieve": self._retrieve_batcher.get_stats(),
+            } if self._retrieve_batcher else None,
         }
@@ -0,0 +1,161 @@
+"""
+LawBot Response Cache
+Exact-match LRU plus a semantic tier over query embeddings for chat answers
+"""
+
+import re
+import time
+import threading
+import logging
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+def normalize_query(query: str) -> str:
+    """Lowercase, drop punctuation and collapse whitespace"""
+    query = re.sub(r"[^\w\s]", " ", query.lower())
+    return " ".join(query.split())
+
+def numeric_tokens(query: str) -> frozenset:
+    """Section/article numbers, years and other number-bearing words ("438", "498a", "2023")"""
+    return frozenset(re.findall(r"\d+\w*", query.lower()))
+
+class ResponseCache:
+    """
+    Two-tier cache of chat results.
+
+    The exact tier is keyed by the normalized query text. The semantic tier
+    compares the (already computed) query embedding against every cached
+    entry and serves the nearest one when its cosine distance is within
+    max_distance and both queries mention the same numbers ("section 437"
+    and "section 438" embed almost identically). Entries expire after ttl_seconds and the least recently
+    used entry is evicted once max_entries is reached.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 3600,
+                 max_distance: float = 0.05, semantic: bool = True):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_distance = max_distance
+        self.semantic = semantic
+        self.version = None
+
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Stacked unit embeddings for the semantic tier, rebuilt lazily after changes
+        self._matrix = None
+        self._matrix_keys = []
+        self._matrix_numbers = []
+
+        self.stats = {
+            "exact_hits": 0,
+            "semantic_hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "expirations": 0,
+            "invalidations": 0,
+        }
+
+    def ensure_version(self, version: Any):
+        """Drop every entry when the vectorstore/adapter fingerprint changes"""
+        if version == self.version:
+            return
+        with self._lock:
+            if self.version is not None:
+                logger.info("Response cache invalidated (vectorstore or adapter changed)")
+                self.stats["invalidations"] += 1
+            self.version = version
+            self._entries.clear()
+            self._matrix = None
+
+    def get_exact(self, query: str) -> Optional[Dict[str, Any]]:
+        """Look up a cached result by normalized query text"""
+        key = normalize_query(query)
+        with self._lock:
+            entry = self._live_entry(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            self.stats["exact_hits"] += 1
+            return entry["result"]
+
+    def get_semantic(self, query: str, query_embedding: Optional[np.ndarray]) -> Optional[Dict[str, Any]]:
+        """Look up the nearest cached query within max_distance that has the same numbers"""
+        if not self.semantic or query_embedding is None:
+            self.stats["misses"] += 1
+            return None
+
+        with self._lock:
+            if self._matrix is None:
+                # Entries stored without an embedding only take part in the exact tier
+                self._matrix_keys = [k for k, e in self._entries.items() if e["embedding"] is not None]
+                self._matrix_numbers = [numeric_tokens(k) for k in self._matrix_keys]
+                if self._matrix_keys:
+                    self._matrix = np.stack([self._entries[k]["embedding"] for k in self._matrix_keys])
+
+            if self._matrix is not None:
+                distances = 1.0 - self._matrix @ self._unit(query_embedding)
+                numbers = numeric_tokens(query)
+                distances[np.array([n != numbers for n in self._matrix_numbers])] = np.inf
+                best = int(np.argmin(distances))
+                if distances[best] <= self.max_distance:
+                    key = self._matrix_keys[best]
+                    entry = self._live_entry(key)
+                    if entry is not None:
+                        self._entries.move_to_end(key)
+                        self.stats["semantic_hits"] += 1
+                        return entry["result"]
+
+            self.stats["misses"] += 1
+            return None
+
+    def put(self, query: str, query_embedding: Optional[np.ndarray], result: Dict[str, Any]):
+        """Store a chat result"""
+        key = normalize_query(query)
+        embedding = self._unit(query_embedding) if query_embedding is not None else None
+        with self._lock:
+            self._entries[key] = {
+                "result": result,
+                "embedding": embedding,
+                "created_at": time.monotonic(),
+            }
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats["evictions"] += 1
+            self._matrix = None
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._matrix = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.stats["exact_hits"] + self.stats["semantic_hits"] + self.stats["misses"]
+        hits = self.stats["exact_hits"] + self.stats["semantic_hits"]
+        return {
+            **self.stats,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+        }
+
+    def _live_entry(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if time.monotonic() - entry["created_at"] > self.ttl_seconds:
+            del self._entries[key]
+            self._matrix = None
+            self.stats["expirations"] += 1
+            return None
+        return entry
+
+    @staticmethod
+    def _unit(embedding: np.ndarray) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32).reshape(-1)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
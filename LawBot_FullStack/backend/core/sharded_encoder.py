@@ -0,0 +1,74 @@
+"""
+LawBot Sharded Encoder
+Multi-process sentence-transformers encoding for vectorstore builds
+"""
+
+import os
+import time
+import shutil
+import tempfile
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import List, Sequence, Callable, Optional
+
+import numpy as np
+
+# Per-worker encoder, loaded once by the pool initializer
+_worker_model = None
+
+def _init_worker(model_name: str, torch_threads: int):
+    global _worker_model
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    # Split the cores between workers instead of every worker using all of them
+    torch.set_num_threads(torch_threads)
+    _worker_model = SentenceTransformer(model_name, device="cpu")
+
+def _encode_shard(shard_index: int, texts: List[str], batch_size: int, output_dir: str) -> tuple:
+    embeddings = _worker_model.encode(texts, batch_size=batch_size, show_progress_bar=False, convert_to_numpy=True)
+    path = Path(output_dir) / f"shard_{shard_index:05d}.npy"
+    np.save(path, np.asarray(embeddings, dtype=np.float32))
+    return shard_index, len(texts), str(path)
+
+def encode_sharded(texts: Sequence[str], model_name: str, workers: int, batch_size: int = 32,
+                   shard_size: Optional[int] = None,
+                   progress: Optional[Callable[[int, int, float], None]] = None) -> np.ndarray:
+    """
+    Encode texts across a pool of worker processes, each loading the model once.
+
+    Texts are split into contiguous shards; every shard's float32 embeddings are
+    written to a temporary .npy file and the shards are merged back in input
+    order. progress(done, total, chunks_per_sec) is called as shards finish.
+    """
+    texts = list(texts)
+    if not texts:
+        return np.zeros((0, 0), dtype=np.float32)
+
+    workers = max(1, min(workers, len(texts)))
+    # Several shards per worker keeps the pool busy when shards finish unevenly
+    shard_size = shard_size or max(batch_size, -(-len(texts) // (workers * 4)))
+    shards = [texts[start:start + shard_size] for start in range(0, len(texts), shard_size)]
+    torch_threads = max(1, (os.cpu_count() or workers) // workers)
+
+    output_dir = tempfile.mkdtemp(prefix="lawbot-embed-")
+    shard_paths = [None] * len(shards)
+    try:
+        started = time.perf_counter()
+        done = 0
+        # spawn: torch and tokenizers are not fork-safe once initialised
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                                 initializer=_init_worker, initargs=(model_name, torch_threads)) as pool:
+            futures = [pool.submit(_encode_shard, i, shard, batch_size, output_dir) for i, shard in enumerate(shards)]
+            for future in as_completed(futures):
+                shard_index, count, path = future.result()
+                shard_paths[shard_index] = path
+                done += count
+                if progress:
+                    progress(done, len(texts), done / max(time.perf_counter() - started, 1e-9))
+
+        return np.concatenate([np.load(path) for path in shard_paths])
+    finally:
+        shutil.rmtree(output_dir, ignore_errors=True)
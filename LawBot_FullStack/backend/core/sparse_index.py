@@ -0,0 +1,187 @@
+"""
+LawBot Sparse Index
+On-disk inverted index with BM25 scoring for exact-token retrieval ("Section 438", "Article 21A")
+
+Layout (little endian, arrays first so every numpy view is aligned):
+    header      magic "LBSI", version, num_docs, num_terms, avg_doc_len,
+                doc_ids_pos, offsets_pos, doc_lens_pos, postings_pos, tfs_pos, terms_pos
+    doc_ids     num_docs x uint64 chunk id of each document row
+    offsets     (num_terms + 1) x uint64 start of each term's posting list
+    doc_lens    num_docs x uint32 tokens per document
+    postings    uint32 document rows, ascending within each term
+    tfs         uint16 term frequency for each posting
+    terms       JSON list of terms (term id = position)
+"""
+
+import json
+import mmap
+import os
+import re
+import struct
+from functools import reduce
+from pathlib import Path
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+MAGIC = b"LBSI"
+VERSION = 1
+HEADER = struct.Struct("<4sIIIdQQQQQQ")
+SPARSE_INDEX_FILE = "sparse_index.bin"
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or that the this to was were "
+    "what when where which who will with".split()
+)
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased alphanumeric tokens without stopwords ("Article 21A" -> ["article", "21a"])"""
+    return [token for token in TOKEN_PATTERN.findall(text.lower()) if token not in STOPWORDS]
+
+def is_identifier(token: str) -> bool:
+    """Section/article numbers and similar codes, which a relevant chunk has to contain"""
+    return any(char.isdigit() for char in token)
+
+class SparseIndex:
+    """Read-only, mmapped BM25 index over the chunk store"""
+
+    def __init__(self, path, k1: float = 1.2, b: float = 0.75):
+        self.path = Path(path)
+        self.k1 = k1
+        self.b = b
+        self._file = open(self.path, "rb")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        (magic, version, num_docs, num_terms, avg_doc_len, doc_ids_pos, offsets_pos,
+         doc_lens_pos, postings_pos, tfs_pos, terms_pos) = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{self.path} is not a LawBot sparse index")
+        if version != VERSION:
+            raise ValueError(f"Unsupported sparse index version {version} in {self.path}")
+
+        self.num_docs = num_docs
+        self.avg_doc_len = avg_doc_len
+        self._doc_ids = np.frombuffer(self._mmap, dtype="<u8", count=num_docs, offset=doc_ids_pos)
+        self._offsets = np.frombuffer(self._mmap, dtype="<u8", count=num_terms + 1, offset=offsets_pos)
+        self._doc_lens = np.frombuffer(self._mmap, dtype="<u4", count=num_docs, offset=doc_lens_pos)
+        num_postings = int(self._offsets[-1])
+        self._postings = np.frombuffer(self._mmap, dtype="<u4", count=num_postings, offset=postings_pos)
+        self._tfs = np.frombuffer(self._mmap, dtype="<u2", count=num_postings, offset=tfs_pos)
+        terms = json.loads(self._mmap[terms_pos:].decode("utf-8"))
+        self._term_ids = {term: term_id for term_id, term in enumerate(terms)}
+
+    def __len__(self) -> int:
+        return self.num_docs
+
+    @property
+    def num_terms(self) -> int:
+        return len(self._term_ids)
+
+    def postings(self, term: str) -> Tuple[np.ndarray, np.ndarray]:
+        """(document rows, term frequencies) of one term; empty arrays if unknown"""
+        term_id = self._term_ids.get(term)
+        if term_id is None:
+            return self._postings[:0], self._tfs[:0]
+        start, end = int(self._offsets[term_id]), int(self._offsets[term_id + 1])
+        return self._postings[start:end], self._tfs[start:end]
+
+    def search(self, query: str, top_k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        BM25 top-k as (chunk ids, scores), best first.
+
+        Every query term adds its BM25 weight to the documents in its posting
+        list. When the query names identifiers (tokens with digits), documents
+        containing all of them are found by intersecting those posting lists,
+        and only they are ranked if there are any.
+        """
+        terms = [term for term in dict.fromkeys(tokenize(query)) if term in self._term_ids]
+        if not terms or top_k <= 0:
+            return np.empty(0, dtype="int64"), np.empty(0, dtype="float32")
+
+        scores = np.zeros(self.num_docs, dtype="float32")
+        for term in terms:
+            rows, tfs = self.postings(term)
+            df = len(rows)
+            idf = np.log1p((self.num_docs - df + 0.5) / (df + 0.5))
+            tfs = tfs.astype("float32")
+            norm = self.k1 * (1.0 - self.b + self.b * self._doc_lens[rows] / self.avg_doc_len)
+            scores[rows] += idf * tfs * (self.k1 + 1.0) / (tfs + norm)
+
+        identifiers = [self.postings(term)[0] for term in terms if is_identifier(term)]
+        if identifiers:
+            # Shortest lists first keeps every intermediate intersection small
+            identifiers.sort(key=len)
+            candidates = reduce(lambda a, b: np.intersect1d(a, b, assume_unique=True), identifiers)
+            if len(candidates):
+                mask = np.zeros(self.num_docs, dtype=bool)
+                mask[candidates] = True
+                scores[~mask] = 0.0
+
+        hits = np.flatnonzero(scores)
+        if len(hits) > top_k:
+            hits = hits[np.argpartition(-scores[hits], top_k - 1)[:top_k]]
+        hits = hits[np.argsort(-scores[hits], kind="stable")]
+        return self._doc_ids[hits].astype("int64"), scores[hits]
+
+    def close(self):
+        # Drop numpy views before closing the map they point into
+        self._doc_ids = self._offsets = self._doc_lens = self._postings = self._tfs = None
+        self._mmap.close()
+        self._file.close()
+
+    @staticmethod
+    def write(path, texts: Sequence[str], ids: Sequence[int] = None):
+        """Build the inverted index for texts (addressed by ids) and replace the file atomically"""
+        path = Path(path)
+        doc_ids = np.arange(len(texts), dtype="<u8") if ids is None else np.asarray(ids, dtype="<u8")
+        if len(doc_ids) != len(texts):
+            raise ValueError("texts and ids must have the same length")
+
+        term_table = {}
+        token_terms = []
+        doc_lens = np.zeros(len(texts), dtype="<u4")
+        for row, text in enumerate(texts):
+            tokens = tokenize(text)
+            doc_lens[row] = len(tokens)
+            token_terms.append(np.fromiter(
+                (term_table.setdefault(token, len(term_table)) for token in tokens),
+                dtype="int64", count=len(tokens),
+            ))
+
+        # One (term, row) key per token; unique() sorts by term then row and counts duplicates
+        token_rows = np.repeat(np.arange(len(texts), dtype="int64"), doc_lens.astype("int64"))
+        all_terms = np.concatenate(token_terms) if token_terms else np.empty(0, dtype="int64")
+        keys, tfs = np.unique(all_terms * max(len(texts), 1) + token_rows, return_counts=True)
+        posting_terms, postings = np.divmod(keys, max(len(texts), 1))
+        offsets = np.zeros(len(term_table) + 1, dtype="<u8")
+        np.cumsum(np.bincount(posting_terms, minlength=len(term_table)), out=offsets[1:])
+
+        postings = postings.astype("<u4")
+        tfs = np.minimum(tfs, np.iinfo("u2").max).astype("<u2")
+        terms_json = json.dumps(list(term_table), ensure_ascii=False).encode("utf-8")
+        avg_doc_len = float(doc_lens.mean()) if len(doc_lens) and doc_lens.any() else 1.0
+
+        doc_ids_pos = HEADER.size
+        offsets_pos = doc_ids_pos + doc_ids.nbytes
+        doc_lens_pos = offsets_pos + offsets.nbytes
+        postings_pos = doc_lens_pos + doc_lens.nbytes
+        tfs_pos = postings_pos + postings.nbytes
+        terms_pos = tfs_pos + tfs.nbytes
+
+        tmp_path = path.with_suffix(path.suffix + ".tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, VERSION, len(texts), len(term_table), avg_doc_len,
+                                doc_ids_pos, offsets_pos, doc_lens_pos, postings_pos, tfs_pos, terms_pos))
+            for array in (doc_ids, offsets, doc_lens, postings, tfs):
+                f.write(array.tobytes())
+            f.write(terms_json)
+        os.replace(tmp_path, path)
+
+def reciprocal_rank_fusion(rankings: Sequence[Sequence[int]], k: int = 60) -> List[int]:
+    """Merge ranked id lists by summing 1 / (k + rank); ids ranked high by either list come first"""
+    fused = {}
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking):
+            fused[int(doc_id)] = fused.get(int(doc_id), 0.0) + 1.0 / (k + rank + 1)
+    return sorted(fused, key=fused.get, reverse=True)
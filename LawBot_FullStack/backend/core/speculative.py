@@ -0,0 +1,178 @@
+"""
+LawBot Speculative Decoding
+Draft-free prompt-lookup decoding: copy spans from the retrieved context and verify them in one forward pass
+"""
+
+import time
+import threading
+import logging
+from typing import List, Optional, Callable, Dict, Any
+
+import numpy as np
+import torch
+
+from backend.core.batch_scheduler import from_legacy_cache
+
+logger = logging.getLogger(__name__)
+
+def find_draft(tokens: List[int], ngram_max: int, ngram_min: int, num_draft: int) -> List[int]:
+    """
+    Tokens that followed the most recent earlier occurrence of the trailing n-gram.
+
+    Longer n-grams are tried first; an empty list means nothing matched.
+    """
+    arr = np.asarray(tokens, dtype=np.int64)
+    for n in range(min(ngram_max, len(arr) - 1), ngram_min - 1, -1):
+        tail = arr[-n:]
+        # Windows starting before the tail itself, so a match always has a continuation
+        windows = np.lib.stride_tricks.sliding_window_view(arr[:-1], n)
+        matches = np.nonzero((windows == tail).all(axis=1))[0]
+        if len(matches):
+            start = int(matches[-1]) + n
+            return arr[start:start + num_draft].tolist()
+    return []
+
+class PromptLookupDecoder:
+    """
+    Batch-of-one decode loop with prompt-lookup speculation.
+
+    Each step proposes up to num_draft tokens by matching the last n-gram
+    against the prompt (which carries the retrieved chunks) and the text so
+    far, then runs the pending token plus the draft through the model at
+    once. Draft tokens are accepted with the probability the model assigns
+    them (speculative sampling with a deterministic draft), so the output
+    distribution is the same as ordinary temperature/top-p sampling.
+    """
+
+    def __init__(self, model, tokenizer, device: str, temperature: float = 0.7, top_p: float = 0.9,
+                 ngram_max: int = 3, ngram_min: int = 1, num_draft: int = 10):
+        self.model = model
+        self.tokenizer = tokenizer
+        self.device = device
+        self.temperature = temperature
+        self.top_p = top_p
+        self.ngram_max = ngram_max
+        self.ngram_min = ngram_min
+        self.num_draft = num_draft
+        self.eos_token_id = tokenizer.eos_token_id
+        self._lock = threading.Lock()
+        self.stats = {
+            "requests": 0,
+            "forward_passes": 0,
+            "generated_tokens": 0,
+            "drafted_tokens": 0,
+            "accepted_tokens": 0,
+            "decode_seconds": 0.0,
+        }
+
+    def generate(self, input_ids: List[int], max_new_tokens: int, prefix=None,
+                 on_tokens: Optional[Callable[[List[int]], None]] = None,
+                 cancel_event: Optional[threading.Event] = None) -> List[int]:
+        """Generate up to max_new_tokens; on_tokens receives every accepted run of tokens"""
+        started = time.perf_counter()
+        generated: List[int] = []
+        forward_passes = drafted = accepted = 0
+
+        with torch.no_grad():
+            # Prefill (reusing the cached system-prompt prefix when given); starting from a
+            # cache object keeps transformers 4.x from returning a legacy tuple, which has no crop()
+            past = from_legacy_cache(())
+            prompt = input_ids
+            if prefix is not None:
+                past = from_legacy_cache(prefix.past_key_values)
+                prompt = input_ids[prefix.length:]
+            outputs = self.model(input_ids=self._tensor(prompt), past_key_values=past, use_cache=True)
+            past = outputs.past_key_values
+            forward_passes += 1
+            pending = int(self._sample(self._probs(outputs.logits[0, -1:]))[0])
+            new_tokens = [pending]
+
+            while True:
+                new_tokens = self._emit(generated, new_tokens, max_new_tokens, on_tokens)
+                if not new_tokens or (cancel_event is not None and cancel_event.is_set()):
+                    break
+
+                context = input_ids + generated
+                draft = find_draft(context, self.ngram_max, self.ngram_min,
+                                   min(self.num_draft, max_new_tokens - len(generated) - 1))
+                cache_length = len(context) - 1
+
+                outputs = self.model(input_ids=self._tensor([pending] + draft), past_key_values=past, use_cache=True)
+                past = outputs.past_key_values
+                forward_passes += 1
+                probs = self._probs(outputs.logits[0])
+
+                new_tokens = []
+                for i, token in enumerate(draft):
+                    if torch.rand(()) < probs[i, token]:
+                        new_tokens.append(token)
+                        continue
+                    # Rejected: sample from the model's distribution with the draft token removed
+                    residual = probs[i].clone()
+                    residual[token] = 0.0
+                    new_tokens.append(int(self._sample(residual[None])[0]))
+                    break
+                else:
+                    # Every draft token accepted: the last position yields one more for free
+                    new_tokens.append(int(self._sample(probs[len(draft):len(draft) + 1])[0]))
+
+                drafted += len(draft)
+                accepted += len(new_tokens) - 1
+                # Keep the cache for the pending token and the accepted draft tokens only
+                past.crop(cache_length + len(new_tokens))
+                pending = new_tokens[-1]
+
+        with self._lock:
+            self.stats["requests"] += 1
+            self.stats["forward_passes"] += forward_passes
+            self.stats["generated_tokens"] += len(generated)
+            self.stats["drafted_tokens"] += drafted
+            self.stats["accepted_tokens"] += accepted
+            self.stats["decode_seconds"] += time.perf_counter() - started
+        return generated
+
+    def _emit(self, generated: List[int], new_tokens: List[int], max_new_tokens: int,
+              on_tokens: Optional[Callable[[List[int]], None]]) -> List[int]:
+        """Append new tokens up to EOS / the token budget; returns [] once generation is over"""
+        new_tokens = new_tokens[:max_new_tokens - len(generated)]
+        finished = len(generated) + len(new_tokens) >= max_new_tokens
+        if self.eos_token_id in new_tokens:
+            new_tokens = new_tokens[:new_tokens.index(self.eos_token_id) + 1]
+            finished = True
+        generated.extend(new_tokens)
+        if on_tokens and new_tokens:
+            on_tokens(new_tokens)
+        return [] if finished else new_tokens
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = dict(self.stats)
+        drafted = stats["drafted_tokens"]
+        passes = stats["forward_passes"]
+        seconds = stats["decode_seconds"]
+        stats.update({
+            "acceptance_rate": round(stats["accepted_tokens"] / drafted, 3) if drafted else 0.0,
+            "tokens_per_forward": round(stats["generated_tokens"] / passes, 2) if passes else 0.0,
+            "tokens_per_sec": round(stats["generated_tokens"] / seconds, 2) if seconds else 0.0,
+            "decode_seconds": round(seconds, 2),
+        })
+        return stats
+
+    def _tensor(self, token_ids: List[int]) -> torch.Tensor:
+        return torch.tensor([token_ids], dtype=torch.long, device=self.device)
+
+    def _probs(self, logits: torch.Tensor) -> torch.Tensor:
+        """Temperature + top-p filtered distribution per row (one-hot argmax when temperature is 0)"""
+        logits = logits.float()
+        if self.temperature <= 0:
+            return torch.nn.functional.one_hot(logits.argmax(dim=-1), logits.shape[-1]).float()
+        probs = torch.softmax(logits / self.temperature, dim=-1)
+        sorted_probs, sorted_idx = torch.sort(probs, descending=True, dim=-1)
+        cumulative = sorted_probs.cumsum(dim=-1)
+        # Keep the smallest prefix whose mass reaches top_p (always at least one token)
+        sorted_probs[(cumulative - sorted_probs) > self.top_p] = 0.0
+        filtered = torch.zeros_like(probs).scatter_(-1, sorted_idx, sorted_probs)
+        return filtered / filtered.sum(dim=-1, keepdim=True)
+
+    @staticmethod
+    def _sample(probs: torch.Tensor) -> torch.Tensor:
+        return torch.multinomial(probs / probs.sum(dim=-1, keepdim=True), 1).squeeze(-1)
@@ -0,0 +1,92 @@
+"""
+LawBot Term Matcher
+Word-level Aho-Corasick automaton: finds every dictionary term in a query in one pass
+"""
+
+import re
+from collections import deque
+from typing import Any, Dict, Iterable, List, Tuple
+
+WORD_PATTERN = re.compile(r"\w+")
+
+def words(text: str) -> List[str]:
+    """Lowercased word tokens; terms and queries are matched on these, so matches never split a word"""
+    return WORD_PATTERN.findall(text.lower())
+
+class TermMatcher:
+    """
+    Multi-pattern matcher over word sequences.
+
+    Patterns are compiled once into a trie of words with failure links, so a
+    query is scanned word by word regardless of how many patterns there are.
+    Working on words instead of characters gives word-boundary matching for
+    free ("bail" does not match inside "bailable") and keeps the automaton to
+    one node per distinct word prefix.
+    """
+
+    def __init__(self, patterns: Iterable[Tuple[str, Any]]):
+        # Node 0 is the root; goto[n] maps a word to the next node
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[Tuple[str, Any]]] = [[]]
+        # Nearest node on the failure chain that has output (-1 = none)
+        self._output_link: List[int] = [-1]
+        self.size = 0
+
+        for pattern, payload in patterns:
+            tokens = words(pattern)
+            if not tokens:
+                continue
+            node = 0
+            for token in tokens:
+                next_node = self._goto[node].get(token)
+                if next_node is None:
+                    next_node = len(self._goto)
+                    self._goto[node][token] = next_node
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append([])
+                    self._output_link.append(-1)
+                node = next_node
+            self._output[node].append((pattern, payload))
+            self.size += 1
+        self._link()
+
+    def _link(self):
+        """Breadth-first failure and output links (depth-one nodes keep failing to the root)"""
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for token, child in self._goto[node].items():
+                fail = self._fail[node]
+                while fail and token not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(token, 0)
+                self._fail[child] = target
+                self._output_link[child] = target if self._output[target] else self._output_link[target]
+                queue.append(child)
+
+    def __len__(self) -> int:
+        return self.size
+
+    @property
+    def nodes(self) -> int:
+        return len(self._goto)
+
+    def find_all(self, text: str) -> List[Tuple[str, Any]]:
+        """(pattern, payload) for every pattern in text, once each, in order of where it first ends"""
+        found = []
+        seen = set()
+        goto, fail, output, output_link = self._goto, self._fail, self._output, self._output_link
+        node = 0
+        for token in words(text):
+            while node and token not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(token, 0)
+            match_node = node if output[node] else output_link[node]
+            while match_node > 0:
+                if match_node not in seen:
+                    seen.add(match_node)
+                    found.extend(output[match_node])
+                match_node = output_link[match_node]
+        return found
@@ -0,0 +1,132 @@
+"""
+LawBot Text Chunker
+Splits documents on sentence/clause boundaries into chunks that fit the encoder window
+"""
+
+import re
+from typing import List, Tuple, Sequence, Dict, Any
+
+from backend.core.length_buckets import token_lengths
+
+# Boundaries are placed after the separator so "".join(units) == text
+SENTENCE_BOUNDARY = re.compile(r"[.!?;:]\s+|\n+")
+CLAUSE_BOUNDARY = re.compile(r",\s+|\s+[-–—]\s+")
+WORD_BOUNDARY = re.compile(r"\s+")
+
+def split_after(text: str, pattern: re.Pattern) -> List[str]:
+    pieces = []
+    start = 0
+    for match in pattern.finditer(text):
+        if match.end() > start:
+            pieces.append(text[start:match.end()])
+            start = match.end()
+    if start < len(text):
+        pieces.append(text[start:])
+    return pieces
+
+class TokenChunker:
+    """
+    Greedy sentence packer measured with the encoder's own tokenizer.
+
+    Sentences are packed until the next one would overflow max_tokens; a
+    sentence that is too long on its own is split on clauses, then words,
+    then raw token offsets. Consecutive chunks share up to overlap_tokens of
+    trailing sentences. Every returned chunk is verified to fit max_tokens.
+    """
+
+    def __init__(self, tokenizer, max_tokens: int, overlap_tokens: int = 32):
+        if max_tokens <= 0:
+            raise ValueError("max_tokens must be positive")
+        self.tokenizer = tokenizer
+        self.max_tokens = max_tokens
+        self.overlap_tokens = min(overlap_tokens, max_tokens // 2)
+
+    @classmethod
+    def for_encoder(cls, embedding_model, overlap_tokens: int = 32, max_tokens: int = None) -> "TokenChunker":
+        """Chunker sized to a SentenceTransformer's max_seq_length minus its special tokens"""
+        tokenizer = embedding_model.tokenizer
+        window = embedding_model.max_seq_length - tokenizer.num_special_tokens_to_add()
+        return cls(tokenizer, min(max_tokens, window) if max_tokens else window, overlap_tokens)
+
+    def count(self, texts: Sequence[str]) -> List[int]:
+        if not texts:
+            return []
+        return [len(ids) for ids in self.tokenizer(list(texts), add_special_tokens=False)["input_ids"]]
+
+    def split(self, text: str) -> List[str]:
+        units = self._units(text)
+        chunks = []
+        current: List[Tuple[str, int]] = []
+        current_tokens = 0
+
+        for unit, tokens in units:
+            if current and current_tokens + tokens > self.max_tokens:
+                chunks.append("".join(u for u, _ in current))
+                # Carry trailing units over as overlap, leaving room for this unit
+                carry = []
+                carry_tokens = 0
+                for prev, prev_tokens in reversed(current):
+                    if carry_tokens + prev_tokens > self.overlap_tokens or \
+                            carry_tokens + prev_tokens + tokens > self.max_tokens:
+                        break
+                    carry.insert(0, (prev, prev_tokens))
+                    carry_tokens += prev_tokens
+                current, current_tokens = carry, carry_tokens
+            current.append((unit, tokens))
+            current_tokens += tokens
+
+        if current:
+            chunks.append("".join(u for u, _ in current))
+
+        chunks = [chunk.strip() for chunk in chunks if chunk.strip()]
+        return self._verify(chunks)
+
+    def _units(self, text: str) -> List[Tuple[str, int]]:
+        """Sentence-level units with their token counts, each refined until it fits max_tokens"""
+        return self._refine(split_after(text, SENTENCE_BOUNDARY), (CLAUSE_BOUNDARY, WORD_BOUNDARY))
+
+    def _refine(self, pieces: List[str], patterns: tuple) -> List[Tuple[str, int]]:
+        units = []
+        for piece, tokens in zip(pieces, self.count(pieces)):
+            if tokens <= self.max_tokens:
+                units.append((piece, tokens))
+            elif patterns:
+                units.extend(self._refine(split_after(piece, patterns[0]), patterns[1:]))
+            else:
+                units.extend(self._hard_split(piece))
+        return units
+
+    def _hard_split(self, text: str) -> List[Tuple[str, int]]:
+        """Cut an unbreakable piece at token offsets"""
+        encoded = self.tokenizer(text, add_special_tokens=False, return_offsets_mapping=True)
+        offsets = encoded["offset_mapping"]
+        pieces = []
+        for start in range(0, len(offsets), self.max_tokens):
+            window = offsets[start:start + self.max_tokens]
+            end = offsets[start + self.max_tokens][0] if start + self.max_tokens < len(offsets) else len(text)
+            pieces.append((text[window[0][0]:end], len(window)))
+        return pieces
+
+    def _verify(self, chunks: List[str]) -> List[str]:
+        # Token counts are additive across whitespace boundaries for WordPiece, but check anyway
+        verified = []
+        for chunk, tokens in zip(chunks, self.count(chunks)):
+            if tokens <= self.max_tokens:
+                verified.append(chunk)
+            else:
+                verified.extend(piece.strip() for piece, _ in self._hard_split(chunk) if piece.strip())
+        return verified
+
+def truncation_report(tokenizer, chunks: Sequence[str], max_length: int) -> Dict[str, Any]:
+    """How many encoder tokens of these chunks fall past max_length and are silently dropped"""
+    lengths = token_lengths(tokenizer, chunks)
+    over = lengths > max_length
+    truncated = int((lengths[over] - max_length).sum())
+    total = int(lengths.sum())
+    return {
+        "chunks": len(chunks),
+        "chunks_truncated": int(over.sum()),
+        "truncated_tokens": truncated,
+        "total_tokens": total,
+        "truncated_ratio": round(truncated / total, 4) if total else 0.0,
+    }
@@ -3,22 +3,109 @@ LawBot Tools Manager
 Handles legal tools: dictionary, date calculator, case lookup
 """
 
-from datetime import datetime, timedelta
+import time
+import asyncio
+from datetime import datetime
+from pathlib import Path
 from typing import Dict, Any, List, Optional
 import logging
-from config.settings import LEGAL_TOOLS
+from config.settings import LEGAL_TOOLS, CASE_PROVIDER_CONFIG, DEADLINE_CONFIG
+from backend.core.term_matcher import TermMatcher
+from backend.core.glossary_store import GlossaryStore
+from backend.core.case_store import CaseStore, extract_citations
+from backend.core.case_provider import CaseProviderClient
+from backend.core.deadline_engine import DeadlineEngine
 
 logger = logging.getLogger(__name__)
 
+# Matched as whole words, so plural forms are listed explicitly
+DATE_KEYWORDS = ["deadline", "deadlines", "limitation", "day", "days", "date", "dates", "time", "period", "periods"]
+CASE_KEYWORDS = ["case", "cases", "judgment", "judgments", "court", "courts", "ruling", "rulings", "decision", "decisions"]
+
 class ToolsManager:
     def __init__(self):
-        self.legal_dictionary = LEGAL_TOOLS["dictionary"]
+        # Own copy: update_dictionary() must not change the shared settings or other instances
+        self.legal_dictionary = dict(LEGAL_TOOLS["dictionary"])
         self.date_calculator_enabled = LEGAL_TOOLS["date_calculator"]
         self.case_lookup_enabled = LEGAL_TOOLS["case_lookup"]
+        self.deadline_engine = DeadlineEngine(
+            DEADLINE_CONFIG["calendar_dir"],
+            default_court=DEADLINE_CONFIG["default_court"],
+            weekmask=DEADLINE_CONFIG["weekmask"],
+            range_start=DEADLINE_CONFIG["range_start"],
+            range_end=DEADLINE_CONFIG["range_end"]
+        )
+        self._matcher = None
+        self._matcher_key = None
+        self._glossary = None
+        self._cases = None
+        self.case_provider = None
+        if self.case_lookup_enabled and CASE_PROVIDER_CONFIG["enabled"]:
+            settings = {key: value for key, value in CASE_PROVIDER_CONFIG.items() if key != "enabled"}
+            self.case_provider = CaseProviderClient(**settings)
+            logger.info(f"✅ Remote case provider: {CASE_PROVIDER_CONFIG['base_url']}")
+    
+    def _glossary_store(self) -> Optional[GlossaryStore]:
+        """Imported glossary database, opened on first use (None until it has been imported)"""
+        if self._glossary is None:
+            path = Path(LEGAL_TOOLS.get("glossary_path", ""))
+            if path.is_file():
+                self._glossary = GlossaryStore(path)
+                logger.info(f"✅ Legal glossary opened: {path}")
+        return self._glossary
+    
+    def _case_store(self) -> Optional[CaseStore]:
+        """Imported case-law database, opened on first use (None until it has been imported)"""
+        if self._cases is None:
+            path = Path(LEGAL_TOOLS.get("case_index_path", ""))
+            if path.is_file():
+                self._cases = CaseStore(path)
+                logger.info(f"✅ Case index opened: {path}")
+        return self._cases
+    
+    def update_dictionary(self, terms: Dict[str, str]):
+        """Add or replace dictionary terms; the matcher is rebuilt on the next query"""
+        self.legal_dictionary.update({term.lower().strip(): definition for term, definition in terms.items()})
+        self._matcher = None
+    
+    def _term_matcher(self) -> TermMatcher:
+        """
+        Automaton over glossary/dictionary terms and tool keywords.
+
+        Once the glossary database exists its terms (up to
+        LEGAL_TOOLS["glossary_detect_terms"]) are matched too, and they win
+        over a dictionary term of the same name, as in lookup_legal_term.
+        Rebuilt when the dictionary changes or the glossary is first opened.
+        """
+        glossary = self._glossary_store()
+        key = (len(self.legal_dictionary), glossary is not None)
+        if self._matcher is None or self._matcher_key != key:
+            glossary_terms = glossary.terms(LEGAL_TOOLS.get("glossary_detect_terms")) if glossary else []
+            patterns = [(term, "legal_glossary") for term in glossary_terms]
+            glossary_terms = set(glossary_terms)
+            patterns += [(term, "legal_dictionary") for term in self.legal_dictionary if term not in glossary_terms]
+            patterns += [(keyword, "date_calculator") for keyword in DATE_KEYWORDS]
+            patterns += [(keyword, "case_lookup") for keyword in CASE_KEYWORDS]
+            self._matcher = TermMatcher(patterns)
+            self._matcher_key = key
+            logger.info(f"Tool matcher built: {len(self._matcher)} patterns ({len(glossary_terms)} from the glossary), "
+                        f"{self._matcher.nodes} nodes")
+        return self._matcher
         
     def lookup_legal_term(self, term: str) -> Dict[str, Any]:
-        """Lookup legal term definition"""
-        term_lower = term.lower().strip()
+        """
+        Lookup legal term definition.
+        
+        An exact glossary term wins, then an exact dictionary term (built-in or
+        added with update_dictionary), then the glossary's partial matches,
+        then the dictionary's - the same terms detect_tool_usage finds.
+        """
+        glossary = self._glossary_store()
+        glossary_result = self._lookup_glossary(glossary, term) if glossary is not None else None
+        if glossary_result and glossary_result["found"] and "partial_matches" not in glossary_result:
+            return glossary_result
+        
+        term_lower = " ".join(term.lower().split())
         
         # Direct lookup
         if term_lower in self.legal_dictionary:
@@ -29,6 +116,9 @@ class ToolsManager:
                 "source": "Legal Dictionary"
             }
         
+        if glossary_result and glossary_result["found"]:
+            return glossary_result
+        
         # Partial match
         partial_matches = []
         for key, definition in self.legal_dictionary.items():
@@ -54,79 +144,203 @@ class ToolsManager:
             "source": "Legal Dictionary"
         }
     
-    def calculate_deadline(self, days: int, start_date: str = None) -> Dict[str, Any]:
-        """Calculate legal deadline"""
+    def _lookup_glossary(self, glossary: GlossaryStore, term: str) -> Dict[str, Any]:
+        """Exact, prefix, word and typo-tolerant lookup in the imported glossary"""
+        matches = glossary.lookup(term, limit=5)
+        if not matches:
+            return {
+                "term": term,
+                "definition": f"No definition found for '{term}'",
+                "found": False,
+                "source": "Legal Glossary"
+            }
+        
+        if matches[0]["match"] == "exact":
+            return {
+                "term": term,
+                "definition": matches[0]["definition"],
+                "found": True,
+                "related_terms": matches[1:],
+                "source": "Legal Glossary"
+            }
+        
+        return {
+            "term": term,
+            "definition": f"Partial matches found: {matches[0]['definition']}",
+            "found": True,
+            "partial_matches": matches,
+            "source": "Legal Glossary"
+        }
+    
+    def calculate_deadline(self, days: int, start_date: str = None, court: str = None,
+                           unit: str = "days") -> Dict[str, Any]:
+        """Calculate legal deadline (moved to the next open court day if the period ends on a closed one)"""
+        start_date = start_date or datetime.now().strftime("%Y-%m-%d")
+        batch = self.calculate_deadlines([start_date], [days], unit=unit, court=court)
+        if not batch["success"]:
+            return batch
+        
+        return {
+            "start_date": start_date,
+            "deadline": batch["deadlines"][0],
+            "nominal_deadline": batch["nominal"][0],
+            "rolled_forward": batch["rolled_forward"][0],
+            "days": days,
+            "unit": unit,
+            "court": batch["court"],
+            "success": True,
+            "source": "Date Calculator"
+        }
+    
+    def calculate_deadlines(self, start_dates: List[str], periods: List[int], unit: str = "days",
+                            court: str = None) -> Dict[str, Any]:
+        """Batch deadlines over the court's holiday calendar (a single date or period is broadcast)"""
         if not self.date_calculator_enabled:
             return {
                 "error": "Date calculator not enabled",
                 "success": False
             }
         
+        started = time.perf_counter()
         try:
-            if start_date:
-                base_date = datetime.strptime(start_date, "%Y-%m-%d")
-            else:
-                base_date = datetime.now()
-            
-            deadline = base_date + timedelta(days=days)
-            
-            return {
-                "start_date": base_date.strftime("%Y-%m-%d"),
-                "deadline": deadline.strftime("%Y-%m-%d"),
-                "days": days,
-                "success": True,
-                "source": "Date Calculator"
-            }
-            
-        except Exception as e:
+            result = self.deadline_engine.compute(start_dates, periods, unit=unit, court=court)
+        except (ValueError, OverflowError, TypeError) as e:
+            # OverflowError: a period beyond int64; TypeError: a value that is not a date or number
             logger.error(f"Date calculation error: {e}")
             return {
-                "error": f"Invalid date format: {e}",
+                "error": f"Invalid deadline request: {e}",
                 "success": False
             }
+        
+        result.update({
+            "unit": unit,
+            "count": len(result["deadlines"]),
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 2),
+            "success": True,
+            "source": "Date Calculator"
+        })
+        return result
     
     def lookup_legal_case(self, case_reference: str) -> Dict[str, Any]:
-        """Lookup legal case information (mock implementation)"""
+        """Lookup legal case information by citation or case name in the offline case index"""
+        return self.lookup_legal_cases([case_reference])[0]
+    
+    def lookup_legal_cases(self, case_references: List[str], limit: int = 5) -> List[Dict[str, Any]]:
+        """
+        Batched case lookup: citations in all references are resolved with one index query.
+        
+        References the offline index cannot resolve are answered from the remote
+        provider's cache when it has them; this never waits on the network.
+        """
         if not self.case_lookup_enabled:
-            return {
-                "error": "Case lookup not enabled",
+            return [{"error": "Case lookup not enabled", "success": False} for _ in case_references]
+        
+        store = self._case_store()
+        if store is None and self.case_provider is None:
+            return [{
+                "case_reference": reference,
+                "error": "Case index not built - run scripts/import_cases.py",
                 "success": False
-            }
+            } for reference in case_references]
+        
+        found = store.lookup_many(case_references, limit) if store else [[] for _ in case_references]
+        results = []
+        for reference, cases in zip(case_references, found):
+            source = "Case Law Index"
+            if not cases and self.case_provider:
+                cached = self.case_provider.peek(reference)
+                if cached:
+                    cases, source = cached[:limit], "Indian Kanoon"
+            results.append(self._case_result(reference, cases, source))
+        return results
+    
+    async def lookup_legal_case_async(self, case_reference: str) -> Dict[str, Any]:
+        """lookup_legal_case that falls back to the remote provider"""
+        return (await self.lookup_legal_cases_async([case_reference]))[0]
+    
+    async def lookup_legal_cases_async(self, case_references: List[str], limit: int = 5) -> List[Dict[str, Any]]:
+        """Offline lookup first; unresolved references go to the remote provider concurrently"""
+        results = self.lookup_legal_cases(case_references, limit)
+        if self.case_provider is None:
+            return results
         
-        # Mock implementation - would integrate with Indian Kanoon API
+        missing = [row for row, result in enumerate(results) if result.get("success") and not result["found"]]
+        fetched = await asyncio.gather(
+            *(self.case_provider.search(case_references[row]) for row in missing), return_exceptions=True
+        )
+        for row, cases in zip(missing, fetched):
+            if isinstance(cases, Exception):
+                logger.warning(f"⚠️ Case provider lookup failed for '{case_references[row]}': {cases!r}")
+                results[row]["provider_error"] = str(cases) or type(cases).__name__
+            elif cases:
+                results[row] = self._case_result(case_references[row], cases[:limit], "Indian Kanoon")
+        return results
+    
+    def _case_result(self, reference: str, cases: List[Dict[str, Any]], source: str) -> Dict[str, Any]:
         return {
-            "case_reference": case_reference,
-            "status": "Mock response",
-            "description": f"Case information for {case_reference}: This would fetch real case data from Indian Kanoon API or Court Listener. Example: Case facts, judgment, citations, etc.",
+            "case_reference": reference,
+            "found": bool(cases),
+            "cases": cases,
+            "description": self._describe_case(cases[0]) if cases else f"No case found for '{reference}'",
             "success": True,
-            "source": "Case Lookup (Mock)"
+            "source": source
         }
     
+    @staticmethod
+    def _describe_case(case: Dict[str, Any]) -> str:
+        citation = f" {case['citations'][0]}" if case["citations"] else ""
+        court = f", {case['court']}" if case["court"] else ""
+        date = f", decided {case['date']}" if case["date"] else ""
+        return f"{case['title']}{citation}{court}{date}"
+    
     def detect_tool_usage(self, query: str) -> List[Dict[str, Any]]:
-        """Detect which tools might be needed for a query"""
+        """Detect which tools might be needed for a query (one pass over the query for all terms)"""
         tools_used = []
-        query_lower = query.lower()
+        matched_tools = set()
         
-        # Check for legal terms
-        for term in self.legal_dictionary.keys():
-            if term in query_lower:
+        # Check for legal terms (whole-word matches, in query order)
+        for term, tool in self._term_matcher().find_all(query):
+            if tool == "legal_dictionary":
                 tools_used.append({
                     "tool": "legal_dictionary",
                     "term": term,
                     "definition": self.legal_dictionary[term]
                 })
+            elif tool == "legal_glossary":
+                entry = self._glossary_store().get(term)
+                if entry is not None:
+                    tools_used.append({
+                        "tool": "legal_dictionary",
+                        "term": entry["term"],
+                        "definition": entry["definition"],
+                        "source": "Legal Glossary"
+                    })
+            else:
+                matched_tools.add(tool)
         
         # Check for date-related queries
-        date_keywords = ["deadline", "limitation", "days", "date", "time", "period"]
-        if any(keyword in query_lower for keyword in date_keywords):
+        if "date_calculator" in matched_tools:
             tools_used.append({
                 "tool": "date_calculator",
                 "description": "Query contains date-related terms"
             })
         
-        # Check for case-related queries
-        case_keywords = ["case", "judgment", "court", "ruling", "decision"]
-        if any(keyword in query_lower for keyword in case_keywords):
+        # Check for case-related queries; cited cases are resolved from the offline index
+        citations = extract_citations(query) if self.case_lookup_enabled else []
+        resolved = 0
+        if citations and (self._case_store() is not None or self.case_provider is not None):
+            for citation, result in zip(citations, self.lookup_legal_cases(citations, limit=1)):
+                if result["found"]:
+                    resolved += 1
+                    tools_used.append({
+                        "tool": "case_lookup",
+                        "citation": citation,
+                        "description": result["description"]
+                    })
+                elif self.case_provider:
+                    # Warm the provider cache for the next query without delaying this one
+                    self.case_provider.prefetch(citation)
+        if not resolved and "case_lookup" in matched_tools:
             tools_used.append({
                 "tool": "case_lookup",
                 "description": "Query contains case-related terms"
@@ -134,19 +348,33 @@ class ToolsManager:
         
         return tools_used
     
+    def attach_event_loop(self, loop: asyncio.AbstractEventLoop):
+        """Let worker threads schedule remote case prefetches on the serving loop"""
+        if self.case_provider:
+            self.case_provider.attach(loop)
+    
+    async def aclose(self):
+        """Close pooled remote connections"""
+        if self.case_provider:
+            await self.case_provider.aclose()
+    
     def get_tools_info(self) -> Dict[str, Any]:
         """Get tools information"""
         return {
             "legal_dictionary": {
                 "enabled": True,
                 "terms_count": len(self.legal_dictionary),
-                "terms": list(self.legal_dictionary.keys())
+                "terms": list(self.legal_dictionary.keys()),
+                "glossary_terms": len(self._glossary_store()) if self._glossary_store() else None
             },
             "date_calculator": {
-                "enabled": self.date_calculator_enabled
+                "enabled": self.date_calculator_enabled,
+                "default_court": self.deadline_engine.default_court,
+                "calendars_loaded": self.deadline_engine.loaded_courts()
             },
             "case_lookup": {
                 "enabled": self.case_lookup_enabled,
-                "note": "Mock implementation - integrate with Indian Kanoon API"
+                "cases_count": len(self._case_store()) if self._case_store() else None,
+                "remote_provider": self.case_provider.get_stats() if self.case_provider else None
             }
         }
@@ -3,13 +3,16 @@ FastAPI Main Application
 Entry point for the LawBot backend API
 """
 
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 import logging
 import uvicorn
 from backend.api.routes import router
-from backend.services.lawbot_service import LawBotService
+from backend.services.registry import get_lawbot_service, initialize_lawbot_service
 from config.settings import API_CONFIG
 
 # Configure logging
@@ -19,13 +22,33 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Load the shared LawBot service once per worker, then serve"""
+    logger.info("Starting LawBot API...")
+    get_lawbot_service().tools_manager.attach_event_loop(asyncio.get_running_loop())
+    try:
+        service = await run_in_threadpool(initialize_lawbot_service)
+        if service.is_initialized:
+            logger.info("✅ LawBot service initialized successfully!")
+        else:
+            logger.warning("⚠️ LawBot service initialized in limited mode")
+    except Exception as e:
+        logger.error(f"❌ Failed to initialize LawBot service: {e}")
+    
+    yield
+    
+    logger.info("Shutting down LawBot API...")
+    await get_lawbot_service().tools_manager.aclose()
+
 # Create FastAPI app
 app = FastAPI(
     title="LawBot API",
     description="Intelligent Legal Q&A Assistant for Indian Law",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    lifespan=lifespan
 )
 
 # Add CORS middleware
@@ -40,27 +63,6 @@ app.add_middleware(
 # Include API routes
 app.include_router(router, prefix="/api")
 
-# Global service instance
-lawbot_service = LawBotService()
-
-@app.on_event("startup")
-async def startup_event():
-    """Initialize LawBot service on startup"""
-    logger.info("Starting LawBot API...")
-    try:
-        success = lawbot_service.initialize()
-        if success:
-            logger.info("✅ LawBot service initialized successfully!")
-        else:
-            logger.warning("⚠️ LawBot service initialized in limited mode")
-    except Exception as e:
-        logger.error(f"❌ Failed to initialize LawBot service: {e}")
-
-@app.on_event("shutdown")
-async def shutdown_event():
-    """Cleanup on shutdown"""
-    logger.info("Shutting down LawBot API...")
-
 @app.get("/")
 async def root():
     """Root endpoint"""
@@ -75,7 +77,7 @@ async def root():
 async def get_status():
     """Get detailed system status"""
     try:
-        status = lawbot_service.get_system_status()
+        status = get_lawbot_service().get_system_status()
         return {
             "status": "healthy" if status["is_initialized"] else "degraded",
             "components": status,
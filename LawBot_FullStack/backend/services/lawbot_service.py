@@ -4,10 +4,18 @@ Orchestrates model, RAG, and tools for complete chat functionality
 """
 
 import logging
-from typing import Dict, Any, List
+import os
+import time
+import threading
+from pathlib import Path
+from typing import Dict, Any, List, Iterator, Optional, Tuple
 from backend.core.model_manager import ModelManager
 from backend.core.rag_manager import RAGManager
 from backend.core.tools_manager import ToolsManager
+from backend.core.response_cache import ResponseCache
+from backend.core.context_packer import ContextPacker
+from backend.core.faq_index import FAQIndex, FAQ_CONFIG_FILE
+from config.settings import MODEL_CONFIG, RAG_CONFIG, RESPONSE_CACHE_CONFIG, FAQ_CONFIG
 
 logger = logging.getLogger(__name__)
 
@@ -16,18 +24,39 @@ class LawBotService:
         self.model_manager = ModelManager()
         self.rag_manager = RAGManager()
         self.tools_manager = ToolsManager()
+        self.response_cache = None
+        if RESPONSE_CACHE_CONFIG["enabled"]:
+            self.response_cache = ResponseCache(
+                max_entries=RESPONSE_CACHE_CONFIG["max_entries"],
+                ttl_seconds=RESPONSE_CACHE_CONFIG["ttl_seconds"],
+                max_distance=RESPONSE_CACHE_CONFIG["semantic_max_distance"],
+                semantic=RESPONSE_CACHE_CONFIG["semantic"],
+            )
+        self.context_packer = None
+        self.faq_index = None
+        self._generation_lock = threading.Lock()
+        self._generation_stats = {"count": 0, "seconds": 0.0}
         self.is_initialized = False
+        self._init_lock = threading.Lock()
         
     def initialize(self) -> bool:
-        """Initialize all components"""
+        """Initialize all components (each one is loaded at most once)"""
+        with self._init_lock:
+            return self._initialize()
+    
+    def _initialize(self) -> bool:
         try:
             logger.info("Initializing LawBot service...")
             
             # Load model
-            model_loaded = self.model_manager.load_model()
+            model_loaded = self.model_manager.is_loaded or self.model_manager.load_model()
             
             # Load RAG components
-            rag_loaded = self.rag_manager.load_components()
+            rag_loaded = self.rag_manager.is_loaded or self.rag_manager.load_components()
+            
+            # FAQ index (uses the retrieval encoder's query embeddings)
+            if self.faq_index is None and FAQ_CONFIG["enabled"]:
+                self.faq_index = self._load_faq_index()
             
             # Tools are always available
             logger.info("✅ Tools manager initialized")
@@ -58,8 +87,18 @@ class LawBotService:
             }
         
         try:
+            # Step 0: Response cache (exact text, then nearby query embeddings)
+            cached, query_embedding = self._lookup_cache(query)
+            if cached is not None:
+                return cached
+            
+            # Step 0b: Near-verbatim corpus question - stored answer, no retrieval or generation
+            faq_result = self._lookup_faq(query, query_embedding)
+            if faq_result is not None:
+                return faq_result
+            
             # Step 1: RAG Retrieval
-            rag_result = self.rag_manager.retrieve_context(query)
+            rag_result = self.rag_manager.retrieve_context(query, query_embedding=query_embedding)
             context = rag_result["context"]
             citations = rag_result["citations"]
             
@@ -67,16 +106,13 @@ class LawBotService:
             tools_used = self.tools_manager.detect_tool_usage(query)
             
             # Step 3: Generate Response
+            prompt_tokens = None
             if self.model_manager.is_loaded:
                 # Use fine-tuned model
-                prompt = f"""Question: {query}
-
-Context from legal documents:
-{context}
-
-Please provide a comprehensive answer about Indian law based on the context above."""
-                
+                prompt, prompt_tokens = self._pack_prompt(query, rag_result)
+                started = time.perf_counter()
                 response = self.model_manager.generate_response(prompt)
+                self._record_generation(time.perf_counter() - started)
             else:
                 # Fallback response
                 response = self._generate_fallback_response(query, context, tools_used)
@@ -84,13 +120,16 @@ Please provide a comprehensive answer about Indian law based on the context abov
             # Step 4: Format Final Response
             final_response = self._format_response(response, citations, tools_used)
             
-            return {
+            result = {
                 "response": final_response,
                 "citations": citations,
                 "tools_used": tools_used,
                 "confidence": rag_result["confidence"],
+                "prompt_tokens": prompt_tokens,
                 "error": None
             }
+            self._store_cache(query, query_embedding, result)
+            return result
             
         except Exception as e:
             logger.error(f"Error in chat function: {e}")
@@ -102,6 +141,189 @@ Please provide a comprehensive answer about Indian law based on the context abov
                 "error": str(e)
             }
     
+    def chat_stream(self, query: str, conversation_history: List[Dict[str, str]] = None) -> Iterator[Dict[str, Any]]:
+        """Streaming variant of chat() yielding token events followed by a final done event"""
+        if not query.strip():
+            yield {"type": "token", "text": "Please enter a question."}
+            yield {"type": "done", "citations": [], "tools_used": [], "confidence": "low", "error": None}
+            return
+        
+        try:
+            # Step 0: Response cache - a hit is sent as a single token event
+            cached, query_embedding = self._lookup_cache(query)
+            if cached is not None:
+                yield {"type": "token", "text": cached["response"]}
+                yield {"type": "done", **{k: v for k, v in cached.items() if k != "response"}}
+                return
+            
+            faq_result = self._lookup_faq(query, query_embedding)
+            if faq_result is not None:
+                yield {"type": "token", "text": faq_result["response"]}
+                yield {"type": "done", **{k: v for k, v in faq_result.items() if k != "response"}}
+                return
+            
+            # Step 1: RAG Retrieval
+            rag_result = self.rag_manager.retrieve_context(query, query_embedding=query_embedding)
+            context = rag_result["context"]
+            citations = rag_result["citations"]
+            
+            # Step 2: Tool Detection
+            tools_used = self.tools_manager.detect_tool_usage(query)
+            
+            # Step 3: Stream Response
+            pieces = []
+            prompt_tokens = None
+            if self.model_manager.is_loaded:
+                prompt, prompt_tokens = self._pack_prompt(query, rag_result)
+                started = time.perf_counter()
+                for text in self.model_manager.stream_response(prompt):
+                    pieces.append(text)
+                    yield {"type": "token", "text": text}
+                self._record_generation(time.perf_counter() - started)
+            else:
+                yield {"type": "token", "text": self._generate_fallback_response(query, context, tools_used)}
+            
+            # Step 4: Citations, tools and disclaimer go out once the answer is complete
+            trailer = self._format_response("", citations, tools_used)
+            pieces.append(trailer)
+            yield {"type": "token", "text": trailer}
+            
+            result = {
+                "citations": citations,
+                "tools_used": tools_used,
+                "confidence": rag_result["confidence"],
+                "prompt_tokens": prompt_tokens,
+                "error": None
+            }
+            self._store_cache(query, query_embedding, {"response": "".join(pieces), **result})
+            yield {"type": "done", **result}
+            
+        except Exception as e:
+            logger.error(f"Error in streaming chat: {e}")
+            yield {
+                "type": "done",
+                "citations": [],
+                "tools_used": [],
+                "confidence": "low",
+                "error": str(e)
+            }
+    
+    def _lookup_cache(self, query: str) -> Tuple[Optional[Dict[str, Any]], Any]:
+        """Return (cached result or None, query embedding to reuse for retrieval)"""
+        # Provision queries ("IPC Section 302") need no embedding, and neighbouring sections
+        # embed too closely for the semantic cache to tell them apart
+        skip_encoder = self.rag_manager.skips_encoder(query)
+        if self.response_cache is None:
+            return None, None if skip_encoder else self.rag_manager.encode_query(query)
+        
+        self.response_cache.ensure_version(self._cache_version())
+        cached = self.response_cache.get_exact(query)
+        if cached is not None or skip_encoder:
+            return (dict(cached) if cached is not None else None), None
+        
+        query_embedding = self.rag_manager.encode_query(query)
+        cached = self.response_cache.get_semantic(query, query_embedding)
+        return (dict(cached) if cached is not None else None), query_embedding
+    
+    def _store_cache(self, query: str, query_embedding: Any, result: Dict[str, Any]):
+        """Cache model-generated answers (fallback demo text is cheap to rebuild)"""
+        if self.response_cache is not None and self.model_manager.is_loaded:
+            self.response_cache.put(query, query_embedding, result)
+    
+    def _cache_version(self) -> Tuple[float, float]:
+        """Fingerprint of the vectorstore and adapter; a change invalidates cached answers"""
+        def mtime(path) -> float:
+            try:
+                return os.stat(path).st_mtime
+            except OSError:
+                return 0.0
+        
+        index_file = Path(RAG_CONFIG["vectorstore_path"]) / "faiss_index.idx"
+        return (mtime(index_file), mtime(MODEL_CONFIG["adapter_path"]))
+    
+    def _load_faq_index(self) -> Optional[FAQIndex]:
+        """Open the FAQ index if it was built for the current retrieval encoder"""
+        index_dir = Path(FAQ_CONFIG["index_path"])
+        if not (index_dir / FAQ_CONFIG_FILE).exists():
+            logger.info(f"No FAQ index at {index_dir} - run scripts/build_faq_index.py to enable the FAQ short-circuit")
+            return None
+        try:
+            faq_index = FAQIndex(index_dir, FAQ_CONFIG["max_distance"])
+        except Exception as e:
+            logger.error(f"❌ Error loading FAQ index: {e}")
+            return None
+        if faq_index.embedding_model != RAG_CONFIG["embedding_model"]:
+            logger.warning(f"FAQ index was built with {faq_index.embedding_model}, not {RAG_CONFIG['embedding_model']} - rebuild it")
+            return None
+        logger.info(f"✅ FAQ index loaded: {len(faq_index)} questions")
+        return faq_index
+    
+    def _lookup_faq(self, query: str, query_embedding: Any) -> Optional[Dict[str, Any]]:
+        """Chat result carrying the stored answer of a near-verbatim corpus question, else None"""
+        if self.faq_index is None:
+            return None
+        match = self.faq_index.match(query, query_embedding)
+        if match is None:
+            return None
+        
+        citations = [match["source"]]
+        tools_used = self.tools_manager.detect_tool_usage(query)
+        return {
+            "response": self._format_response(match["answer"], citations, tools_used),
+            "citations": citations,
+            "tools_used": tools_used,
+            "confidence": "high",
+            "prompt_tokens": None,
+            "faq_match": {"question": match["question"], "distance": match["distance"], "match": match["match"]},
+            "error": None
+        }
+    
+    def _record_generation(self, seconds: float):
+        with self._generation_lock:
+            self._generation_stats["count"] += 1
+            self._generation_stats["seconds"] += seconds
+    
+    def get_faq_stats(self) -> Optional[Dict[str, Any]]:
+        """FAQ hit rate plus the generation time its hits avoided (at the measured average)"""
+        if self.faq_index is None:
+            return None
+        stats = self.faq_index.get_stats()
+        with self._generation_lock:
+            count = self._generation_stats["count"]
+            avg_generation_s = self._generation_stats["seconds"] / count if count else 0.0
+        hits = stats["exact_hits"] + stats["semantic_hits"]
+        saved_per_hit = max(avg_generation_s - stats["avg_lookup_ms"] / 1000, 0.0)
+        stats.update({
+            "avg_generation_s": round(avg_generation_s, 2),
+            "estimated_seconds_saved": round(hits * saved_per_hit, 1),
+        })
+        return stats
+    
+    def _pack_prompt(self, query: str, rag_result: Dict[str, Any]) -> Tuple[str, int]:
+        """Build the prompt with as much retrieved context as fits the prompt-token budget"""
+        if self.context_packer is None:
+            self.context_packer = ContextPacker(
+                self.model_manager.tokenizer,
+                max_prompt_tokens=MODEL_CONFIG.get("max_prompt_tokens", 1536),
+            )
+        
+        packed = self.context_packer.pack(
+            rag_result.get("chunks", []),
+            lambda context: self.model_manager.format_prompt(self._build_prompt(query, context)),
+        )
+        logger.info(f"Prompt: {packed['prompt_tokens']} tokens "
+                    f"({packed['chunks_packed']}/{packed['chunks_offered']} chunks{', last trimmed' if packed['trimmed'] else ''})")
+        return self._build_prompt(query, packed["context"]), packed["prompt_tokens"]
+    
+    def _build_prompt(self, query: str, context: str) -> str:
+        """Build the user prompt sent to the model"""
+        return f"""Question: {query}
+
+Context from legal documents:
+{context}
+
+Please provide a comprehensive answer about Indian law based on the context above."""
+    
     def _generate_fallback_response(self, query: str, context: str, tools_used: List[Dict]) -> str:
         """Generate fallback response when model is not available"""
         response_parts = [
@@ -156,11 +378,24 @@ Please provide a comprehensive answer about Indian law based on the context abov
         
         return "\n".join(formatted_parts)
     
+    def get_component_readiness(self) -> Dict[str, bool]:
+        """Which components are loaded and warm in this worker"""
+        return {
+            "model": self.model_manager.is_loaded,
+            "embedding_model": self.rag_manager.embedding_model is not None,
+            "faiss_index": self.rag_manager.index is not None,
+            "tools": True,
+        }
+    
     def get_system_status(self) -> Dict[str, Any]:
         """Get system status and component information"""
         return {
             "is_initialized": self.is_initialized,
+            "components_ready": self.get_component_readiness(),
             "model": self.model_manager.get_model_info(),
             "rag": self.rag_manager.get_rag_info(),
-            "tools": self.tools_manager.get_tools_info()
+            "tools": self.tools_manager.get_tools_info(),
+            "response_cache": self.response_cache.get_stats() if self.response_cache else None,
+            "context_packer": self.context_packer.get_stats() if self.context_packer else None,
+            "faq": self.get_faq_stats()
         }
@@ -0,0 +1,28 @@
+"""
+LawBot Service Registry
+Process-wide LawBotService shared by the app and the API router
+"""
+
+import threading
+import logging
+from backend.services.lawbot_service import LawBotService
+
+logger = logging.getLogger(__name__)
+
+_service = None
+_service_lock = threading.Lock()
+
+def get_lawbot_service() -> LawBotService:
+    """Return the shared service instance (created on first use, not loaded)"""
+    global _service
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                _service = LawBotService()
+    return _service
+
+def initialize_lawbot_service() -> LawBotService:
+    """Load the shared service's components; safe to call more than once"""
+    service = get_lawbot_service()
+    service.initialize()
+    return service
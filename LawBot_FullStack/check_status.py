@@ -46,6 +46,7 @@ else:
 vectorstore_path = BASE_DIR / "data" / "vectorstore" / "faiss_index"
 if vectorstore_path.exists():
     index_file = vectorstore_path / "faiss_index.idx"
+    chunk_store_file = vectorstore_path / "chunkstore.bin"
     chunks_file = vectorstore_path / "chunks.json"
     metadata_file = vectorstore_path / "metadata.json"
     config_file = vectorstore_path / "config.json"
@@ -59,7 +60,13 @@ if vectorstore_path.exists():
     else:
         print(f"   ❌ FAISS Index: Missing")
     
-    if chunks_file.exists():
+    if chunk_store_file.exists():
+        import struct
+        with open(chunk_store_file, 'rb') as f:
+            chunk_count = struct.unpack("<4sII", f.read(12))[2]
+        size_mb = chunk_store_file.stat().st_size / (1024*1024)
+        print(f"   ✅ Chunk Store: {chunk_count} chunks ({size_mb:.2f} MB, memory-mapped)")
+    elif chunks_file.exists():
         with open(chunks_file, 'r', encoding='utf-8') as f:
             chunks = json.load(f)
         print(f"   ✅ Chunks: {len(chunks)} documents")
@@ -13,18 +13,85 @@ MODEL_CONFIG = {
     "base_model": "Qwen/Qwen2.5-1.5B-Instruct",
     "adapter_path": str(MODELS_DIR / "adapters" / "lawbot_qwen_adapter"),  # Convert to string for compatibility
     "max_length": 2048,
+    "max_prompt_tokens": 1536,  # Template + question + packed RAG context; leaves room for the answer
     "temperature": 0.7,
     "top_p": 0.9,
+    "stream_timeout": 120,  # Seconds to wait for the next streamed token
+    "continuous_batching": True,  # Batch concurrent requests in one decode loop
+    "max_batch_size": 8,
+    "max_batch_wait_ms": 10,  # How long an idle scheduler waits to fill a batch
+    "prefix_cache": True,  # Reuse the system-prompt KV cache across requests
+    # Prompt-lookup speculative decoding: copy spans from the retrieved context, verified in one forward pass.
+    # Decodes one request at a time, so it replaces continuous batching when enabled.
+    "speculative_decoding": False,
+    "prompt_lookup_ngram": 3,  # Longest trailing n-gram matched against the prompt
+    "prompt_lookup_draft_tokens": 10,
+    # Fold the LoRA adapter into the base weights once and load the cached merged checkpoint (float32 safetensors)
+    "merge_adapter": False,
+    "merged_model_dir": str(MODELS_DIR / "merged"),
+    "precision": "auto",  # auto (fp16 on CUDA, fp32 on CPU), float32, bfloat16, or int8 (CPU dynamic quantization)
 }
 
 # RAG configuration
 RAG_CONFIG = {
     "embedding_model": "all-MiniLM-L6-v2",
     "vectorstore_path": str(DATA_DIR / "vectorstore" / "faiss_index"),  # Convert to string
-    "chunks_path": str(DATA_DIR / "vectorstore" / "chunks.json"),
-    "metadata_path": str(DATA_DIR / "vectorstore" / "metadata.json"),
+    "chunks_path": str(DATA_DIR / "vectorstore" / "faiss_index" / "chunks.json"),  # Legacy JSON fallback
+    "metadata_path": str(DATA_DIR / "vectorstore" / "faiss_index" / "metadata.json"),
     "top_k": 5,
     "similarity_threshold": 2.0,
+    # Index built by the vectorstore scripts: flat (exact), ivf_flat, ivf_pq or hnsw
+    "index_type": "flat",
+    "index_params": {
+        "nlist": None,  # IVF lists; None picks ~4*sqrt(N)
+        "pq_m": 16,  # IVF-PQ sub-quantizers (must divide 384)
+        "pq_nbits": 8,
+        "hnsw_m": 32,
+        "ef_construction": 200,
+        "train_sample": 100000,
+    },
+    # Query-time accuracy/speed knobs for approximate indexes
+    "nprobe": 16,
+    "ef_search": 64,
+    # Coalesce concurrent query encodes/searches arriving within a few ms
+    "micro_batching": True,
+    "micro_batch_max_size": 32,
+    "micro_batch_wait_ms": 3,
+    # Hybrid retrieval: BM25 over sparse_index.bin fused with FAISS results by reciprocal rank
+    "hybrid_search": True,
+    "hybrid_candidates": 20,  # Ranked candidates taken from each leg before fusion
+    "rrf_k": 60,
+    "bm25_k1": 1.2,
+    "bm25_b": 0.75,
+    # Queries naming a provision ("IPC Section 302", "Article 14") are answered from provision_index.json
+    "provision_lookup": True,
+    "provision_merge_dense": False,  # True: still run the dense/sparse search and append its results
+    # Vectorstore chunking: "tokens" packs sentences up to the encoder window, "chars" is the legacy 800-char split
+    "chunker": "tokens",
+    "chunk_max_tokens": None,  # None = encoder max_seq_length minus special tokens (254 for MiniLM)
+    "chunk_overlap_tokens": 32,
+    # Ingestion-time embedding cache (keyed by chunk text hash + model name)
+    "embedding_cache_dir": str(DATA_DIR / "vectorstore" / "embedding_cache"),
+    "embedding_cache_dtype": "float32",  # or float16 to halve disk usage
+}
+
+# Response cache configuration
+RESPONSE_CACHE_CONFIG = {
+    "enabled": True,
+    "max_entries": 1024,
+    "ttl_seconds": 3600,
+    "semantic": True,
+    "semantic_max_distance": 0.05,  # Cosine distance between query embeddings
+}
+
+# FAQ short-circuit: near-verbatim matches of a corpus question return its stored answer without the LLM
+FAQ_CONFIG = {
+    "enabled": True,
+    "index_path": str(DATA_DIR / "vectorstore" / "faq"),
+    "source_file": str(DATA_DIR / "processed" / "lawbot_cleaned.jsonl"),
+    # Cosine distance between the query and the stored question. Only rewordings should pass;
+    # questions differing in a section number sit closer than that, so numbers are compared separately
+    "max_distance": 0.03,
 }
 
 # API configuration
@@ -48,9 +115,40 @@ LEGAL_TOOLS = {
     },
     "date_calculator": True,
     "case_lookup": True,
+    # Large glossary imported with scripts/import_glossary.py (the dictionary above is used until it exists)
+    "glossary_path": str(DATA_DIR / "glossary" / "glossary.db"),
+    # Glossary terms compiled into the chat tool-detection matcher, in import order (None = all)
+    "glossary_detect_terms": 100000,
+    # Offline case-law metadata imported with scripts/import_cases.py
+    "case_index_path": str(DATA_DIR / "cases" / "cases.db"),
+}
+
+# Limitation deadlines over per-court calendars (data/calendars/<court>.txt or compiled .npz)
+DEADLINE_CONFIG = {
+    "calendar_dir": str(DATA_DIR / "calendars"),
+    "default_court": "default",  # weekmask only unless default.txt/.npz exists
+    "weekmask": "1111100",  # Mon..Sun, 1 = court sits
+    "range_start": "1950-01-01",
+    "range_end": "2100-12-31",
+    "max_batch": 200000,  # deadlines per /api/tools/deadlines request
 }
 
 # Environment variables
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
 HF_TOKEN = os.getenv("HF_TOKEN", "")
 INDIAN_KANOON_API_KEY = os.getenv("INDIAN_KANOON_API_KEY", "")
+
+# Remote case-law provider, used for references the offline case index cannot resolve
+CASE_PROVIDER_CONFIG = {
+    "enabled": bool(INDIAN_KANOON_API_KEY),
+    "base_url": os.getenv("CASE_PROVIDER_URL", "https://api.indiankanoon.org"),
+    "api_key": INDIAN_KANOON_API_KEY,
+    "timeout": 5.0,  # seconds per upstream request
+    "connect_timeout": 2.0,
+    "max_connections": 20,  # pooled keep-alive connections shared by all lookups
+    "max_keepalive": 10,
+    "per_host_limit": 8,  # concurrent upstream requests per host
+    "cache_ttl": 3600,
+    "cache_size": 2048,
+    "max_results": 5,
+}
@@ -4,7 +4,6 @@ LawBot Demo - Shows capabilities without interactive input
 
 import os
 import sys
-import json
 from pathlib import Path
 
 print("="*70)
@@ -12,6 +11,7 @@ print("⚖️  LawBot Demo - Automated Testing")
 print("="*70)
 
 BASE_DIR = Path(__file__).parent
+sys.path.append(str(BASE_DIR))
 VECTORSTORE_PATH = BASE_DIR / "data" / "vectorstore" / "faiss_index"
 
 # Test queries
@@ -32,10 +32,8 @@ try:
     if index_file.exists():
         rag_index = faiss.read_index(str(index_file))
         
-        with open(VECTORSTORE_PATH / "chunks.json", 'r', encoding='utf-8') as f:
-            chunks = json.load(f)
-        with open(VECTORSTORE_PATH / "metadata.json", 'r', encoding='utf-8') as f:
-            metadata = json.load(f)
+        from backend.core.chunk_store import load_chunks
+        chunks, metadata = load_chunks(VECTORSTORE_PATH)
         
         print(f"✅ RAG Loaded: {rag_index.ntotal} vectors, {len(chunks)} chunks\n")
         
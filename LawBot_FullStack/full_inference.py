@@ -6,7 +6,6 @@ This loads the complete system: fine-tuned model + RAG retrieval
 
 import os
 import sys
-import json
 import torch
 from pathlib import Path
 from datetime import datetime
@@ -19,6 +18,7 @@ print("   Please be patient, this is normal!\n")
 
 # Setup paths
 BASE_DIR = Path(__file__).parent
+sys.path.append(str(BASE_DIR))
 MODEL_PATH = BASE_DIR / "models" / "adapters" / "lawbot_qwen_adapter"
 VECTORSTORE_PATH = BASE_DIR / "data" / "vectorstore" / "faiss_index"
 BASE_MODEL = "Qwen/Qwen2.5-1.5B-Instruct"
@@ -45,6 +45,7 @@ class FullLawBot:
         self.rag_chunks = None
         self.rag_metadata = None
         self.embedding_model = None
+        self.context_packer = None
         self.device = "cuda" if torch.cuda.is_available() else "cpu"
         
         print(f"🖥️  Device: {self.device}")
@@ -69,27 +70,42 @@ class FullLawBot:
             self.tokenizer = AutoTokenizer.from_pretrained(BASE_MODEL)
             print("  ✅ Tokenizer loaded")
             
-            print(f"\n  [2/4] Loading base model: {BASE_MODEL}")
-            print("        (This takes 1-2 minutes on CPU...)")
-            base_model = AutoModelForCausalLM.from_pretrained(
-                BASE_MODEL,
-                torch_dtype=torch.float16 if self.device == "cuda" else torch.float32,
-                device_map="auto" if self.device == "cuda" else None,
-                low_cpu_mem_usage=True,
-            )
-            print("  ✅ Base model loaded")
-            
-            # Load LoRA adapters
-            if MODEL_PATH.exists():
-                print(f"\n  [3/4] Loading LoRA adapters from: {MODEL_PATH.name}")
-                print("        (This takes 30-60 seconds...)")
-                self.model = PeftModel.from_pretrained(base_model, str(MODEL_PATH))
-                print("  ✅ Fine-tuned adapters loaded!")
+            from config.settings import MODEL_CONFIG
+            if MODEL_PATH.exists() and MODEL_CONFIG.get("merge_adapter", False):
+                # Adapter folded into the base weights and cached as safetensors
+                from backend.core.merged_model import load_merged_model
+                print(f"\n  [2/4] Loading merged model (base + {MODEL_PATH.name})")
+                print("        (First run merges and caches it; later runs load it directly)")
+                self.model = load_merged_model(
+                    BASE_MODEL, MODEL_PATH, MODEL_CONFIG["merged_model_dir"],
+                    torch_dtype=torch.float16 if self.device == "cuda" else torch.float32,
+                    device_map="auto" if self.device == "cuda" else None,
+                )
+                print("  ✅ Merged model loaded")
+                print("\n  [3/4] LoRA adapters already merged")
                 print("\n  🎉 FULL FINE-TUNED MODEL READY!")
             else:
-                print(f"\n  ⚠️  No adapters found at {MODEL_PATH}")
-                print("      Using base model only")
-                self.model = base_model
+                print(f"\n  [2/4] Loading base model: {BASE_MODEL}")
+                print("        (This takes 1-2 minutes on CPU...)")
+                base_model = AutoModelForCausalLM.from_pretrained(
+                    BASE_MODEL,
+                    torch_dtype=torch.float16 if self.device == "cuda" else torch.float32,
+                    device_map="auto" if self.device == "cuda" else None,
+                    low_cpu_mem_usage=True,
+                )
+                print("  ✅ Base model loaded")
+                
+                # Load LoRA adapters
+                if MODEL_PATH.exists():
+                    print(f"\n  [3/4] Loading LoRA adapters from: {MODEL_PATH.name}")
+                    print("        (This takes 30-60 seconds...)")
+                    self.model = PeftModel.from_pretrained(base_model, str(MODEL_PATH))
+                    print("  ✅ Fine-tuned adapters loaded!")
+                    print("\n  🎉 FULL FINE-TUNED MODEL READY!")
+                else:
+                    print(f"\n  ⚠️  No adapters found at {MODEL_PATH}")
+                    print("      Using base model only")
+                    self.model = base_model
             
             print("\n  [4/4] Moving to device...")
             if self.device == "cpu":
@@ -129,10 +145,8 @@ class FullLawBot:
                 print(f"  ✅ FAISS index loaded: {self.rag_index.ntotal} vectors")
                 
                 print(f"\n  [3/3] Loading chunks and metadata...")
-                with open(VECTORSTORE_PATH / "chunks.json", 'r', encoding='utf-8') as f:
-                    self.rag_chunks = json.load(f)
-                with open(VECTORSTORE_PATH / "metadata.json", 'r', encoding='utf-8') as f:
-                    self.rag_metadata = json.load(f)
+                from backend.core.chunk_store import load_chunks
+                self.rag_chunks, self.rag_metadata = load_chunks(VECTORSTORE_PATH)
                 
                 print(f"  ✅ Loaded {len(self.rag_chunks)} document chunks")
                 print("\n✅ RAG LOADING COMPLETE!\n")
@@ -187,7 +201,7 @@ class FullLawBot:
         
         return terms_found
     
-    def generate_with_model(self, query: str, context: str) -> str:
+    def generate_with_model(self, query: str, contexts: list) -> str:
         """Generate response using fine-tuned model"""
         if not self.model or not self.tokenizer:
             return "❌ Model not available. Using RAG-only mode."
@@ -195,9 +209,9 @@ class FullLawBot:
         try:
             print("\n  🤖 Generating response with fine-tuned model...")
             
-            # Format prompt with RAG context
-            if context:
-                prompt = f"""<|im_start|>system
+            # Format prompt with RAG context, packed into the prompt token budget
+            if contexts:
+                render = lambda context: f"""<|im_start|>system
 You are LawBot, an expert legal assistant specializing in Indian law (IPC, CrPC, Constitution). 
 Provide accurate, helpful responses based on the context provided. Always cite relevant laws.
 <|im_end|>
@@ -211,6 +225,15 @@ Please provide a comprehensive answer based on the context above.
 <|im_end|>
 <|im_start|>assistant
 """
+                if self.context_packer is None:
+                    from backend.core.context_packer import ContextPacker
+                    from config.settings import MODEL_CONFIG
+                    self.context_packer = ContextPacker(self.tokenizer, MODEL_CONFIG["max_prompt_tokens"])
+                packed = self.context_packer.pack(contexts, render)
+                prompt = packed["prompt"]
+                print(f"     📏 Prompt: {packed['prompt_tokens']} tokens "
+                      f"({packed['chunks_packed']}/{packed['chunks_offered']} chunks"
+                      f"{', last one trimmed' if packed['trimmed'] else ''})")
             else:
                 prompt = f"""<|im_start|>system
 You are LawBot, an expert legal assistant specializing in Indian law.
@@ -222,12 +245,7 @@ Question: {query}
 """
             
             # Tokenize
-            inputs = self.tokenizer(
-                prompt, 
-                return_tensors="pt", 
-                truncation=True, 
-                max_length=2048
-            )
+            inputs = self.tokenizer(prompt, return_tensors="pt")
             
             if self.device == "cuda":
                 inputs = {k: v.to(self.device) for k, v in inputs.items()}
@@ -263,7 +281,7 @@ Question: {query}
             print(f"\n  ❌ Generation error: {e}")
             import traceback
             traceback.print_exc()
-            return f"Error generating response. Using context instead:\n\n{context[:500] if context else 'No context available'}"
+            return f"Error generating response. Using context instead:\n\n{contexts[0][:500] if contexts else 'No context available'}"
     
     def answer_query(self, query: str):
         """Answer a legal query with full system"""
@@ -280,12 +298,8 @@ Question: {query}
             print("\n📚 Top Retrieved Context:")
             for i, context in enumerate(contexts[:2], 1):
                 print(f"\n  [{i}] {context[:200]}{'...' if len(context) > 200 else ''}")
-            
-            # Combine contexts
-            combined_context = "\n\n".join(contexts[:3])
         else:
             print("  ⚠️  No relevant context found")
-            combined_context = ""
         
         # Step 2: Legal Terms
         terms = self.detect_legal_terms(query)
@@ -296,7 +310,7 @@ Question: {query}
         
         # Step 3: Generate with Model
         print("\n💡 Step 2: Generating response...")
-        response = self.generate_with_model(query, combined_context)
+        response = self.generate_with_model(query, contexts)
         
         # Display response
         print("\n" + "─"*70)
@@ -5,7 +5,6 @@ Simple interface for testing fine-tuned model with RAG and tools
 
 import os
 import sys
-import json
 import torch
 import gradio as gr
 import numpy as np
@@ -46,6 +45,7 @@ class LawBotInference:
         self.rag_chunks = None
         self.rag_metadata = None
         self.embedding_model = None
+        self.context_packer = None
         self.device = "cuda" if torch.cuda.is_available() else "cpu"
         
         print(f"Device: {self.device}")
@@ -64,6 +64,20 @@ class LawBotInference:
             print(f"  Loading tokenizer...")
             self.tokenizer = AutoTokenizer.from_pretrained(BASE_MODEL)
             
+            from config.settings import MODEL_CONFIG
+            if MODEL_PATH.exists() and MODEL_CONFIG.get("merge_adapter", False):
+                # Adapter folded into the base weights and cached as safetensors
+                from backend.core.merged_model import load_merged_model
+                print(f"  Loading merged model (base + {MODEL_PATH.name})")
+                self.model = load_merged_model(
+                    BASE_MODEL, MODEL_PATH, MODEL_CONFIG["merged_model_dir"],
+                    torch_dtype=torch.float16 if self.device == "cuda" else torch.float32,
+                    device_map="auto" if self.device == "cuda" else None,
+                )
+                print("  ✅ Fine-tuned model loaded!")
+                print("✅ Model loaded successfully!")
+                return
+            
             print(f"  Loading base model: {BASE_MODEL}")
             base_model = AutoModelForCausalLM.from_pretrained(
                 BASE_MODEL,
@@ -113,10 +127,8 @@ class LawBotInference:
                 self.rag_index = faiss.read_index(str(index_file))
                 
                 # Load chunks and metadata
-                with open(VECTORSTORE_PATH / "chunks.json", 'r', encoding='utf-8') as f:
-                    self.rag_chunks = json.load(f)
-                with open(VECTORSTORE_PATH / "metadata.json", 'r', encoding='utf-8') as f:
-                    self.rag_metadata = json.load(f)
+                from backend.core.chunk_store import load_chunks
+                self.rag_chunks, self.rag_metadata = load_chunks(VECTORSTORE_PATH)
                 
                 print(f"  ✅ RAG loaded: {self.rag_index.ntotal} vectors, {len(self.rag_chunks)} chunks")
             else:
@@ -127,10 +139,10 @@ class LawBotInference:
             print(f"❌ Error loading RAG: {e}")
             self.rag_index = None
     
-    def retrieve_context(self, query: str, top_k: int = 5) -> Tuple[str, List[str]]:
-        """Retrieve relevant context using RAG"""
+    def retrieve_context(self, query: str, top_k: int = 5) -> Tuple[List[str], List[str]]:
+        """Retrieve relevant context chunks using RAG (most relevant first)"""
         if not self.rag_index or not self.embedding_model:
-            return "", []
+            return [], []
         
         try:
             # Generate query embedding
@@ -151,12 +163,11 @@ class LawBotInference:
                         if source not in citations:
                             citations.append(source)
             
-            context = "\n\n".join(context_parts)
-            return context, citations
+            return context_parts, citations
             
         except Exception as e:
             print(f"RAG retrieval error: {e}")
-            return "", []
+            return [], []
     
     def detect_tools(self, query: str) -> List[Dict[str, str]]:
         """Detect which legal tools might be needed"""
@@ -182,14 +193,14 @@ class LawBotInference:
         
         return tools_used
     
-    def generate_response(self, query: str, context: str) -> str:
+    def generate_response(self, query: str, context_parts: List[str]) -> str:
         """Generate response using fine-tuned model"""
         if not self.model or not self.tokenizer:
             return "Model not available. Please check model loading."
         
         try:
-            # Format prompt
-            prompt = f"""<|im_start|>system
+            # Format prompt, packing as many context chunks as the token budget allows
+            render = lambda context: f"""<|im_start|>system
 You are LawBot, an expert legal assistant specializing in Indian law. Provide accurate, helpful responses about Indian legal matters. Always cite relevant laws and be clear about limitations.
 <|im_end|>
 <|im_start|>user
@@ -202,9 +213,15 @@ Please provide a comprehensive answer based on the context above.
 <|im_end|>
 <|im_start|>assistant
 """
+            if self.context_packer is None:
+                from backend.core.context_packer import ContextPacker
+                from config.settings import MODEL_CONFIG
+                self.context_packer = ContextPacker(self.tokenizer, MODEL_CONFIG["max_prompt_tokens"])
+            packed = self.context_packer.pack(context_parts, render)
+            print(f"Prompt: {packed['prompt_tokens']} tokens, {packed['chunks_packed']}/{packed['chunks_offered']} chunks")
             
-            # Tokenize
-            inputs = self.tokenizer(prompt, return_tensors="pt", truncation=True, max_length=2048)
+            # Tokenize (the packed prompt is already within budget, nothing gets truncated)
+            inputs = self.tokenizer(packed["prompt"], return_tensors="pt")
             if self.device == "cuda":
                 inputs = {k: v.to(self.device) for k, v in inputs.items()}
             
@@ -235,14 +252,15 @@ Please provide a comprehensive answer based on the context above.
             return history, ""
         
         # Step 1: RAG Retrieval
-        context, citations = self.retrieve_context(query)
+        context_parts, citations = self.retrieve_context(query)
+        context = "\n\n".join(context_parts)
         
         # Step 2: Tool Detection
         tools_used = self.detect_tools(query)
         
         # Step 3: Generate Response
         if self.model:
-            response = self.generate_response(query, context)
+            response = self.generate_response(query, context_parts)
         else:
             # Fallback response
             response = f"I understand you're asking about: '{query}'\n\n"
@@ -0,0 +1,128 @@
+"""
+ANN Index Benchmark
+Reports recall@k against the exact flat index and p50/p99 query latency per index type
+"""
+
+import sys
+import json
+import time
+import argparse
+from pathlib import Path
+
+import numpy as np
+
+BASE_DIR = Path(__file__).parent.parent
+sys.path.append(str(BASE_DIR))
+
+import faiss
+from backend.core.index_factory import build_index, search_parameters, INDEX_TYPES
+from config.settings import RAG_CONFIG
+
+VECTORSTORE_DIR = BASE_DIR / "data" / "vectorstore" / "faiss_index"
+VAL_FILE = BASE_DIR / "data" / "processed" / "val.jsonl"
+
+def load_corpus(args) -> np.ndarray:
+    """
+    Stored flat-index vectors, optionally replicated with noise to simulate a larger corpus.
+    
+    populate_vectorstore.py wraps the flat index in an IndexIDMap2 (chunk ids
+    for incremental updates); the vectors are read from the wrapped index.
+    """
+    if args.synthetic:
+        print(f"  Using {args.synthetic} random vectors (dim=384)")
+        rng = np.random.default_rng(0)
+        return rng.standard_normal((args.synthetic, 384)).astype("float32")
+    
+    stored = faiss.read_index(str(Path(args.vectorstore) / "faiss_index.idx"))
+    # The wrapper owns the wrapped index, so `stored` stays referenced while it is used
+    index = faiss.downcast_index(stored.index) if isinstance(stored, faiss.IndexIDMap) else stored
+    if not isinstance(index, faiss.IndexFlat):
+        raise SystemExit("❌ The stored index is not flat; rebuild with index_type='flat' or use --synthetic")
+    vectors = index.reconstruct_n(0, index.ntotal)
+    
+    if args.scale > 1:
+        rng = np.random.default_rng(0)
+        copies = [vectors] + [vectors + rng.normal(0, 0.05, vectors.shape).astype("float32")
+                              for _ in range(args.scale - 1)]
+        vectors = np.vstack(copies)
+    print(f"  Corpus: {len(vectors)} vectors")
+    return vectors
+
+def load_queries(args, corpus: np.ndarray) -> np.ndarray:
+    """Encode validation questions with the retrieval encoder, or perturb corpus vectors"""
+    if not args.synthetic and VAL_FILE.exists():
+        try:
+            from sentence_transformers import SentenceTransformer
+            with open(VAL_FILE, "r", encoding="utf-8") as f:
+                questions = [json.loads(line)["instruction"] for line in f][:args.queries]
+            model = SentenceTransformer(RAG_CONFIG["embedding_model"])
+            print(f"  Queries: {len(questions)} questions from {VAL_FILE.name}")
+            return model.encode(questions, convert_to_numpy=True).astype("float32")
+        except ImportError:
+            print("  ⚠️  sentence-transformers not available, using perturbed corpus vectors as queries")
+    
+    rng = np.random.default_rng(1)
+    picks = corpus[rng.choice(len(corpus), args.queries, replace=False)]
+    print(f"  Queries: {args.queries} perturbed corpus vectors")
+    return picks + rng.normal(0, 0.1, picks.shape).astype("float32")
+
+def timed_search(index, queries: np.ndarray, k: int, params):
+    """Search one query at a time (as the API does) and collect latencies in ms"""
+    latencies = []
+    results = np.empty((len(queries), k), dtype="int64")
+    for i in range(len(queries)):
+        start = time.perf_counter()
+        _, ids = index.search(queries[i:i + 1], k, params=params)
+        latencies.append((time.perf_counter() - start) * 1000)
+        results[i] = ids[0]
+    return results, np.array(latencies)
+
+def recall_at_k(results: np.ndarray, truth: np.ndarray) -> float:
+    hits = sum(len(set(r) & set(t)) for r, t in zip(results, truth))
+    return hits / truth.size
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark approximate FAISS indexes against the flat index")
+    parser.add_argument("--vectorstore", default=str(VECTORSTORE_DIR), help="Directory with a flat (optionally ID-mapped) faiss_index.idx")
+    parser.add_argument("--types", default="ivf_flat,ivf_pq,hnsw", help=f"Comma-separated subset of {INDEX_TYPES}")
+    parser.add_argument("--k", type=int, default=RAG_CONFIG["top_k"], help="Neighbours per query")
+    parser.add_argument("--queries", type=int, default=500, help="Number of queries")
+    parser.add_argument("--nprobe", default="4,16,64", help="IVF nprobe values to sweep")
+    parser.add_argument("--ef-search", default="16,64,256", help="HNSW efSearch values to sweep")
+    parser.add_argument("--scale", type=int, default=1, help="Replicate the corpus N times with noise")
+    parser.add_argument("--synthetic", type=int, default=0, help="Use N random vectors instead of the vectorstore")
+    args = parser.parse_args()
+    
+    print("📊 ANN index benchmark\n")
+    corpus = load_corpus(args)
+    queries = load_queries(args, corpus)
+    
+    flat = build_index(corpus, "flat")
+    truth, flat_latency = timed_search(flat, queries, args.k, None)
+    
+    rows = [("flat", "-", 0.0, 1.0, flat_latency)]
+    for index_type in [t.strip() for t in args.types.split(",") if t.strip()]:
+        start = time.perf_counter()
+        index = build_index(corpus, index_type, RAG_CONFIG.get("index_params"))
+        build_s = time.perf_counter() - start
+        
+        if index_type.startswith("ivf"):
+            sweep = [("nprobe", int(v), search_parameters(index, nprobe=int(v))) for v in args.nprobe.split(",")]
+        elif index_type == "hnsw":
+            sweep = [("efSearch", int(v), search_parameters(index, ef_search=int(v))) for v in args.ef_search.split(",")]
+        else:
+            sweep = [("-", "-", None)]
+        
+        for name, value, params in sweep:
+            results, latency = timed_search(index, queries, args.k, params)
+            rows.append((index_type, f"{name}={value}", build_s, recall_at_k(results, truth), latency))
+    
+    print(f"\n  {'index':<10} {'setting':<14} {'build s':>8} {'recall@' + str(args.k):>10} {'p50 ms':>8} {'p99 ms':>8}")
+    for index_type, setting, build_s, recall, latency in rows:
+        print(f"  {index_type:<10} {setting:<14} {build_s:>8.2f} {recall:>10.3f} "
+              f"{np.percentile(latency, 50):>8.3f} {np.percentile(latency, 99):>8.3f}")
+    return True
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
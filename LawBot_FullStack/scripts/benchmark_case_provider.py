@@ -0,0 +1,131 @@
+"""
+Case Provider Benchmark
+Drives the pooled case-provider client against a local stub server (or a real provider with --url)
+and reports coalescing, cache hits, timeouts and p50/p99 upstream latency
+"""
+
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import urlparse, parse_qs
+
+BASE_DIR = Path(__file__).parent.parent
+sys.path.append(str(BASE_DIR))
+
+import httpx
+
+from backend.core.case_provider import CaseProviderClient
+from config.settings import CASE_PROVIDER_CONFIG
+
+SLOW_QUERY = "slow query"
+
+def start_stub_server(delay_ms: float, jitter_ms: float):
+    """Indian Kanoon-shaped /search/ endpoint on a free local port; SLOW_QUERY never answers in time"""
+    calls = {"count": 0}
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive
+
+        def do_POST(self):
+            query = parse_qs(urlparse(self.path).query).get("formInput", [""])[0]
+            with lock:
+                calls["count"] += 1
+            time.sleep(30 if query == SLOW_QUERY else (delay_ms + random.uniform(0, jitter_ms)) / 1000)
+            body = json.dumps({"docs": [{
+                "tid": abs(hash(query)) % 10 ** 7,
+                "title": f"<b>{query.title()}</b> v. State of Maharashtra",
+                "docsource": "Supreme Court of India",
+                "publishdate": "2001-01-01",
+                "headline": f"Held on <b>{query}</b>.",
+            }]}).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, calls
+
+async def run(args, base_url: str, calls):
+    client = CaseProviderClient(
+        base_url=base_url,
+        api_key=CASE_PROVIDER_CONFIG["api_key"],
+        timeout=args.timeout,
+        connect_timeout=CASE_PROVIDER_CONFIG["connect_timeout"],
+        max_connections=CASE_PROVIDER_CONFIG["max_connections"],
+        max_keepalive=CASE_PROVIDER_CONFIG["max_keepalive"],
+        per_host_limit=args.per_host_limit,
+    )
+    rng = random.Random(args.seed)
+    queries = [f"case {number}" for number in range(args.distinct)]
+    workload = [rng.choice(queries) for _ in range(args.lookups)]
+
+    print(f"📊 {args.lookups} concurrent lookups over {args.distinct} distinct queries "
+          f"(per-host limit {args.per_host_limit})")
+    started = time.perf_counter()
+    results = await asyncio.gather(*(client.search(query) for query in workload), return_exceptions=True)
+    cold = time.perf_counter() - started
+    failures = sum(isinstance(result, Exception) for result in results)
+    upstream = calls["count"] if calls else client.stats["upstream_calls"]
+    print(f"  Cold:  {cold * 1000:.0f} ms, {upstream} upstream calls, "
+          f"{client.stats['coalesced']} coalesced, {failures} failed")
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client.search(query) for query in workload))
+    warm = time.perf_counter() - started
+    print(f"  Warm:  {warm * 1000:.1f} ms, {client.stats['cache_hits']} cache hits")
+
+    if calls is not None:
+        started = time.perf_counter()
+        try:
+            await client.search(SLOW_QUERY)
+            print("  ❌ Slow upstream was not cut off")
+        except httpx.TimeoutException:
+            print(f"  Slow upstream cut off after {time.perf_counter() - started:.2f}s (timeout {args.timeout}s)")
+
+    stats = client.get_stats()
+    print(f"\n  Upstream latency p50 {stats['upstream_ms_p50']} ms, p99 {stats['upstream_ms_p99']} ms")
+    await client.aclose()
+    return failures == 0 and upstream <= args.distinct
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the pooled case-provider client")
+    parser.add_argument("--url", help="Provider base URL (default: start a local stub server)")
+    parser.add_argument("--lookups", type=int, default=2000)
+    parser.add_argument("--distinct", type=int, default=200)
+    parser.add_argument("--delay-ms", type=float, default=50.0, help="Stub server response time")
+    parser.add_argument("--jitter-ms", type=float, default=50.0)
+    parser.add_argument("--timeout", type=float, default=1.0)
+    parser.add_argument("--per-host-limit", type=int, default=CASE_PROVIDER_CONFIG["per_host_limit"])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    server, calls = None, None
+    base_url = args.url
+    if base_url is None:
+        server, calls = start_stub_server(args.delay_ms, args.jitter_ms)
+        base_url = f"http://127.0.0.1:{server.server_address[1]}"
+        print(f"🧪 Stub provider at {base_url}")
+
+    success = asyncio.run(run(args, base_url, calls))
+    if server:
+        server.shutdown()
+    print(f"\n{'✅' if success else '❌'} Done")
+    return success
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,101 @@
+"""
+Chunk Store Benchmark
+Compares load time and resident memory of chunks.json/metadata.json vs chunkstore.bin
+"""
+
+import sys
+import json
+import time
+import random
+import argparse
+import subprocess
+from pathlib import Path
+
+BASE_DIR = Path(__file__).parent.parent
+sys.path.append(str(BASE_DIR))
+
+VECTORSTORE_DIR = BASE_DIR / "data" / "vectorstore" / "faiss_index"
+
+def current_rss_mb() -> float:
+    """Resident set size of this process in MB"""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / (1024 * 1024)
+    except ImportError:
+        # Linux fallback: second field of statm is resident pages
+        import os
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+
+def measure(mode: str, vectorstore_dir: Path, lookups: int) -> dict:
+    """Load one format and read `lookups` random chunks (run in a fresh process)"""
+    from backend.core.chunk_store import ChunkStore, CHUNK_STORE_FILE
+    
+    rss_before = current_rss_mb()
+    start = time.perf_counter()
+    if mode == "json":
+        with open(vectorstore_dir / "chunks.json", "r", encoding="utf-8") as f:
+            chunks = json.load(f)
+        metadata_file = vectorstore_dir / "metadata.json"
+        metadata = []
+        if metadata_file.exists():
+            with open(metadata_file, "r", encoding="utf-8") as f:
+                metadata = json.load(f)
+    else:
+        store = ChunkStore(vectorstore_dir / CHUNK_STORE_FILE)
+        chunks, metadata = store, store.metadata
+    load_ms = (time.perf_counter() - start) * 1000
+    rss_loaded = current_rss_mb()
+    
+    rng = random.Random(0)
+    start = time.perf_counter()
+    for _ in range(lookups):
+        idx = rng.randrange(len(chunks))
+        text = chunks[idx]
+        source = metadata[idx].get("source", "Unknown") if idx < len(metadata) else "Unknown"
+    lookup_us = (time.perf_counter() - start) * 1e6 / max(lookups, 1)
+    
+    return {
+        "mode": mode,
+        "chunks": len(chunks),
+        "load_ms": round(load_ms, 2),
+        "rss_load_mb": round(rss_loaded - rss_before, 2),
+        # mmapped pages touched by lookups are file-backed and reclaimable
+        "rss_after_lookups_mb": round(current_rss_mb() - rss_before, 2),
+        "lookup_us": round(lookup_us, 2),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark JSON vs mmapped chunk store loading")
+    parser.add_argument("--vectorstore", default=str(VECTORSTORE_DIR), help="Vectorstore directory")
+    parser.add_argument("--lookups", type=int, default=1000, help="Random chunk reads after loading")
+    parser.add_argument("--mode", choices=["json", "binary"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    vectorstore_dir = Path(args.vectorstore)
+    
+    if args.mode:
+        print(json.dumps(measure(args.mode, vectorstore_dir, args.lookups)))
+        return True
+    
+    from backend.core.chunk_store import CHUNK_STORE_FILE
+    if not (vectorstore_dir / CHUNK_STORE_FILE).exists():
+        print(f"❌ {CHUNK_STORE_FILE} not found - run scripts/convert_chunks_to_binary.py first")
+        return False
+    
+    print("📊 Chunk store benchmark (each format measured in a fresh process)\n")
+    print(f"  {'format':<8} {'chunks':>8} {'load ms':>10} {'RSS load':>10} {'RSS reads':>10} {'lookup µs':>10}")
+    for mode in ["json", "binary"]:
+        result = subprocess.run(
+            [sys.executable, __file__, "--mode", mode, "--vectorstore", str(vectorstore_dir),
+             "--lookups", str(args.lookups)],
+            capture_output=True, text=True, check=True,
+        )
+        r = json.loads(result.stdout.strip().splitlines()[-1])
+        print(f"  {r['mode']:<8} {r['chunks']:>8} {r['load_ms']:>10} {r['rss_load_mb']:>10} "
+              f"{r['rss_after_lookups_mb']:>10} {r['lookup_us']:>10}")
+    print("\n  RSS columns are MB added after loading and after the random reads")
+    return True
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,73 @@
+"""
+Glossary Benchmark
+Imports a synthetic glossary into a scratch database and times exact, prefix, word and fuzzy lookups
+"""
+
+import sys
+import time
+import random
+import argparse
+import tempfile
+from pathlib import Path
+
+BASE_DIR = Path(__file__).parent.parent
+sys.path.append(str(BASE_DIR))
+
+from backend.core.glossary_store import GlossaryStore
+from scripts.benchmark_tool_detection import synthetic_glossary
+
+def typo(term: str, rng: random.Random) -> str:
+    """One random deletion, substitution or adjacent swap"""
+    i = rng.randrange(len(term))
+    kind = rng.choice(("delete", "substitute", "swap"))
+    if kind == "delete" and len(term) > 3:
+        return term[:i] + term[i + 1:]
+    if kind == "swap" and i < len(term) - 1:
+        return term[:i] + term[i + 1] + term[i] + term[i + 2:]
+    return term[:i] + rng.choice("abcdefghijklmnopqrstuvwxyz") + term[i + 1:]
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark glossary lookups at scale")
+    parser.add_argument("--terms", type=int, default=100000)
+    parser.add_argument("--lookups", type=int, default=2000, help="Lookups per query kind")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    
+    rng = random.Random(args.seed)
+    terms = synthetic_glossary(args.terms, args.seed)
+    
+    with tempfile.TemporaryDirectory() as scratch:
+        db_path = Path(scratch) / "glossary.db"
+        store = GlossaryStore(db_path)
+        start = time.perf_counter()
+        store.import_terms((term, f"Definition of {term}", "synthetic") for term in terms)
+        import_s = time.perf_counter() - start
+        size_mb = db_path.stat().st_size / (1024 * 1024)
+        print(f"📊 {len(store)} terms imported in {import_s:.1f}s ({size_mb:.1f} MB)\n")
+        
+        sample = rng.sample(terms, args.lookups)
+        kinds = {
+            "exact": sample,
+            "prefix": [term[:max(3, len(term) // 2)] for term in sample],
+            "word": [rng.choice(term.split()) for term in sample],
+            "fuzzy": [typo(term, rng) for term in sample],
+        }
+        print(f"  {'query kind':<10} {'ms/lookup':>10} {'p99 ms':>8} {'found':>7}")
+        for kind, queries in kinds.items():
+            timings = []
+            found = 0
+            for query, expected in zip(queries, sample):
+                start = time.perf_counter()
+                results = store.lookup(query, limit=5)
+                timings.append((time.perf_counter() - start) * 1000)
+                found += any(r["term"] == expected for r in results)
+            timings.sort()
+            print(f"  {kind:<10} {sum(timings) / len(timings):>10.3f} {timings[int(len(timings) * 0.99)]:>8.3f} "
+                  f"{found / len(queries):>7.1%}")
+        store.close()
+    print("\n  found = the source term is among the top 5 results")
+    return True
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,143 @@
+"""
+Precision Benchmark
+Compares tokens/sec, resident memory and answer agreement of float32, bfloat16 and int8 inference
+"""
+
+import sys
+import json
+import time
+import difflib
+import argparse
+import subprocess
+from pathlib import Path
+
+BASE_DIR = Path(__file__).parent.parent
+sys.path.append(str(BASE_DIR))
+
+VAL_FILE = BASE_DIR / "data" / "processed" / "val.jsonl"
+
+def current_rss_mb() -> float:
+    """Resident set size of this process in MB"""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / (1024 * 1024)
+    except ImportError:
+        # Linux fallback: second field of statm is resident pages
+        import os
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+
+def load_prompts(val_file: Path, count: int) -> list:
+    """First `count` questions of the validation split (fixed, so every run sees the same set)"""
+    prompts = []
+    with open(val_file, "r", encoding="utf-8") as f:
+        for line in f:
+            if len(prompts) >= count:
+                break
+            prompts.append(json.loads(line)["instruction"])
+    return prompts
+
+def measure(precision: str, prompts: list, max_new_tokens: int) -> dict:
+    """Load the model at one precision and answer every prompt greedily (run in a fresh process)"""
+    import torch
+    from config.settings import MODEL_CONFIG
+
+    # Plain generate() path so only the weights' precision differs between runs
+    MODEL_CONFIG.update({"precision": precision, "continuous_batching": False, "prefix_cache": False})
+    from backend.core.model_manager import ModelManager
+
+    rss_before = current_rss_mb()
+    start = time.perf_counter()
+    manager = ModelManager()
+    if not manager.load_model():
+        raise RuntimeError(f"Model failed to load at {precision}")
+    load_s = time.perf_counter() - start
+    rss_loaded = current_rss_mb()
+
+    answers = []
+    new_tokens = 0
+    start = time.perf_counter()
+    for prompt in prompts:
+        inputs = manager.tokenizer(manager._format_prompt(prompt), return_tensors="pt").to(manager.device)
+        with torch.no_grad():
+            outputs = manager.model.generate(
+                **inputs,
+                max_new_tokens=max_new_tokens,
+                do_sample=False,
+                pad_token_id=manager.tokenizer.eos_token_id,
+            )
+        generated = outputs[0][inputs["input_ids"].shape[1]:]
+        new_tokens += len(generated)
+        answers.append(manager.tokenizer.decode(generated, skip_special_tokens=True).strip())
+    elapsed = time.perf_counter() - start
+    manager.worker.stop()
+
+    return {
+        "precision": manager.precision,
+        "load_s": round(load_s, 1),
+        "rss_mb": round(rss_loaded - rss_before, 1),
+        "peak_rss_mb": round(current_rss_mb(), 1),
+        "tokens": new_tokens,
+        "tokens_per_sec": round(new_tokens / elapsed, 2) if elapsed > 0 else 0.0,
+        "answers": answers,
+    }
+
+def agreement(reference: list, answers: list) -> dict:
+    """Exact-match rate and mean character similarity against the float32 answers"""
+    exact = sum(a == b for a, b in zip(reference, answers))
+    similarity = [difflib.SequenceMatcher(None, a, b).ratio() for a, b in zip(reference, answers)]
+    return {
+        "exact": round(exact / len(reference), 3) if reference else 0.0,
+        "similarity": round(sum(similarity) / len(similarity), 3) if similarity else 0.0,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark float32 vs bfloat16 vs int8 inference")
+    parser.add_argument("--precisions", default="float32,bfloat16,int8", help="Comma-separated precisions; the first is the reference")
+    parser.add_argument("--prompts", type=int, default=20, help="Questions taken from val.jsonl")
+    parser.add_argument("--max-new-tokens", type=int, default=64)
+    parser.add_argument("--val-file", default=str(VAL_FILE))
+    parser.add_argument("--measure", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    prompts = load_prompts(Path(args.val_file), args.prompts)
+
+    if args.measure:
+        print(json.dumps(measure(args.measure, prompts, args.max_new_tokens)))
+        return True
+
+    if not prompts:
+        print(f"❌ No prompts found in {args.val_file}")
+        return False
+
+    print(f"📊 Precision benchmark: {len(prompts)} prompts, {args.max_new_tokens} new tokens, greedy")
+    print("  (each precision measured in a fresh process)\n")
+
+    results = []
+    for precision in args.precisions.split(","):
+        print(f"  ⏳ {precision}...")
+        result = subprocess.run(
+            [sys.executable, __file__, "--measure", precision, "--prompts", str(args.prompts),
+             "--max-new-tokens", str(args.max_new_tokens), "--val-file", args.val_file],
+            capture_output=True, text=True,
+        )
+        if result.returncode != 0:
+            print(f"  ❌ {precision} failed:\n{result.stderr[-2000:]}")
+            continue
+        results.append(json.loads(result.stdout.strip().splitlines()[-1]))
+
+    if not results:
+        return False
+
+    reference = results[0]["answers"]
+    print(f"\n  {'precision':<10} {'load s':>8} {'RSS MB':>9} {'tok/s':>8} {'exact':>7} {'similar':>8}")
+    for r in results:
+        agree = agreement(reference, r["answers"])
+        print(f"  {r['precision']:<10} {r['load_s']:>8} {r['rss_mb']:>9} {r['tokens_per_sec']:>8} "
+              f"{agree['exact']:>7} {agree['similarity']:>8}")
+    print(f"\n  Agreement is measured against {results[0]['precision']}")
+    return True
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,84 @@
+"""
+Tool Detection Benchmark
+Compares the per-term substring scan with the Aho-Corasick term matcher on a large synthetic glossary
+"""
+
+import sys
+import json
+import time
+import random
+import argparse
+from pathlib import Path
+
+BASE_DIR = Path(__file__).parent.parent
+sys.path.append(str(BASE_DIR))
+
+from backend.core.term_matcher import TermMatcher, words
+from config.settings import LEGAL_TOOLS
+
+VAL_FILE = BASE_DIR / "data" / "processed" / "val.jsonl"
+VOCABULARY_FILE = BASE_DIR / "data" / "vectorstore" / "faiss_index" / "vocabulary.json"
+
+def load_queries(val_file: Path, count: int) -> list:
+    queries = []
+    with open(val_file, "r", encoding="utf-8") as f:
+        for line in f:
+            if len(queries) >= count:
+                break
+            queries.append(json.loads(line)["instruction"])
+    return queries
+
+def synthetic_glossary(size: int, seed: int) -> list:
+    """Real dictionary terms plus 1-3 word phrases drawn from the corpus vocabulary"""
+    with open(VOCABULARY_FILE, "r", encoding="utf-8") as f:
+        vocabulary = sorted({word for token in json.load(f) for word in words(token)})
+    rng = random.Random(seed)
+    terms = dict.fromkeys(LEGAL_TOOLS["dictionary"])
+    while len(terms) < size:
+        terms[" ".join(rng.choices(vocabulary, k=rng.choice((1, 2, 2, 3))))] = None
+    return list(terms)
+
+def substring_scan(terms: list, query: str) -> list:
+    """The previous detect_tool_usage loop: one `in` check per term"""
+    query_lower = query.lower()
+    return [term for term in terms if term in query_lower]
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark tool-term detection at glossary scale")
+    parser.add_argument("--terms", type=int, default=100000)
+    parser.add_argument("--queries", type=int, default=1000, help="Questions from val.jsonl for the matcher")
+    parser.add_argument("--scan-queries", type=int, default=100, help="Subset timed with the substring scan (slow)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    
+    queries = load_queries(VAL_FILE, args.queries)
+    if not queries:
+        print(f"❌ No queries found in {VAL_FILE}")
+        return False
+    terms = synthetic_glossary(args.terms, args.seed)
+    print(f"📊 {len(terms)} terms, {len(queries)} queries ({args.scan_queries} for the substring scan)\n")
+    
+    start = time.perf_counter()
+    matcher = TermMatcher((term, None) for term in terms)
+    build_s = time.perf_counter() - start
+    print(f"  Automaton build: {build_s:.2f}s, {matcher.nodes} nodes")
+    
+    start = time.perf_counter()
+    matches = sum(len(matcher.find_all(query)) for query in queries)
+    matcher_us = (time.perf_counter() - start) / len(queries) * 1e6
+    
+    scan_subset = queries[:args.scan_queries]
+    start = time.perf_counter()
+    scan_matches = sum(len(substring_scan(terms, query)) for query in scan_subset)
+    scan_us = (time.perf_counter() - start) / max(len(scan_subset), 1) * 1e6
+    
+    print(f"\n  {'method':<18} {'µs/query':>12} {'matches/query':>15}")
+    print(f"  {'substring scan':<18} {scan_us:>12.1f} {scan_matches / max(len(scan_subset), 1):>15.2f}")
+    print(f"  {'aho-corasick':<18} {matcher_us:>12.1f} {matches / len(queries):>15.2f}")
+    print(f"\n  Speedup: {scan_us / matcher_us:.0f}x")
+    print("  (the substring scan also counts matches inside words, e.g. 'bail' in 'bailable')")
+    return True
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
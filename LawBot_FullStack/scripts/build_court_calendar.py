@@ -0,0 +1,51 @@
+"""
+Court Calendar Build Script
+Compiles a court's holiday list (data/calendars/<court>.txt) into the bitmap the deadline engine loads
+"""
+
+import sys
+import time
+import argparse
+from pathlib import Path
+
+BASE_DIR = Path(__file__).parent.parent
+sys.path.append(str(BASE_DIR))
+
+from backend.core.deadline_engine import CourtCalendar
+from config.settings import DEADLINE_CONFIG
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile court holiday lists into calendar bitmaps")
+    parser.add_argument("courts", nargs="*", help="Court names (default: every .txt in the calendar directory)")
+    parser.add_argument("--dir", default=DEADLINE_CONFIG["calendar_dir"], help="Calendar directory")
+    args = parser.parse_args()
+    
+    calendar_dir = Path(args.dir)
+    sources = [calendar_dir / f"{court}.txt" for court in args.courts] or sorted(calendar_dir.glob("*.txt"))
+    if not sources:
+        print(f"❌ No holiday lists in {calendar_dir}")
+        return False
+    
+    for source in sources:
+        if not source.exists():
+            print(f"❌ {source} not found")
+            return False
+        start = time.perf_counter()
+        try:
+            calendar = CourtCalendar.load(source, DEADLINE_CONFIG["weekmask"],
+                                          DEADLINE_CONFIG["range_start"], DEADLINE_CONFIG["range_end"])
+        except ValueError as e:
+            print(f"❌ {e}")
+            return False
+        target = source.with_suffix(".npz")
+        calendar.save(target)
+        print(f"✅ {source.stem}: {int(calendar.open.sum())} open days of {len(calendar.open)} "
+              f"({calendar.range_start}..{calendar.range_end}, weekmask {calendar.weekmask}) "
+              f"-> {target.name} in {(time.perf_counter() - start) * 1000:.0f} ms")
+    
+    print("\n💡 Restart the API to pick up new calendars (they are cached per worker)")
+    return True
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,104 @@
+"""
+FAQ Index Build Script
+Embeds every corpus question (the `instruction` field) into the FAQ short-circuit index
+"""
+
+import sys
+import json
+import time
+import argparse
+from pathlib import Path
+
+BASE_DIR = Path(__file__).parent.parent
+sys.path.append(str(BASE_DIR))
+
+from backend.core.embedding_cache import EmbeddingCache
+from backend.core.faq_index import FAQIndex
+from backend.core.response_cache import normalize_query
+from config.settings import RAG_CONFIG, FAQ_CONFIG
+
+SAMPLE_QUERIES = [
+    "What does section 438 pertain to?",
+    "what does Section 438 pertain to",
+    "What does section 437 pertain to?",
+    "What is the punishment for murder?",
+    "How do I file a complaint against my landlord?",
+]
+
+def load_faq(source_file: Path):
+    """
+    Questions, answers and sources from the cleaned corpus.
+
+    A question repeated with the same answer is kept once; a question the
+    corpus answers in more than one way is left out (the index cannot know
+    which answer is right). Returns the left-out questions as well.
+    """
+    entries, conflicting = {}, set()
+    with open(source_file, "r", encoding="utf-8") as f:
+        for line in f:
+            item = json.loads(line)
+            key = normalize_query(item["instruction"])
+            if not key:
+                continue
+            answer = item["output"].strip()
+            if key not in entries:
+                entries[key] = (item["instruction"].strip(), answer, item.get("source", "Unknown"))
+            elif " ".join(entries[key][1].split()) != " ".join(answer.split()):
+                conflicting.add(key)
+    kept = [entry for key, entry in entries.items() if key not in conflicting]
+    questions, answers, sources = (list(column) for column in zip(*kept)) if kept else ([], [], [])
+    return questions, answers, sources, sorted(entries[key][0] for key in conflicting)
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the FAQ question index used to skip generation")
+    parser.add_argument("--source", default=FAQ_CONFIG["source_file"], help="JSONL with instruction/output/source")
+    parser.add_argument("--output", default=FAQ_CONFIG["index_path"], help="FAQ index directory")
+    parser.add_argument("--no-embedding-cache", action="store_true", help="Re-encode every question")
+    args = parser.parse_args()
+    
+    source_file = Path(args.source)
+    if not source_file.exists():
+        print(f"❌ {source_file} not found")
+        return False
+    
+    questions, answers, sources, conflicting = load_faq(source_file)
+    print(f"📚 {len(questions)} unique questions from {source_file}")
+    if conflicting:
+        print(f"⚠️ {len(conflicting)} questions left out: the corpus gives them more than one answer")
+        for question in conflicting[:5]:
+            print(f"  - {question}")
+    
+    from sentence_transformers import SentenceTransformer
+    model_name = RAG_CONFIG["embedding_model"]
+    print(f"📦 Loading {model_name}...")
+    model = SentenceTransformer(model_name)
+    encode = lambda texts: model.encode(texts, batch_size=64, show_progress_bar=True, convert_to_numpy=True)
+    
+    start = time.perf_counter()
+    if args.no_embedding_cache:
+        embeddings = encode(questions)
+    else:
+        cache = EmbeddingCache(RAG_CONFIG["embedding_cache_dir"], model_name, RAG_CONFIG.get("embedding_cache_dtype", "float32"))
+        embeddings = cache.encode(questions, encode)
+        stats = cache.get_stats()
+        print(f"  Embedding cache: {stats['hits']} hits, {stats['misses']} encoded")
+    print(f"✅ Encoded in {time.perf_counter() - start:.1f}s")
+    
+    FAQIndex.write(args.output, questions, answers, sources, embeddings, model_name)
+    print(f"✅ FAQ index written to {args.output}")
+    
+    # Distances for a few queries help pick FAQ_CONFIG["max_distance"]
+    index = FAQIndex(args.output, FAQ_CONFIG["max_distance"])
+    print(f"\n🧪 Sample matches (max_distance={index.max_distance}):")
+    for query in SAMPLE_QUERIES:
+        query_embedding = model.encode([query])
+        vector = query_embedding / max(float((query_embedding ** 2).sum()) ** 0.5, 1e-12)
+        similarity, rows = index.index.search(vector.astype("float32"), 1)
+        match = index.match(query, query_embedding)
+        status = f"✅ {match['match']}" if match else "➖ generate"
+        print(f"  {status:<12} d={1 - similarity[0, 0]:.3f}  '{query}' ~ '{index.questions.text_at(int(rows[0, 0]))}'")
+    return True
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,68 @@
+"""
+Provision Index Build Script
+Builds the (statute, section/article) -> chunk id lookup (provision_index.json) for an existing vectorstore
+"""
+
+import sys
+import time
+import argparse
+from pathlib import Path
+
+BASE_DIR = Path(__file__).parent.parent
+sys.path.append(str(BASE_DIR))
+
+from backend.core.chunk_store import ChunkStore, load_chunks
+from backend.core.provision_index import ProvisionIndex, PROVISION_INDEX_FILE, extract_provisions
+
+VECTORSTORE_DIR = BASE_DIR / "data" / "vectorstore" / "faiss_index"
+
+SAMPLE_QUERIES = [
+    "What is IPC Section 302?",
+    "Explain Article 14",
+    "Section 154 CrPC",
+    "Is anticipatory bail available?",
+]
+
+def main():
+    parser = argparse.ArgumentParser(description="Build provision_index.json from the chunk store (or chunks.json)")
+    parser.add_argument("--vectorstore", default=str(VECTORSTORE_DIR), help="Vectorstore directory")
+    args = parser.parse_args()
+    
+    vectorstore_dir = Path(args.vectorstore)
+    try:
+        chunks, metadata = load_chunks(vectorstore_dir)
+    except FileNotFoundError:
+        print(f"❌ No chunk store or chunks.json found in {vectorstore_dir}")
+        return False
+    
+    # Index rows carry the same chunk ids as the FAISS index
+    if isinstance(chunks, ChunkStore):
+        ids = chunks.ids()
+        texts = [chunks.text_at(row) for row in range(chunks.count)]
+        sources = [chunks.source_at(row) for row in range(chunks.count)]
+        chunks.close()
+    else:
+        ids = None
+        texts = chunks
+        # Without metadata.json the statute comes from each chunk's "Source:" line
+        sources = [item.get("source") for item in metadata] if len(metadata) == len(chunks) else None
+    
+    print(f"🔄 Indexing provisions in {len(texts)} chunks...")
+    start = time.perf_counter()
+    output_file = vectorstore_dir / PROVISION_INDEX_FILE
+    count = ProvisionIndex.write(output_file, texts, sources, ids)
+    print(f"✅ Wrote {output_file} ({count} provisions, {time.perf_counter() - start:.1f}s)")
+    
+    index = ProvisionIndex(output_file)
+    print("\n🧪 Sample lookups:")
+    for query in SAMPLE_QUERIES:
+        start = time.perf_counter()
+        hits = index.lookup(query, 3)
+        elapsed_us = (time.perf_counter() - start) * 1e6
+        served = "exact" if hits else "dense search"
+        print(f"  '{query}' -> {extract_provisions(query)} {hits} [{served}, {elapsed_us:.0f} µs]")
+    return True
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
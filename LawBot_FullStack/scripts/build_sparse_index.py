@@ -0,0 +1,67 @@
+"""
+Sparse Index Build Script
+Builds the BM25 inverted index (sparse_index.bin) for an existing vectorstore
+"""
+
+import sys
+import time
+import argparse
+from pathlib import Path
+
+BASE_DIR = Path(__file__).parent.parent
+sys.path.append(str(BASE_DIR))
+
+from backend.core.chunk_store import ChunkStore, load_chunks
+from backend.core.sparse_index import SparseIndex, SPARSE_INDEX_FILE
+
+VECTORSTORE_DIR = BASE_DIR / "data" / "vectorstore" / "faiss_index"
+
+SAMPLE_QUERIES = [
+    "anticipatory bail under Section 438",
+    "Article 21A right to education",
+    "punishment for murder",
+]
+
+def main():
+    parser = argparse.ArgumentParser(description="Build sparse_index.bin from the chunk store (or chunks.json)")
+    parser.add_argument("--vectorstore", default=str(VECTORSTORE_DIR), help="Vectorstore directory")
+    args = parser.parse_args()
+    
+    vectorstore_dir = Path(args.vectorstore)
+    try:
+        chunks, _ = load_chunks(vectorstore_dir)
+    except FileNotFoundError:
+        print(f"❌ No chunk store or chunks.json found in {vectorstore_dir}")
+        return False
+    
+    # Index rows carry the same chunk ids as the FAISS index
+    if isinstance(chunks, ChunkStore):
+        ids = chunks.ids()
+        texts = [chunks.text_at(row) for row in range(chunks.count)]
+        chunks.close()
+    else:
+        ids = None
+        texts = chunks
+    
+    print(f"🔄 Indexing {len(texts)} chunks...")
+    start = time.perf_counter()
+    output_file = vectorstore_dir / SPARSE_INDEX_FILE
+    SparseIndex.write(output_file, texts, ids)
+    elapsed = time.perf_counter() - start
+    
+    index = SparseIndex(output_file)
+    size_mb = output_file.stat().st_size / (1024 * 1024)
+    print(f"✅ Wrote {output_file} ({len(index)} chunks, {index.num_terms} terms, {size_mb:.2f} MB, {elapsed:.1f}s)")
+    
+    print("\n🧪 Sample BM25 queries:")
+    for query in SAMPLE_QUERIES:
+        start = time.perf_counter()
+        hits, scores = index.search(query, 3)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        print(f"  '{query}' ({elapsed_ms:.2f} ms): {', '.join(f'{h} ({s:.1f})' for h, s in zip(hits, scores)) or 'no hits'}")
+    index.close()
+    return True
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
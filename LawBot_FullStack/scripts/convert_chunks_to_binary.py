@@ -0,0 +1,46 @@
+"""
+Chunk Store Conversion Script
+Converts an existing chunks.json/metadata.json vectorstore into the mmapped chunk store
+"""
+
+import sys
+import argparse
+from pathlib import Path
+
+BASE_DIR = Path(__file__).parent.parent
+sys.path.append(str(BASE_DIR))
+
+from backend.core.chunk_store import ChunkStore, CHUNK_STORE_FILE, convert_json_store
+
+VECTORSTORE_DIR = BASE_DIR / "data" / "vectorstore" / "faiss_index"
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert chunks.json/metadata.json to chunkstore.bin")
+    parser.add_argument("--vectorstore", default=str(VECTORSTORE_DIR), help="Vectorstore directory")
+    args = parser.parse_args()
+    
+    vectorstore_dir = Path(args.vectorstore)
+    chunks_file = vectorstore_dir / "chunks.json"
+    metadata_file = vectorstore_dir / "metadata.json"
+    output_file = vectorstore_dir / CHUNK_STORE_FILE
+    
+    if not chunks_file.exists():
+        print(f"❌ No chunks.json found in {vectorstore_dir}")
+        return False
+    
+    if not metadata_file.exists():
+        print("⚠️  metadata.json not found - sources will be read from each chunk's 'Source:' line")
+    
+    print(f"🔄 Converting {chunks_file} ...")
+    count = convert_json_store(chunks_file, metadata_file, output_file)
+    
+    store = ChunkStore(output_file)
+    assert len(store) == count
+    size_mb = output_file.stat().st_size / (1024 * 1024)
+    print(f"✅ Wrote {output_file} ({count} chunks, {len(store.sources)} sources, {size_mb:.2f} MB)")
+    store.close()
+    return True
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -6,21 +6,28 @@ Creates FAISS index from legal documents without version conflicts
 import json
 import os
 import sys
+import time
+import argparse
 from pathlib import Path
 import numpy as np
 
-print("🚀 Starting Simple RAG Vectorstore Creation...")
-
 # Setup paths
 BASE_DIR = Path(__file__).parent.parent
 DATA_DIR = BASE_DIR / "data"
 VECTORSTORE_DIR = DATA_DIR / "vectorstore" / "faiss_index"
+sys.path.append(str(BASE_DIR))
 
-# Create directories
-VECTORSTORE_DIR.mkdir(parents=True, exist_ok=True)
-print(f"✅ Vectorstore directory: {VECTORSTORE_DIR}")
+from backend.core.chunk_store import ChunkStore, CHUNK_STORE_FILE
+from backend.core.sparse_index import SparseIndex, SPARSE_INDEX_FILE
+from backend.core.provision_index import ProvisionIndex, PROVISION_INDEX_FILE
+from backend.core.embedding_cache import EmbeddingCache
+from backend.core.sharded_encoder import encode_sharded
+from backend.core.text_chunker import TokenChunker, truncation_report
+from backend.core.length_buckets import token_lengths, length_order, padding_waste, restore_order
+from config.settings import RAG_CONFIG
 
-# Lazy import to avoid version conflicts
+# Lazy import to avoid version conflicts (and to keep --workers encoder processes,
+# which are spawned and re-import this module, from printing or pip installing)
 def lazy_import_sentence_transformers():
     """Lazy import with error handling"""
     try:
@@ -109,8 +116,19 @@ def load_legal_documents():
     print(f"✅ Loaded {len(documents)} legal documents")
     return documents
 
-def chunk_documents(documents, chunk_size=800, chunk_overlap=100):
-    """Simple chunking without external dependencies"""
+def chunk_documents(documents, chunk_size=800, chunk_overlap=100, chunker=None):
+    """Token-aware chunking when a chunker is given, else simple character chunking"""
+    if chunker:
+        print(f"\n✂️  Chunking documents (max_tokens={chunker.max_tokens}, overlap_tokens={chunker.overlap_tokens})...")
+        chunks = []
+        metadata_list = []
+        for doc in documents:
+            for chunk in chunker.split(doc['text']):
+                chunks.append(chunk)
+                metadata_list.append(doc['metadata'])
+        print(f"✅ Created {len(chunks)} chunks")
+        return chunks, metadata_list
+    
     print(f"\n✂️  Chunking documents (size={chunk_size}, overlap={chunk_overlap})...")
     
     chunks = []
@@ -139,53 +157,98 @@ def chunk_documents(documents, chunk_size=800, chunk_overlap=100):
     
     return chunks, metadata_list
 
-def generate_embeddings(chunks, model_name='all-MiniLM-L6-v2'):
-    """Generate embeddings with error handling"""
+def load_embedding_model(model_name='all-MiniLM-L6-v2'):
+    """Load the sentence-transformers encoder"""
     print(f"\n🧠 Loading embedding model: {model_name}")
     
     SentenceTransformer = lazy_import_sentence_transformers()
     embedding_model = SentenceTransformer(model_name)
     
     print(f"  Embedding dimension: {embedding_model.get_sentence_embedding_dimension()}")
-    print(f"  Generating embeddings for {len(chunks)} chunks...")
-    
-    # Generate in batches to avoid memory issues
-    batch_size = 32
-    all_embeddings = []
+    return embedding_model
+
+def report_truncation(char_chunks, chunks, embedding_model):
+    """Show how many tokens the encoder window cuts off, for character chunks vs. the chunks being embedded"""
+    max_length = embedding_model.max_seq_length
+    print(f"  Encoder window: {max_length} tokens")
+    for label, texts in (("Character chunks", char_chunks), ("These chunks", chunks)):
+        report = truncation_report(embedding_model.tokenizer, texts, max_length)
+        print(f"  {label}: {report['chunks_truncated']}/{report['chunks']} truncated, "
+              f"{report['truncated_tokens']} of {report['total_tokens']} tokens never embedded "
+              f"({report['truncated_ratio']:.1%})")
+
+def generate_embeddings(chunks, model_name='all-MiniLM-L6-v2', use_cache=True, workers=1, embedding_model=None):
+    """Generate embeddings with error handling, reusing cached ones"""
+    embedding_model = embedding_model or load_embedding_model(model_name)
     
-    for i in range(0, len(chunks), batch_size):
-        batch = chunks[i:i + batch_size]
-        batch_embeddings = embedding_model.encode(
-            batch,
-            show_progress_bar=False,
-            convert_to_numpy=True
-        )
-        all_embeddings.append(batch_embeddings)
-        if (i // batch_size) % 10 == 0:
-            print(f"  Progress: {i}/{len(chunks)} chunks processed")
+    def encode(texts):
+        print(f"  Generating embeddings for {len(texts)} chunks ({workers} worker{'s' if workers > 1 else ''})...")
+        
+        # Encode longest-first so each batch pads to similar lengths, then restore order
+        lengths = token_lengths(embedding_model.tokenizer, texts, embedding_model.max_seq_length)
+        order = length_order(lengths)
+        file_waste = padding_waste(lengths, 32)
+        bucket_waste = padding_waste(lengths, 32, order)
+        print(f"  Padding waste: {file_waste['waste_ratio']:.1%} in file order -> "
+              f"{bucket_waste['waste_ratio']:.1%} length-bucketed "
+              f"({bucket_waste['real_tokens']} real tokens)")
+        texts = [texts[i] for i in order]
+        started = time.perf_counter()
+        
+        if workers > 1:
+            embeddings = encode_sharded(
+                texts, model_name, workers, batch_size=32,
+                progress=lambda done, total, rate: print(f"  Progress: {done}/{total} chunks ({rate:.0f} chunks/sec)")
+            )
+        else:
+            # Generate in batches to avoid memory issues
+            batch_size = 32
+            all_embeddings = []
+            
+            for i in range(0, len(texts), batch_size):
+                batch = texts[i:i + batch_size]
+                batch_embeddings = embedding_model.encode(
+                    batch,
+                    show_progress_bar=False,
+                    convert_to_numpy=True
+                )
+                all_embeddings.append(batch_embeddings)
+                if (i // batch_size) % 10 == 0:
+                    rate = (i + len(batch)) / max(time.perf_counter() - started, 1e-9)
+                    print(f"  Progress: {i}/{len(texts)} chunks processed ({rate:.0f} chunks/sec)")
+            
+            embeddings = np.vstack(all_embeddings)
+        
+        elapsed = time.perf_counter() - started
+        print(f"  Throughput: {len(texts) / max(elapsed, 1e-9):.0f} chunks/sec, "
+              f"{bucket_waste['real_tokens'] / max(elapsed, 1e-9):.0f} tokens/sec ({elapsed:.1f}s)")
+        return restore_order(np.asarray(embeddings), order)
     
-    embeddings = np.vstack(all_embeddings)
+    if use_cache:
+        cache = EmbeddingCache(RAG_CONFIG["embedding_cache_dir"], model_name, RAG_CONFIG.get("embedding_cache_dtype", "float32"))
+        embeddings = cache.encode(chunks, encode)
+        stats = cache.get_stats()
+        print(f"  Embedding cache: {stats['hits']} hits, {stats['misses']} encoded, {stats['entries']} cached")
+    else:
+        embeddings = encode(chunks)
     print(f"✅ Embeddings generated: {embeddings.shape}")
     
     return embeddings, embedding_model
 
-def create_faiss_index(embeddings):
-    """Create FAISS index"""
-    print("\n🔍 Creating FAISS index...")
+def create_faiss_index(embeddings, index_type=None):
+    """Create FAISS index (type and build params from RAG_CONFIG)"""
+    index_type = index_type or RAG_CONFIG.get("index_type", "flat")
+    print(f"\n🔍 Creating FAISS index ({index_type})...")
     
-    faiss = lazy_import_faiss()
+    lazy_import_faiss()
+    from backend.core.index_factory import build_index
     
-    dimension = embeddings.shape[1]
-    embeddings = embeddings.astype('float32')
-    
-    # Use IndexFlatL2 for exact search
-    index = faiss.IndexFlatL2(dimension)
-    index.add(embeddings)
+    index = build_index(embeddings, index_type, RAG_CONFIG.get("index_params"))
     
     print(f"✅ FAISS index created with {index.ntotal} vectors")
     return index
 
-def save_vectorstore(index, chunks, metadata_list, embedding_model):
+def save_vectorstore(index, chunks, metadata_list, embedding_model, chunker=None):
     """Save all vectorstore components"""
     print("\n💾 Saving vectorstore...")
     
@@ -196,17 +259,20 @@ def save_vectorstore(index, chunks, metadata_list, embedding_model):
     faiss.write_index(index, str(index_file))
     print(f"  ✅ FAISS index: {index_file}")
     
-    # Save chunks
-    chunks_file = VECTORSTORE_DIR / "chunks.json"
-    with open(chunks_file, 'w', encoding='utf-8') as f:
-        json.dump(chunks, f, ensure_ascii=False, indent=2)
-    print(f"  ✅ Chunks: {chunks_file}")
+    # Save chunks and their sources as a memory-mapped chunk store
+    chunk_store_file = VECTORSTORE_DIR / CHUNK_STORE_FILE
+    ChunkStore.write(chunk_store_file, chunks, [m.get('source', 'Unknown') for m in metadata_list])
+    print(f"  ✅ Chunk store: {chunk_store_file}")
+    
+    # Inverted index for the BM25 leg of hybrid retrieval
+    sparse_index_file = VECTORSTORE_DIR / SPARSE_INDEX_FILE
+    SparseIndex.write(sparse_index_file, chunks)
+    print(f"  ✅ Sparse index: {sparse_index_file}")
     
-    # Save metadata
-    metadata_file = VECTORSTORE_DIR / "metadata.json"
-    with open(metadata_file, 'w', encoding='utf-8') as f:
-        json.dump(metadata_list, f, ensure_ascii=False, indent=2)
-    print(f"  ✅ Metadata: {metadata_file}")
+    # (statute, section/article) -> chunk ids for queries that name a provision
+    provision_index_file = VECTORSTORE_DIR / PROVISION_INDEX_FILE
+    provisions = ProvisionIndex.write(provision_index_file, chunks, [m.get('source', 'Unknown') for m in metadata_list])
+    print(f"  ✅ Provision index: {provision_index_file} ({provisions} provisions)")
     
     # Save config
     config = {
@@ -214,9 +280,12 @@ def save_vectorstore(index, chunks, metadata_list, embedding_model):
         'embedding_dimension': embedding_model.get_sentence_embedding_dimension(),
         'total_vectors': index.ntotal,
         'total_chunks': len(chunks),
-        'chunk_size': 800,
-        'chunk_overlap': 100,
+        'index_type': RAG_CONFIG.get("index_type", "flat"),
     }
+    if chunker:
+        config.update({'chunker': 'tokens', 'max_tokens': chunker.max_tokens, 'overlap_tokens': chunker.overlap_tokens})
+    else:
+        config.update({'chunker': 'chars', 'chunk_size': 800, 'chunk_overlap': 100})
     
     config_file = VECTORSTORE_DIR / "config.json"
     with open(config_file, 'w', encoding='utf-8') as f:
@@ -246,6 +315,21 @@ def test_retrieval(index, chunks, metadata_list, embedding_model):
 
 def main():
     """Main execution"""
+    parser = argparse.ArgumentParser(description="Create the LawBot FAISS vectorstore")
+    parser.add_argument("--no-embedding-cache", action="store_true",
+                        help="Encode every chunk instead of reusing cached embeddings")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Encoder processes to shard embedding generation across")
+    parser.add_argument("--chunker", choices=["tokens", "chars"], default=RAG_CONFIG.get("chunker", "tokens"),
+                        help="Token-aware sentence chunks (fit the encoder window) or legacy 800-char chunks")
+    args = parser.parse_args()
+    
+    print("🚀 Starting Simple RAG Vectorstore Creation...")
+    
+    # Create directories
+    VECTORSTORE_DIR.mkdir(parents=True, exist_ok=True)
+    print(f"✅ Vectorstore directory: {VECTORSTORE_DIR}")
+    
     try:
         # Load documents
         documents = load_legal_documents()
@@ -253,17 +337,28 @@ def main():
             print("❌ No documents found!")
             return False
         
+        # The token chunker measures chunks with the encoder's own tokenizer
+        embedding_model = load_embedding_model()
+        chunker = None
+        if args.chunker == "tokens":
+            chunker = TokenChunker.for_encoder(embedding_model, RAG_CONFIG.get("chunk_overlap_tokens", 32),
+                                               RAG_CONFIG.get("chunk_max_tokens"))
+        
         # Chunk documents
-        chunks, metadata_list = chunk_documents(documents)
+        chunks, metadata_list = chunk_documents(documents, chunker=chunker)
+        if chunker:
+            char_chunks, _ = chunk_documents(documents)
+            report_truncation(char_chunks, chunks, embedding_model)
         
         # Generate embeddings
-        embeddings, embedding_model = generate_embeddings(chunks)
+        embeddings, embedding_model = generate_embeddings(chunks, use_cache=not args.no_embedding_cache,
+                                                          workers=args.workers, embedding_model=embedding_model)
         
         # Create FAISS index
         index = create_faiss_index(embeddings)
         
         # Save vectorstore
-        save_vectorstore(index, chunks, metadata_list, embedding_model)
+        save_vectorstore(index, chunks, metadata_list, embedding_model, chunker)
         
         # Test retrieval
         test_retrieval(index, chunks, metadata_list, embedding_model)
@@ -0,0 +1,63 @@
+"""
+Case Import Script
+Bulk-loads case-law metadata from JSONL dumps into the offline case index used by the case_lookup tool
+"""
+
+import sys
+import json
+import time
+import argparse
+from pathlib import Path
+
+BASE_DIR = Path(__file__).parent.parent
+sys.path.append(str(BASE_DIR))
+
+from backend.core.case_store import CaseStore
+from config.settings import LEGAL_TOOLS
+
+def read_records(path: Path):
+    """
+    Case records from a JSONL dump, one case per line:
+    {"citation" or "citations", "title" and/or "petitioner"/"respondent", "court", "date", "headnote", "url"}
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                print(f"  ⚠️ {path.name}:{line_number}: {e}")
+                continue
+            record.setdefault("source", path.stem)
+            yield record
+
+def main():
+    parser = argparse.ArgumentParser(description="Import case-law JSONL dumps into the offline case index")
+    parser.add_argument("files", nargs="+", help="JSONL case dumps")
+    parser.add_argument("--db", default=LEGAL_TOOLS["case_index_path"], help="Case index database path")
+    parser.add_argument("--replace", action="store_true", help="Drop existing cases first")
+    args = parser.parse_args()
+
+    store = CaseStore(args.db)
+    start = time.perf_counter()
+    total = 0
+
+    for file in args.files:
+        path = Path(file)
+        if not path.exists():
+            print(f"❌ {path} not found")
+            return False
+        print(f"📥 Importing {path}...")
+        count = store.import_cases(read_records(path), replace=args.replace)
+        args.replace = False
+        print(f"  ✅ {count} cases")
+        total += count
+
+    print(f"\n✅ Imported {total} cases in {time.perf_counter() - start:.1f}s; {len(store)} cases in {args.db}")
+    store.close()
+    return True
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
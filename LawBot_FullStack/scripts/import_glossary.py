@@ -0,0 +1,71 @@
+"""
+Glossary Import Script
+Bulk-loads legal terms into the SQLite glossary used by the legal_dictionary tool
+"""
+
+import sys
+import csv
+import json
+import time
+import argparse
+from pathlib import Path
+
+BASE_DIR = Path(__file__).parent.parent
+sys.path.append(str(BASE_DIR))
+
+from backend.core.glossary_store import GlossaryStore
+from config.settings import LEGAL_TOOLS
+
+def read_entries(path: Path, default_source: str):
+    """(term, definition, source) from CSV (term,definition[,source]), JSONL or a JSON object/list"""
+    suffix = path.suffix.lower()
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        if suffix == ".csv":
+            for row in csv.DictReader(f):
+                yield row["term"], row["definition"], row.get("source") or default_source
+        elif suffix == ".jsonl":
+            for line in f:
+                if line.strip():
+                    item = json.loads(line)
+                    yield item["term"], item["definition"], item.get("source", default_source)
+        else:
+            data = json.load(f)
+            items = data.items() if isinstance(data, dict) else ((d["term"], d["definition"]) for d in data)
+            for term, definition in items:
+                yield term, definition, default_source
+
+def main():
+    parser = argparse.ArgumentParser(description="Import terms into the legal glossary database")
+    parser.add_argument("files", nargs="*", help="CSV, JSONL or JSON glossary files")
+    parser.add_argument("--db", default=LEGAL_TOOLS["glossary_path"], help="Glossary database path")
+    parser.add_argument("--replace", action="store_true", help="Drop existing terms first")
+    parser.add_argument("--no-builtin", action="store_true", help="Skip the built-in LEGAL_TOOLS dictionary")
+    args = parser.parse_args()
+    
+    store = GlossaryStore(args.db)
+    start = time.perf_counter()
+    total = 0
+    
+    if not args.no_builtin:
+        builtin = ((term, definition, "LawBot") for term, definition in LEGAL_TOOLS["dictionary"].items())
+        total += store.import_terms(builtin, replace=args.replace)
+        args.replace = False
+    
+    for file in args.files:
+        path = Path(file)
+        if not path.exists():
+            print(f"❌ {path} not found")
+            return False
+        print(f"📥 Importing {path}...")
+        count = store.import_terms(read_entries(path, path.stem), replace=args.replace)
+        args.replace = False
+        print(f"  ✅ {count} terms")
+        total += count
+    
+    print(f"\n✅ Imported {total} terms in {time.perf_counter() - start:.1f}s; {len(store)} terms in {args.db}")
+    store.close()
+    return True
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -5,37 +5,60 @@ Creates FAISS index from legal documents for LawBot
 
 import json
 import os
+import sys
 import pickle
+import time
+import hashlib
+import argparse
 import numpy as np
 from pathlib import Path
 from typing import List, Dict, Any
 
-print("🚀 Starting RAG Vectorstore Population...")
+def check_dependencies():
+    """Install sentence-transformers and FAISS when they are missing"""
+    print("\n📦 Checking dependencies...")
+    try:
+        from sentence_transformers import SentenceTransformer
+        import faiss
+        print("✅ All dependencies available")
+    except ImportError as e:
+        print(f"❌ Missing dependency: {e}")
+        print("Installing required packages...")
+        import subprocess
+        subprocess.run([sys.executable, "-m", "pip", "install", "sentence-transformers", "faiss-cpu"], check=True)
+        print("✅ Dependencies installed")
+
+# --workers encoder processes are spawned and re-import this module as __mp_main__;
+# only the script itself prints the banner and installs missing packages
+if __name__ == "__main__":
+    print("🚀 Starting RAG Vectorstore Population...")
+    check_dependencies()
 
-# Check and install dependencies
-print("\n📦 Checking dependencies...")
-try:
-    from sentence_transformers import SentenceTransformer
-    import faiss
-    print("✅ All dependencies available")
-except ImportError as e:
-    print(f"❌ Missing dependency: {e}")
-    print("Installing required packages...")
-    import subprocess
-    import sys
-    subprocess.run([sys.executable, "-m", "pip", "install", "sentence-transformers", "faiss-cpu"], check=True)
-    print("✅ Dependencies installed")
-    from sentence_transformers import SentenceTransformer
-    import faiss
+from sentence_transformers import SentenceTransformer
+import faiss
 
 # Setup paths
-BASE_DIR = Path(__file__).parent
+BASE_DIR = Path(__file__).parent.parent
 DATA_DIR = BASE_DIR / "data"
+sys.path.append(str(BASE_DIR))
+
+from backend.core.chunk_store import ChunkStore, CHUNK_STORE_FILE
+from backend.core.sparse_index import SparseIndex, SPARSE_INDEX_FILE
+from backend.core.provision_index import ProvisionIndex, PROVISION_INDEX_FILE
+from backend.core.embedding_cache import EmbeddingCache
+from backend.core.sharded_encoder import encode_sharded
+from backend.core.text_chunker import TokenChunker, truncation_report
+from backend.core.length_buckets import token_lengths, length_order, padding_waste, restore_order
+from backend.core.index_factory import build_index, supports_removal
+from config.settings import RAG_CONFIG
 VECTORSTORE_DIR = DATA_DIR / "vectorstore" / "faiss_index"
 
-# Create directories
-VECTORSTORE_DIR.mkdir(parents=True, exist_ok=True)
-print(f"✅ Vectorstore directory: {VECTORSTORE_DIR}")
+MANIFEST_FILE = "manifest.json"
+# Files staged by save_vectorstore, still to be moved into place (see finish_pending_swap)
+SWAP_JOURNAL = "swap_pending.json"
+CHUNK_SIZE = 800
+CHUNK_OVERLAP = 100
+EMBEDDING_MODEL = 'all-MiniLM-L6-v2'
 
 def load_legal_documents() -> List[Dict[str, Any]]:
     """Load legal documents from processed data"""
@@ -89,110 +112,320 @@ def load_legal_documents() -> List[Dict[str, Any]]:
     print(f"✅ Loaded {len(documents)} legal documents")
     return documents
 
-def chunk_documents(documents: List[Dict], chunk_size: int = 800, chunk_overlap: int = 100) -> tuple:
-    """Chunk documents into smaller pieces"""
-    print(f"\n✂️  Chunking documents (size={chunk_size}, overlap={chunk_overlap})...")
+def chunk_text(text: str, chunk_size: int = CHUNK_SIZE, chunk_overlap: int = CHUNK_OVERLAP) -> List[str]:
+    """Split one document's text by character count"""
+    chunks = []
+    start = 0
+    while start < len(text):
+        end = start + chunk_size
+        chunk = text[start:end]
+        
+        if chunk.strip():
+            chunks.append(chunk)
+        
+        start = end - chunk_overlap
+        if start >= len(text):
+            break
+    return chunks
+
+def chunk_documents(documents: List[Dict], chunker: TokenChunker = None) -> tuple:
+    """Chunk documents into smaller pieces; also returns the document index of every chunk"""
+    if chunker:
+        print(f"\n✂️  Chunking documents (max_tokens={chunker.max_tokens}, overlap_tokens={chunker.overlap_tokens})...")
+    else:
+        print(f"\n✂️  Chunking documents (size={CHUNK_SIZE}, overlap={CHUNK_OVERLAP})...")
     
     chunks = []
     metadata_list = []
+    chunk_doc_index = []
     
-    for doc in documents:
-        text = doc['text']
-        
-        # Simple chunking by character count
-        start = 0
-        while start < len(text):
-            end = start + chunk_size
-            chunk = text[start:end]
-            
-            if chunk.strip():
-                chunks.append(chunk)
-                metadata_list.append(doc['metadata'])
-            
-            start = end - chunk_overlap
-            if start >= len(text):
-                break
+    for doc_index, doc in enumerate(documents):
+        doc_chunks = chunker.split(doc['text']) if chunker else chunk_text(doc['text'])
+        for chunk in doc_chunks:
+            chunks.append(chunk)
+            metadata_list.append(doc['metadata'])
+            chunk_doc_index.append(doc_index)
     
     print(f"✅ Created {len(chunks)} chunks")
-    avg_length = np.mean([len(c) for c in chunks])
+    avg_length = np.mean([len(c) for c in chunks]) if chunks else 0
     print(f"  Average chunk length: {avg_length:.0f} characters")
     
-    return chunks, metadata_list
+    return chunks, metadata_list, chunk_doc_index
 
-def generate_embeddings(chunks: List[str], model_name: str = 'all-MiniLM-L6-v2') -> np.ndarray:
-    """Generate embeddings for all chunks"""
+def chunking_settings(chunker: TokenChunker = None) -> Dict[str, Any]:
+    """Chunker parameters recorded in the manifest and config"""
+    if chunker:
+        return {'chunker': 'tokens', 'max_tokens': chunker.max_tokens, 'overlap_tokens': chunker.overlap_tokens}
+    return {'chunker': 'chars', 'chunk_size': CHUNK_SIZE, 'chunk_overlap': CHUNK_OVERLAP}
+
+def report_truncation(documents: List[Dict], chunks: List[str], embedding_model: SentenceTransformer):
+    """Show how many tokens the encoder window cuts off, for character chunks vs. the chunks being embedded"""
+    max_length = embedding_model.max_seq_length
+    char_chunks = [chunk for doc in documents for chunk in chunk_text(doc['text'])]
+    before = truncation_report(embedding_model.tokenizer, char_chunks, max_length)
+    after = truncation_report(embedding_model.tokenizer, chunks, max_length)
+    print(f"  Encoder window: {max_length} tokens")
+    for label, report in (("Character chunks", before), ("These chunks", after)):
+        print(f"  {label}: {report['chunks_truncated']}/{report['chunks']} truncated, "
+              f"{report['truncated_tokens']} of {report['total_tokens']} tokens never embedded "
+              f"({report['truncated_ratio']:.1%})")
+
+def document_keys(documents: List[Dict]) -> List[str]:
+    """Content hash per document; repeated identical documents get distinct keys"""
+    keys = []
+    seen = {}
+    for doc in documents:
+        digest = hashlib.sha256(f"{doc['source']}\x00{doc['text']}".encode('utf-8')).hexdigest()
+        occurrence = seen.get(digest, 0)
+        seen[digest] = occurrence + 1
+        keys.append(f"{digest}:{occurrence}")
+    return keys
+
+def build_manifest(documents: List[Dict], chunk_doc_index: List[int], chunk_ids: List[int],
+                   chunking: Dict[str, Any]) -> Dict[str, Any]:
+    """Map each document key to the chunk ids it produced"""
+    keys = document_keys(documents)
+    doc_chunks = {key: [] for key in keys}
+    for doc_index, chunk_id in zip(chunk_doc_index, chunk_ids):
+        doc_chunks[keys[doc_index]].append(int(chunk_id))
+    return {
+        'embedding_model': EMBEDDING_MODEL,
+        'chunking': chunking,
+        'index_type': RAG_CONFIG.get("index_type", "flat"),
+        'next_id': int(max(chunk_ids)) + 1 if len(chunk_ids) else 0,
+        'documents': doc_chunks,
+    }
+
+def load_embedding_model(model_name: str = 'all-MiniLM-L6-v2') -> SentenceTransformer:
+    """Load the sentence-transformers encoder"""
     print(f"\n🧠 Loading embedding model: {model_name}")
     embedding_model = SentenceTransformer(model_name)
     print(f"  Embedding dimension: {embedding_model.get_sentence_embedding_dimension()}")
+    return embedding_model
+
+def generate_embeddings(chunks: List[str], model_name: str = 'all-MiniLM-L6-v2', use_cache: bool = True,
+                        workers: int = 1, embedding_model: SentenceTransformer = None) -> np.ndarray:
+    """Generate embeddings for all chunks, reusing cached ones"""
+    embedding_model = embedding_model or load_embedding_model(model_name)
     
-    print("  Generating embeddings...")
-    embeddings = embedding_model.encode(
-        chunks, 
-        show_progress_bar=True, 
-        batch_size=32,
-        convert_to_numpy=True
-    )
+    def encode(texts):
+        print(f"  Generating embeddings for {len(texts)} chunks ({workers} worker{'s' if workers > 1 else ''})...")
+        
+        # Encode longest-first so each batch pads to similar lengths, then restore order
+        lengths = token_lengths(embedding_model.tokenizer, texts, embedding_model.max_seq_length)
+        order = length_order(lengths)
+        file_waste = padding_waste(lengths, 32)
+        bucket_waste = padding_waste(lengths, 32, order)
+        print(f"  Padding waste: {file_waste['waste_ratio']:.1%} in file order -> "
+              f"{bucket_waste['waste_ratio']:.1%} length-bucketed "
+              f"({bucket_waste['real_tokens']} real tokens)")
+        texts = [texts[i] for i in order]
+        started = time.perf_counter()
+        if workers > 1:
+            embeddings = encode_sharded(
+                texts, model_name, workers, batch_size=32,
+                progress=lambda done, total, rate: print(f"  Progress: {done}/{total} chunks ({rate:.0f} chunks/sec)")
+            )
+        else:
+            embeddings = embedding_model.encode(
+                texts, 
+                show_progress_bar=True, 
+                batch_size=32,
+                convert_to_numpy=True
+            )
+        elapsed = time.perf_counter() - started
+        print(f"  Throughput: {len(texts) / max(elapsed, 1e-9):.0f} chunks/sec, "
+              f"{bucket_waste['real_tokens'] / max(elapsed, 1e-9):.0f} tokens/sec ({elapsed:.1f}s)")
+        return restore_order(np.asarray(embeddings), order)
+    
+    if use_cache:
+        cache = EmbeddingCache(RAG_CONFIG["embedding_cache_dir"], model_name, RAG_CONFIG.get("embedding_cache_dtype", "float32"))
+        embeddings = cache.encode(chunks, encode)
+        stats = cache.get_stats()
+        print(f"  Embedding cache: {stats['hits']} hits, {stats['misses']} encoded, {stats['entries']} cached")
+    else:
+        embeddings = encode(chunks)
     
     print(f"✅ Embeddings generated: {embeddings.shape}")
     return embeddings, embedding_model
 
-def create_faiss_index(embeddings: np.ndarray) -> faiss.Index:
-    """Create FAISS index from embeddings"""
-    print("\n🔍 Creating FAISS index...")
+def create_faiss_index(embeddings: np.ndarray, index_type: str = None, ids: np.ndarray = None) -> faiss.Index:
+    """Create FAISS index from embeddings (type and build params from RAG_CONFIG)"""
+    index_type = index_type or RAG_CONFIG.get("index_type", "flat")
+    print(f"\n🔍 Creating FAISS index ({index_type})...")
     
-    dimension = embeddings.shape[1]
-    
-    # Convert to float32 for FAISS
-    embeddings = embeddings.astype('float32')
-    
-    # Create index (using L2 distance)
-    index = faiss.IndexFlatL2(dimension)
-    
-    # Add vectors to index
-    index.add(embeddings)
+    index = build_index(embeddings, index_type, RAG_CONFIG.get("index_params"), ids=ids)
     
     print(f"✅ FAISS index created with {index.ntotal} vectors")
     return index
 
-def save_vectorstore(index: faiss.Index, chunks: List[str], metadata_list: List[Dict], 
-                     embedding_model: SentenceTransformer):
-    """Save FAISS index and metadata"""
-    print("\n💾 Saving vectorstore...")
+def finish_pending_swap() -> bool:
+    """
+    Complete a vectorstore swap that was interrupted (crash, kill) after staging.
     
-    # Save FAISS index
-    index_file = VECTORSTORE_DIR / "faiss_index.idx"
-    faiss.write_index(index, str(index_file))
-    print(f"  ✅ FAISS index: {index_file}")
+    The journal is only written once every new file is staged, so moving the
+    remaining staged files into place always yields one consistent build.
+    Returns whether an interrupted swap was found.
+    """
+    journal = VECTORSTORE_DIR / SWAP_JOURNAL
+    if not journal.exists():
+        return False
+    with open(journal, 'r', encoding='utf-8') as f:
+        names = json.load(f)
+    for name in names:
+        staged_path = VECTORSTORE_DIR / (name + ".staged")
+        if staged_path.exists():
+            os.replace(staged_path, VECTORSTORE_DIR / name)
+    journal.unlink()
+    print(f"♻️  Completed an interrupted vectorstore swap ({len(names)} files)")
+    return True
+
+def save_vectorstore(index: faiss.Index, chunks: List[str], metadata_list: List[Dict],
+                     embedding_dimension: int, manifest: Dict[str, Any], chunk_ids: List[int] = None):
+    """
+    Save FAISS index, chunk store, lookup indexes, manifest and config.
     
-    # Save chunks
-    chunks_file = VECTORSTORE_DIR / "chunks.json"
-    with open(chunks_file, 'w', encoding='utf-8') as f:
-        json.dump(chunks, f, ensure_ascii=False, indent=2)
-    print(f"  ✅ Chunks: {chunks_file}")
+    Every file is first written as <name>.staged, so a failure while staging
+    leaves the current vectorstore untouched. The staged names are then
+    recorded in a journal and moved over the live files one at a time, in
+    this order: index, chunk store, sparse index, provision index, manifest,
+    config. The moves are not atomic as a group: a crash between them leaves
+    old and new files side by side, and the next run of this script
+    (finish_pending_swap) moves the rest into place before doing anything
+    else. A server that loads the vectorstore meanwhile should be restarted.
+    """
+    print("\n💾 Saving vectorstore...")
     
-    # Save metadata
-    metadata_file = VECTORSTORE_DIR / "metadata.json"
-    with open(metadata_file, 'w', encoding='utf-8') as f:
-        json.dump(metadata_list, f, ensure_ascii=False, indent=2)
-    print(f"  ✅ Metadata: {metadata_file}")
+    index_file = VECTORSTORE_DIR / "faiss_index.idx"
+    chunk_store_file = VECTORSTORE_DIR / CHUNK_STORE_FILE
+    sparse_index_file = VECTORSTORE_DIR / SPARSE_INDEX_FILE
+    provision_index_file = VECTORSTORE_DIR / PROVISION_INDEX_FILE
+    manifest_file = VECTORSTORE_DIR / MANIFEST_FILE
+    config_file = VECTORSTORE_DIR / "config.json"
+    staged = {path: path.with_name(path.name + ".staged")
+              for path in (index_file, chunk_store_file, sparse_index_file, provision_index_file,
+                           manifest_file, config_file)}
     
-    # Save config
+    faiss.write_index(index, str(staged[index_file]))
+    sources = [m.get('source', 'Unknown') for m in metadata_list]
+    ChunkStore.write(staged[chunk_store_file], chunks, sources, chunk_ids)
+    SparseIndex.write(staged[sparse_index_file], chunks, chunk_ids)
+    provisions = ProvisionIndex.write(staged[provision_index_file], chunks, sources, chunk_ids)
+    with open(staged[manifest_file], 'w', encoding='utf-8') as f:
+        json.dump(manifest, f)
     config = {
-        'embedding_model': 'all-MiniLM-L6-v2',
-        'embedding_dimension': embedding_model.get_sentence_embedding_dimension(),
+        'embedding_model': EMBEDDING_MODEL,
+        'embedding_dimension': embedding_dimension,
         'total_vectors': index.ntotal,
         'total_chunks': len(chunks),
-        'chunk_size': 800,
-        'chunk_overlap': 100,
+        'index_type': RAG_CONFIG.get("index_type", "flat"),
+        **manifest['chunking'],
     }
-    
-    config_file = VECTORSTORE_DIR / "config.json"
-    with open(config_file, 'w', encoding='utf-8') as f:
+    with open(staged[config_file], 'w', encoding='utf-8') as f:
         json.dump(config, f, indent=2)
+    
+    # Staged files must be on disk before the journal says they can be moved in
+    for staged_path in staged.values():
+        with open(staged_path, 'rb') as f:
+            os.fsync(f.fileno())
+    journal = VECTORSTORE_DIR / SWAP_JOURNAL
+    journal_tmp = journal.with_name(journal.name + ".tmp")
+    with open(journal_tmp, 'w', encoding='utf-8') as f:
+        json.dump([path.name for path in staged], f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(journal_tmp, journal)
+    
+    for path, staged_path in staged.items():
+        os.replace(staged_path, path)
+    journal.unlink()
+    print(f"  ✅ FAISS index: {index_file}")
+    print(f"  ✅ Chunk store: {chunk_store_file}")
+    print(f"  ✅ Sparse index: {sparse_index_file}")
+    print(f"  ✅ Provision index: {provision_index_file} ({provisions} provisions)")
+    print(f"  ✅ Manifest: {manifest_file}")
     print(f"  ✅ Config: {config_file}")
     
     print("\n✅ Vectorstore saved successfully!")
 
+def incremental_update(documents: List[Dict], use_cache: bool = True, workers: int = 1,
+                       chunker: TokenChunker = None, embedding_model: SentenceTransformer = None) -> bool:
+    """
+    Embed only new/changed documents and drop deleted ones from the existing vectorstore.
+    
+    Returns False when a full rebuild is needed instead (no manifest, changed
+    chunking/embedding settings, or an index type that cannot remove ids).
+    """
+    print("\n🔁 Incremental update...")
+    manifest_file = VECTORSTORE_DIR / MANIFEST_FILE
+    index_file = VECTORSTORE_DIR / "faiss_index.idx"
+    chunk_store_file = VECTORSTORE_DIR / CHUNK_STORE_FILE
+    
+    if not (manifest_file.exists() and index_file.exists() and chunk_store_file.exists()):
+        print("  ⚠️  No existing manifest/index/chunk store - running a full build")
+        return False
+    
+    with open(manifest_file, 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+    settings = ('embedding_model', 'chunking', 'index_type')
+    if tuple(manifest.get(key) for key in settings) != \
+            (EMBEDDING_MODEL, chunking_settings(chunker), RAG_CONFIG.get("index_type", "flat")):
+        print("  ⚠️  Embedding model, chunking or index settings changed - running a full build")
+        return False
+    
+    index = faiss.read_index(str(index_file))
+    if not supports_removal(index):
+        print(f"  ⚠️  {type(index).__name__} cannot remove vectors by id - running a full build")
+        return False
+    
+    current = dict(zip(document_keys(documents), documents))
+    previous = manifest['documents']
+    removed = [key for key in previous if key not in current]
+    added = [key for key in current if key not in previous]
+    print(f"  Documents: {len(current)} current, {len(added)} new/changed, {len(removed)} deleted")
+    
+    if not added and not removed:
+        print("✅ Vectorstore already up to date")
+        return True
+    
+    # Drop chunks of deleted/changed documents
+    removed_ids = np.array([chunk_id for key in removed for chunk_id in previous[key]], dtype='int64')
+    if len(removed_ids):
+        index.remove_ids(removed_ids)
+    for key in removed:
+        del previous[key]
+    
+    # Chunk and embed only the new documents
+    new_chunks, new_metadata, new_doc_index = chunk_documents([current[key] for key in added], chunker)
+    next_id = manifest['next_id']
+    new_ids = list(range(next_id, next_id + len(new_chunks)))
+    if new_chunks:
+        embeddings, _ = generate_embeddings(new_chunks, EMBEDDING_MODEL, use_cache, workers, embedding_model)
+        index.add_with_ids(embeddings.astype('float32'), np.array(new_ids, dtype='int64'))
+        for doc_index, chunk_id in zip(new_doc_index, new_ids):
+            previous.setdefault(added[doc_index], []).append(chunk_id)
+    for key in added:
+        previous.setdefault(key, [])
+    manifest['next_id'] = next_id + len(new_chunks)
+    
+    # Carry unchanged chunks over from the current store
+    store = ChunkStore(chunk_store_file)
+    removed_set = set(removed_ids.tolist())
+    chunks, metadata_list, chunk_ids = [], [], []
+    for row, chunk_id in enumerate(store.ids().tolist()):
+        if chunk_id not in removed_set:
+            chunks.append(store.text_at(row))
+            metadata_list.append({'source': store.source_at(row)})
+            chunk_ids.append(chunk_id)
+    store.close()
+    chunks.extend(new_chunks)
+    metadata_list.extend(new_metadata)
+    chunk_ids.extend(new_ids)
+    
+    save_vectorstore(index, chunks, metadata_list, index.d, manifest, chunk_ids)
+    print(f"\n✅ Incremental update complete: +{len(new_chunks)} / -{len(removed_ids)} chunks, {index.ntotal} vectors")
+    return True
+
 def test_retrieval(index: faiss.Index, chunks: List[str], metadata_list: List[Dict],
                    embedding_model: SentenceTransformer):
     """Test the vectorstore with sample queries"""
@@ -221,6 +454,23 @@ def test_retrieval(index: faiss.Index, chunks: List[str], metadata_list: List[Di
 
 def main():
     """Main function"""
+    parser = argparse.ArgumentParser(description="Build the LawBot FAISS vectorstore")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Only embed new/changed documents and remove deleted ones")
+    parser.add_argument("--no-embedding-cache", action="store_true",
+                        help="Encode every chunk instead of reusing cached embeddings")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Encoder processes to shard embedding generation across")
+    parser.add_argument("--chunker", choices=["tokens", "chars"], default=RAG_CONFIG.get("chunker", "tokens"),
+                        help="Token-aware sentence chunks (fit the encoder window) or legacy 800-char chunks")
+    args = parser.parse_args()
+    use_cache = not args.no_embedding_cache
+    
+    # Create directories
+    VECTORSTORE_DIR.mkdir(parents=True, exist_ok=True)
+    print(f"✅ Vectorstore directory: {VECTORSTORE_DIR}")
+    finish_pending_swap()
+    
     try:
         # Load documents
         documents = load_legal_documents()
@@ -229,17 +479,30 @@ def main():
             print("❌ No documents found! Please ensure data is available.")
             return
         
+        # The token chunker measures chunks with the encoder's own tokenizer
+        embedding_model = load_embedding_model(EMBEDDING_MODEL)
+        chunker = None
+        if args.chunker == "tokens":
+            chunker = TokenChunker.for_encoder(embedding_model, RAG_CONFIG.get("chunk_overlap_tokens", 32),
+                                               RAG_CONFIG.get("chunk_max_tokens"))
+        
+        if args.incremental and incremental_update(documents, use_cache, args.workers, chunker, embedding_model):
+            return
+        
         # Chunk documents
-        chunks, metadata_list = chunk_documents(documents)
+        chunks, metadata_list, chunk_doc_index = chunk_documents(documents, chunker)
+        chunk_ids = np.arange(len(chunks), dtype='int64')
+        report_truncation(documents, chunks, embedding_model)
         
         # Generate embeddings
-        embeddings, embedding_model = generate_embeddings(chunks)
+        embeddings, embedding_model = generate_embeddings(chunks, EMBEDDING_MODEL, use_cache, args.workers, embedding_model)
         
-        # Create FAISS index
-        index = create_faiss_index(embeddings)
+        # Create FAISS index (ID-mapped so later runs can update it incrementally)
+        index = create_faiss_index(embeddings, ids=chunk_ids)
         
         # Save vectorstore
-        save_vectorstore(index, chunks, metadata_list, embedding_model)
+        manifest = build_manifest(documents, chunk_doc_index, chunk_ids, chunking_settings(chunker))
+        save_vectorstore(index, chunks, metadata_list, embeddings.shape[1], manifest)
         
         # Test retrieval
         test_retrieval(index, chunks, metadata_list, embedding_model)
@@ -254,8 +517,10 @@ def main():
         print(f"  Index size: {index.ntotal} vectors")
         print(f"\n📁 Files created:")
         print(f"  {VECTORSTORE_DIR}/faiss_index.idx")
-        print(f"  {VECTORSTORE_DIR}/chunks.json")
-        print(f"  {VECTORSTORE_DIR}/metadata.json")
+        print(f"  {VECTORSTORE_DIR}/{CHUNK_STORE_FILE}")
+        print(f"  {VECTORSTORE_DIR}/{SPARSE_INDEX_FILE}")
+        print(f"  {VECTORSTORE_DIR}/{PROVISION_INDEX_FILE}")
+        print(f"  {VECTORSTORE_DIR}/{MANIFEST_FILE}")
         print(f"  {VECTORSTORE_DIR}/config.json")
         print("\n✅ Ready to use with LawBot!")
         
@@ -5,7 +5,6 @@ No Gradio required - pure Python CLI
 
 import os
 import sys
-import json
 from pathlib import Path
 from datetime import datetime
 
@@ -15,6 +14,7 @@ print("="*70)
 
 # Setup paths
 BASE_DIR = Path(__file__).parent
+sys.path.append(str(BASE_DIR))
 VECTORSTORE_PATH = BASE_DIR / "data" / "vectorstore" / "faiss_index"
 
 # Legal Tools Dictionary
@@ -56,10 +56,8 @@ class SimpleLawBot:
             if index_file.exists():
                 self.rag_index = faiss.read_index(str(index_file))
                 
-                with open(VECTORSTORE_PATH / "chunks.json", 'r', encoding='utf-8') as f:
-                    self.rag_chunks = json.load(f)
-                with open(VECTORSTORE_PATH / "metadata.json", 'r', encoding='utf-8') as f:
-                    self.rag_metadata = json.load(f)
+                from backend.core.chunk_store import load_chunks
+                self.rag_chunks, self.rag_metadata = load_chunks(VECTORSTORE_PATH)
                 
                 print(f"  ✅ RAG loaded: {self.rag_index.ntotal} vectors, {len(self.rag_chunks)} chunks")
             else:
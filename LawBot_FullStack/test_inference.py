@@ -5,7 +5,6 @@ Tests the model without Gradio interface
 
 import os
 import sys
-import json
 import torch
 from pathlib import Path
 
@@ -14,6 +13,7 @@ print("="*60)
 
 # Setup paths
 BASE_DIR = Path(__file__).parent
+sys.path.append(str(BASE_DIR))
 MODEL_PATH = BASE_DIR / "models" / "adapters" / "lawbot_qwen_adapter"
 VECTORSTORE_PATH = BASE_DIR / "data" / "vectorstore" / "faiss_index"
 BASE_MODEL = "Qwen/Qwen2.5-1.5B-Instruct"
@@ -29,24 +29,36 @@ try:
     print("  Loading tokenizer...")
     tokenizer = AutoTokenizer.from_pretrained(BASE_MODEL)
     
-    print("  Loading base model...")
-    model = AutoModelForCausalLM.from_pretrained(
-        BASE_MODEL,
-        torch_dtype=torch.float16 if device == "cuda" else torch.float32,
-        device_map="auto" if device == "cuda" else None,
-    )
-    
-    # Try loading adapters
-    if MODEL_PATH.exists():
-        print(f"  Loading LoRA adapters...")
-        try:
-            from peft import PeftModel
-            model = PeftModel.from_pretrained(model, str(MODEL_PATH))
-            print("  ✅ Fine-tuned model loaded!")
-        except Exception as e:
-            print(f"  ⚠️ Using base model (adapters not loaded: {e})")
+    from config.settings import MODEL_CONFIG
+    if MODEL_PATH.exists() and MODEL_CONFIG.get("merge_adapter", False):
+        # Adapter folded into the base weights and cached as safetensors
+        from backend.core.merged_model import load_merged_model
+        print("  Loading merged model (base + LoRA adapters)...")
+        model = load_merged_model(
+            BASE_MODEL, MODEL_PATH, MODEL_CONFIG["merged_model_dir"],
+            torch_dtype=torch.float16 if device == "cuda" else torch.float32,
+            device_map="auto" if device == "cuda" else None,
+        )
+        print("  ✅ Fine-tuned model loaded!")
     else:
-        print(f"  ⚠️ No adapters found, using base model")
+        print("  Loading base model...")
+        model = AutoModelForCausalLM.from_pretrained(
+            BASE_MODEL,
+            torch_dtype=torch.float16 if device == "cuda" else torch.float32,
+            device_map="auto" if device == "cuda" else None,
+        )
+        
+        # Try loading adapters
+        if MODEL_PATH.exists():
+            print(f"  Loading LoRA adapters...")
+            try:
+                from peft import PeftModel
+                model = PeftModel.from_pretrained(model, str(MODEL_PATH))
+                print("  ✅ Fine-tuned model loaded!")
+            except Exception as e:
+                print(f"  ⚠️ Using base model (adapters not loaded: {e})")
+        else:
+            print(f"  ⚠️ No adapters found, using base model")
     
     print("✅ Model Test PASSED\n")
     
@@ -69,10 +81,8 @@ try:
         print(f"  Loading FAISS index...")
         rag_index = faiss.read_index(str(index_file))
         
-        with open(VECTORSTORE_PATH / "chunks.json", 'r', encoding='utf-8') as f:
-            chunks = json.load(f)
-        with open(VECTORSTORE_PATH / "metadata.json", 'r', encoding='utf-8') as f:
-            metadata = json.load(f)
+        from backend.core.chunk_store import load_chunks
+        chunks, metadata = load_chunks(VECTORSTORE_PATH)
         
         print(f"  ✅ RAG loaded: {rag_index.ntotal} vectors, {len(chunks)} chunks")
         print("✅ RAG Test PASSED\n")
@@ -91,7 +101,7 @@ if model and tokenizer:
     
     try:
         # Get RAG context
-        context = ""
+        context_parts = []
         if rag_index and embedding_model:
             query_embedding = embedding_model.encode([test_query])
             scores, indices = rag_index.search(query_embedding, 3)
@@ -100,11 +110,11 @@ if model and tokenizer:
             for idx in indices[0]:
                 if idx < len(chunks):
                     context_parts.append(chunks[idx])
-            context = "\n".join(context_parts[:2])
-            print(f"  Retrieved context: {len(context)} chars")
+            print(f"  Retrieved context: {len(context_parts)} chunks")
         
-        # Generate response
-        prompt = f"""<|im_start|>system
+        # Generate response (context packed into the prompt token budget)
+        from backend.core.context_packer import ContextPacker
+        render = lambda context: f"""<|im_start|>system
 You are a legal assistant specializing in Indian law.
 <|im_end|>
 <|im_start|>user
@@ -116,8 +126,10 @@ Answer:
 <|im_end|>
 <|im_start|>assistant
 """
+        packed = ContextPacker(tokenizer, MODEL_CONFIG["max_prompt_tokens"], separator="\n").pack(context_parts, render)
+        print(f"  Prompt: {packed['prompt_tokens']} tokens ({packed['chunks_packed']} chunks packed)")
         
-        inputs = tokenizer(prompt, return_tensors="pt", truncation=True, max_length=1024)
+        inputs = tokenizer(packed["prompt"], return_tensors="pt")
         if device == "cuda":
             inputs = {k: v.to(device) for k, v in inputs.items()}
         
@@ -0,0 +1,61 @@
+"""
+Remote case provider: references the offline index cannot resolve go to the provider
+"""
+
+import json
+import asyncio
+
+import httpx
+import pytest
+
+from config.settings import LEGAL_TOOLS
+from backend.core.case_provider import CaseProviderClient
+from backend.core.case_store import CaseStore
+from backend.core.tools_manager import ToolsManager
+
+KNOWN = "AIR 1978 SC 597"
+# Shares "bihar" with an indexed case, which a name search would return instead
+UNKNOWN = "Hussainara Khatoon v. State of Bihar, (1979) 3 SCC 99"
+
+@pytest.fixture
+def tools(tmp_path, monkeypatch):
+    store = CaseStore(tmp_path / "cases.db")
+    store.import_cases([
+        {"title": "Maneka Gandhi v. Union of India", "citations": [KNOWN]},
+        {"title": "State of Bihar v. Ram Naresh Pandey", "citations": ["AIR 1957 SC 389"]},
+    ])
+    store.close()
+    monkeypatch.setitem(LEGAL_TOOLS, "case_index_path", str(tmp_path / "cases.db"))
+    monkeypatch.setitem(LEGAL_TOOLS, "case_lookup", True)
+
+    queries = []
+    def handler(request: httpx.Request) -> httpx.Response:
+        query = request.url.params["formInput"]
+        queries.append(query)
+        return httpx.Response(200, content=json.dumps({"docs": [{
+            "tid": 4711, "title": "<b>Hussainara Khatoon</b> v. State of Bihar",
+            "docsource": "Supreme Court of India", "publishdate": "1979-03-09",
+        }]}))
+
+    manager = ToolsManager()
+    manager.case_provider = CaseProviderClient("http://provider.test", transport=httpx.MockTransport(handler))
+    return manager, queries
+
+def test_unresolved_citation_goes_to_provider(tools):
+    manager, queries = tools
+
+    async def lookup():
+        try:
+            return await manager.lookup_legal_cases_async([KNOWN, UNKNOWN])
+        finally:
+            await manager.aclose()
+
+    known, unknown = asyncio.run(lookup())
+    assert queries == [UNKNOWN]
+    assert (known["found"], known["source"]) == (True, "Case Law Index")
+    assert (unknown["found"], unknown["source"]) == (True, "Indian Kanoon")
+    assert unknown["cases"][0]["title"] == "Hussainara Khatoon v. State of Bihar"
+
+    # The synchronous path answers from the provider cache without another request
+    assert manager.lookup_legal_case(UNKNOWN)["source"] == "Indian Kanoon"
+    assert queries == [UNKNOWN]
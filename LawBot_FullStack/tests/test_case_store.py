@@ -0,0 +1,29 @@
+"""
+Case store: citations resolve by index, names by full-text match, unknown citations to nothing
+"""
+
+from backend.core.case_store import CaseStore
+
+CASES = [
+    {"title": "Maneka Gandhi v. Union of India", "citations": ["(1978) 1 SCC 248", "AIR 1978 SC 597"],
+     "court": "Supreme Court of India", "date": "25-01-1978"},
+    {"title": "Kesavananda Bharati v. State of Kerala", "citations": ["(1973) 4 SCC 225"],
+     "court": "Supreme Court of India", "date": "24-04-1973"},
+]
+
+def store(tmp_path):
+    cases = CaseStore(tmp_path / "cases.db")
+    cases.import_cases(CASES)
+    return cases
+
+def test_citation_and_name_lookup(tmp_path):
+    cases = store(tmp_path)
+    by_citation, by_name = cases.lookup_many(["AIR 1978 SC 597", "Kesavananda Bharati case"])
+    assert [(case["title"], case["match"]) for case in by_citation] == [("Maneka Gandhi v. Union of India", "citation")]
+    assert [(case["title"], case["match"]) for case in by_name] == [("Kesavananda Bharati v. State of Kerala", "name")]
+
+def test_unknown_citation_does_not_fall_back_to_name_search(tmp_path):
+    cases = store(tmp_path)
+    # The party names alone would match Maneka Gandhi by name
+    assert cases.lookup("(1978) 2 SCC 1") == []
+    assert cases.lookup("Maneka Gandhi, (1979) 3 SCC 99") == []
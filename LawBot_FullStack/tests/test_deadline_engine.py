@@ -0,0 +1,98 @@
+"""
+Deadline engine: bitmap deadlines against numpy's business-day calendar, month clipping and calendar files
+"""
+
+import numpy as np
+import pytest
+
+from backend.core.deadline_engine import CourtCalendar, DeadlineEngine
+from backend.core.tools_manager import ToolsManager
+
+WEEKMASK = "1111110"
+HOLIDAYS = ["2024-01-26", "2024-03-25", "2024-08-15", "2024-10-02", "2024-12-25"]
+VACATION = np.arange(np.datetime64("2024-05-20"), np.datetime64("2024-07-08")).astype(str).tolist()
+
+@pytest.fixture
+def calendar():
+    holidays = [(day, None) for day in HOLIDAYS] + [("2024-05-20", "2024-07-07")]
+    return CourtCalendar.from_holidays(holidays, WEEKMASK, "2023-01-01", "2026-12-31", "test")
+
+def labels(calendar, index):
+    return np.array(calendar.labels(index), dtype="M8[D]")
+
+def test_days_and_court_days_match_busday_offset(calendar):
+    rng = np.random.default_rng(0)
+    starts = np.datetime64("2024-01-01") + rng.integers(0, 366, 500)
+    periods = rng.integers(1, 120, 500)
+    busdays = {"weekmask": WEEKMASK, "holidays": HOLIDAYS + VACATION}
+
+    deadline, nominal = calendar.deadlines(starts, periods, "days")
+    np.testing.assert_array_equal(labels(calendar, nominal), starts + periods)
+    np.testing.assert_array_equal(labels(calendar, deadline),
+                                  np.busday_offset(starts + periods, 0, roll="forward", **busdays))
+
+    # The n-th open day after start: rolling a closed start back first counts from the last open day
+    deadline, _ = calendar.deadlines(starts, periods, "court_days")
+    np.testing.assert_array_equal(labels(calendar, deadline),
+                                  np.busday_offset(starts, periods, roll="backward", **busdays))
+
+@pytest.mark.parametrize("start, period, unit, nominal, deadline", [
+    ("2024-01-31", 1, "months", "2024-02-29", "2024-02-29"),   # clipped to the leap day
+    ("2023-01-31", 1, "months", "2023-02-28", "2023-02-28"),
+    ("2024-03-31", 1, "months", "2024-04-30", "2024-04-30"),
+    ("2024-01-15", 3, "months", "2024-04-15", "2024-04-15"),
+    ("2024-03-31", 3, "months", "2024-06-30", "2024-07-08"),   # Sunday in the vacation
+    ("2024-02-29", 1, "years", "2025-02-28", "2025-02-28"),
+    ("2023-12-26", 1, "years", "2024-12-26", "2024-12-26"),
+])
+def test_month_end_clipping(calendar, start, period, unit, nominal, deadline):
+    deadlines, nominals = calendar.deadlines(np.array([start], dtype="M8[D]"), np.array([period]), unit)
+    assert (calendar.labels(nominals), calendar.labels(deadlines)) == ([nominal], [deadline])
+
+def test_holiday_calendar_file(tmp_path):
+    (tmp_path / "delhi.txt").write_text(
+        "# Delhi High Court\n"
+        "weekmask 1111110\n"
+        "2024-01-26  Republic Day\n"
+        "2024-05-20..2024-05-24  Vacation  # summer\n"
+    )
+    engine = DeadlineEngine(tmp_path, weekmask="1111100", range_start="2024-01-01", range_end="2024-12-31")
+
+    result = engine.compute(["2024-01-25", "2024-05-17", "2024-05-17"], [1, 3, 1], court="delhi")
+    assert result["court"] == "delhi"
+    # Saturdays are open in this court (its weekmask overrides the default)
+    assert result["deadlines"] == ["2024-01-27", "2024-05-25", "2024-05-18"]
+    assert result["rolled_forward"] == [True, True, False]
+    assert engine.compute(["2024-05-17"], [1], unit="court_days", court="delhi")["deadlines"] == ["2024-05-18"]
+
+    # Compiled bitmaps give the same answers
+    engine.calendar("delhi").save(tmp_path / "delhi_compiled.npz")
+    assert engine.compute(["2024-01-25", "2024-05-17"], [1, 3], court="delhi_compiled")["deadlines"] == \
+        ["2024-01-27", "2024-05-25"]
+
+    (tmp_path / "bad.txt").write_text("26 January 2024\n")
+    with pytest.raises(ValueError, match="bad.txt:1"):
+        engine.calendar("bad")
+    with pytest.raises(ValueError, match="No calendar"):
+        engine.calendar("bombay")
+
+def test_range_end_errors(tmp_path):
+    (tmp_path / "closed.txt").write_text("2024-12-20..2024-12-31\n")
+    engine = DeadlineEngine(tmp_path, range_start="2024-01-01", range_end="2024-12-31")
+    for unit, period in (("days", 30), ("court_days", 30), ("months", 1), ("years", 1)):
+        with pytest.raises(ValueError, match="after 2024-12-31|No open court day"):
+            engine.compute(["2024-12-16"], [period], unit=unit, court="closed")
+    with pytest.raises(ValueError, match="No open court day"):
+        engine.compute(["2024-12-16"], [5], court="closed")
+    with pytest.raises(ValueError, match="must fall between"):
+        engine.compute(["2023-12-31"], [1])
+    with pytest.raises(ValueError, match="negative"):
+        engine.compute(["2024-01-01"], [-1])
+    with pytest.raises(ValueError, match="same length"):
+        engine.compute(["2024-01-01", "2024-01-02"], [1, 2, 3])
+
+@pytest.mark.parametrize("period", [10 ** 20, 2 ** 62, 10 ** 9])
+def test_out_of_range_periods_are_rejected(period):
+    for unit in ("days", "court_days", "months", "years"):
+        result = ToolsManager().calculate_deadlines(["2024-01-01"], [period], unit=unit)
+        assert not result["success"] and result["error"].startswith("Invalid deadline request")
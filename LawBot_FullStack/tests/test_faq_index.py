@@ -0,0 +1,39 @@
+"""
+FAQ index: conflicting corpus answers are left out, and numbers must match for a semantic hit
+"""
+
+import json
+
+import numpy as np
+import pytest
+
+pytest.importorskip("faiss")
+
+from backend.core.faq_index import FAQIndex
+from scripts.build_faq_index import load_faq
+
+def test_load_faq_leaves_out_conflicting_answers(tmp_path):
+    source = tmp_path / "faq.jsonl"
+    rows = [
+        ("What is bail?", "Release pending trial.", "CrPC"),
+        ("what is bail", "Release  pending trial.", "CrPC"),        # same answer, kept once
+        ("Can an ordinance be withdrawn?", "Yes, under Article 123.", "Constitution"),
+        ("can an ordinance be withdrawn", "Yes, under Article 213.", "Constitution"),
+    ]
+    source.write_text("".join(json.dumps({"instruction": q, "output": a, "source": s}) + "\n" for q, a, s in rows))
+
+    questions, answers, sources, conflicting = load_faq(source)
+    assert (questions, answers, sources) == (["What is bail?"], ["Release pending trial."], ["CrPC"])
+    assert conflicting == ["Can an ordinance be withdrawn?"]
+
+def test_semantic_match_requires_same_numbers(tmp_path):
+    questions = ["What does section 438 pertain to?", "What is bail?"]
+    embeddings = np.array([[1.0, 0.0, 0.0], [0.0, 1.0, 0.0]], dtype="float32")
+    FAQIndex.write(tmp_path, questions, ["Anticipatory bail.", "Release."], ["CrPC", "CrPC"], embeddings, "test")
+    index = FAQIndex(tmp_path, max_distance=0.05)
+
+    # Within max_distance of the stored question either way; only the numbers differ
+    nearby = np.array([0.999, 0.04, 0.0], dtype="float32")
+    assert index.match("Which provision is section 438 about?", nearby)["answer"] == "Anticipatory bail."
+    assert index.match("What does section 437 pertain to?", nearby) is None
+    assert index.match("what does Section 438 pertain to", None)["match"] == "exact"
@@ -0,0 +1,119 @@
+"""
+Vectorstore builds: incremental add/remove keeps index ids and chunk store in step
+"""
+
+import hashlib
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+faiss = pytest.importorskip("faiss")
+pytest.importorskip("sentence_transformers")
+
+from backend.core.chunk_store import ChunkStore
+from backend.core.index_factory import supports_removal
+from scripts import populate_vectorstore as populate
+
+DIMENSION = 16
+
+class HashEncoder:
+    """Deterministic stand-in for the sentence-transformers model: one pseudo-random vector per text"""
+    max_seq_length = 256
+
+    @staticmethod
+    def tokenizer(texts, **kwargs):
+        return {"input_ids": [text.split() for text in texts]}
+
+    @staticmethod
+    def embed(text):
+        seed = int(hashlib.sha256(text.encode("utf-8")).hexdigest()[:8], 16)
+        return np.random.default_rng(seed).standard_normal(DIMENSION).astype("float32")
+
+    def encode(self, texts, **kwargs):
+        return np.stack([self.embed(text) for text in texts])
+
+def document(question, answer, source="IPC"):
+    text = f"Question: {question}\nAnswer: {answer}\nSource: {source}"
+    return {"text": text, "source": source, "metadata": {"source": source}}
+
+DOCUMENTS = [
+    document("What is IPC Section 302?", "Punishment for murder. " * 60),  # several chunks
+    document("What is bail?", "Release of an accused pending trial."),
+    document("What is an FIR?", "First information report.", "CrPC"),
+]
+
+def full_build(documents):
+    chunks, metadata_list, chunk_doc_index = populate.chunk_documents(documents)
+    chunk_ids = np.arange(len(chunks), dtype="int64")
+    embeddings, _ = populate.generate_embeddings(chunks, use_cache=False, embedding_model=HashEncoder())
+    index = populate.create_faiss_index(embeddings, ids=chunk_ids)
+    manifest = populate.build_manifest(documents, chunk_doc_index, chunk_ids, populate.chunking_settings())
+    populate.save_vectorstore(index, chunks, metadata_list, embeddings.shape[1], manifest)
+
+def stored(vectorstore_dir):
+    """chunk id -> text, checked against the vector the index holds for that id"""
+    index = faiss.read_index(str(vectorstore_dir / "faiss_index.idx"))
+    store = ChunkStore(vectorstore_dir / populate.CHUNK_STORE_FILE)
+    texts = {int(chunk_id): store.text_at(row) for row, chunk_id in enumerate(store.ids().tolist())}
+    store.close()
+    assert index.ntotal == len(texts)
+    for chunk_id, text in texts.items():
+        np.testing.assert_allclose(index.reconstruct(chunk_id), HashEncoder.embed(text), rtol=1e-6)
+    return index, texts
+
+@pytest.fixture
+def vectorstore_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(populate, "VECTORSTORE_DIR", tmp_path)
+    monkeypatch.setitem(populate.RAG_CONFIG, "index_type", "flat")
+    return tmp_path
+
+def test_incremental_add_and_remove(vectorstore_dir):
+    full_build(DOCUMENTS)
+    index, before = stored(vectorstore_dir)
+    assert isinstance(index, faiss.IndexIDMap2) and supports_removal(index)
+
+    # Drop one document, change one, add one
+    documents = [DOCUMENTS[0], document("What is bail?", "Release on security pending trial."),
+                 document("What is a summons?", "A court order to appear.", "CrPC")]
+    assert populate.incremental_update(documents, use_cache=False, embedding_model=HashEncoder())
+
+    _, after = stored(vectorstore_dir)
+    unchanged = {chunk_id: text for chunk_id, text in before.items() if "Section 302" in text or "murder" in text}
+    assert {chunk_id: after[chunk_id] for chunk_id in unchanged} == unchanged
+    assert not any("First information report" in text or "Release of an accused" in text for text in after.values())
+    assert min(set(after) - set(unchanged)) > max(before)  # new chunks get fresh ids
+    # Same chunks as a full build of the new documents
+    chunks, _, _ = populate.chunk_documents(documents)
+    assert sorted(after.values()) == sorted(chunks)
+
+    # Searching a chunk's own vector finds its id
+    index = faiss.read_index(str(vectorstore_dir / "faiss_index.idx"))
+    for chunk_id, text in after.items():
+        _, ids = index.search(HashEncoder.embed(text)[None, :], 1)
+        assert ids[0, 0] == chunk_id
+
+def test_interrupted_swap_is_completed(vectorstore_dir, monkeypatch):
+    full_build(DOCUMENTS[:1])
+    _, old = stored(vectorstore_dir)
+
+    # Crash after the index and chunk store have been swapped in
+    real_replace, moves = populate.os.replace, []
+    def crashing_replace(source, target):
+        if str(source).endswith(".staged"):
+            if len(moves) == 2:
+                raise KeyboardInterrupt
+            moves.append(target)
+        real_replace(source, target)
+    monkeypatch.setattr(populate.os, "replace", crashing_replace)
+    with pytest.raises(KeyboardInterrupt):
+        full_build(DOCUMENTS)
+    monkeypatch.setattr(populate.os, "replace", real_replace)
+
+    assert populate.finish_pending_swap()
+    assert not populate.finish_pending_swap()
+    assert not list(vectorstore_dir.glob("*.staged"))
+    _, new = stored(vectorstore_dir)
+    assert len(new) > len(old)
+    assert populate.incremental_update(DOCUMENTS, use_cache=False, embedding_model=HashEncoder())
+    assert stored(vectorstore_dir)[1] == new  # the manifest matches the swapped-in index
@@ -0,0 +1,35 @@
+"""
+Precision handling: int8 dynamic quantization must work with the LoRA adapter attached
+"""
+
+import pytest
+
+torch = pytest.importorskip("torch")
+transformers = pytest.importorskip("transformers")
+peft = pytest.importorskip("peft")
+
+from backend.core.precision import apply_precision
+
+def lora_model():
+    torch.manual_seed(0)
+    config = transformers.Qwen2Config(
+        vocab_size=64, hidden_size=32, intermediate_size=64, num_hidden_layers=2,
+        num_attention_heads=4, num_key_value_heads=2, max_position_embeddings=128,
+    )
+    base = transformers.Qwen2ForCausalLM(config).eval()
+    lora = peft.LoraConfig(r=4, lora_alpha=8, target_modules=["q_proj", "v_proj"], init_lora_weights=False)
+    return peft.get_peft_model(base, lora).eval()
+
+def test_int8_with_lora_adapter():
+    model = lora_model()
+    input_ids = torch.tensor([[5, 9, 14, 3, 22, 7]])
+    with torch.no_grad():
+        expected = model(input_ids=input_ids).logits
+
+    quantized = apply_precision(model, "int8")
+    with torch.no_grad():
+        logits = quantized(input_ids=input_ids).logits
+
+    # The adapter's contribution is kept (merged), up to int8 rounding
+    assert torch.allclose(logits, expected, atol=0.05)
+    assert not any("lora_" in name for name, _ in quantized.named_modules())
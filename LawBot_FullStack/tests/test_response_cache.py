@@ -0,0 +1,22 @@
+"""
+Response cache: the semantic tier never serves an answer about different numbers
+"""
+
+import numpy as np
+
+from backend.core.response_cache import ResponseCache, numeric_tokens
+
+def test_numeric_tokens():
+    assert numeric_tokens("Is Section 498A IPC (2023 amendment) bailable?") == {"498a", "2023"}
+    assert numeric_tokens("What is bail?") == frozenset()
+
+def test_semantic_hit_requires_same_numbers():
+    cache = ResponseCache(max_distance=0.05)
+    cache.put("What does section 438 pertain to?", np.array([1.0, 0.0]), {"response": "438"})
+    cache.put("What does section 437 pertain to?", np.array([0.999, 0.045]), {"response": "437"})
+
+    nearby = np.array([0.9995, 0.03])
+    assert cache.get_semantic("Which provision is section 438 about?", nearby)["response"] == "438"
+    assert cache.get_semantic("Which provision is section 437 about?", nearby)["response"] == "437"
+    assert cache.get_semantic("Which provision is section 439 about?", nearby) is None
+    assert cache.get_stats()["semantic_hits"] == 2
@@ -0,0 +1,49 @@
+"""
+Prompt-lookup decoding at temperature 0 must reproduce greedy generate(), with and without a cached prefix
+"""
+
+from types import SimpleNamespace
+
+import pytest
+
+torch = pytest.importorskip("torch")
+pytest.importorskip("transformers")
+
+from backend.core.batch_scheduler import to_legacy_cache
+from backend.core.prefix_cache import PrefixEntry
+from backend.core.speculative import PromptLookupDecoder, find_draft
+
+EOS = 62
+MAX_NEW_TOKENS = 24
+# Repeated spans give the n-gram lookup something to draft from
+PROMPT = [5, 9, 14, 3, 22, 7, 5, 9, 14, 3, 22, 7, 5, 9]
+
+@pytest.fixture
+def decoder(model):
+    tokenizer = SimpleNamespace(eos_token_id=EOS, pad_token_id=0)
+    return PromptLookupDecoder(model, tokenizer, "cpu", temperature=0.0)
+
+def greedy(model, input_ids):
+    """Greedy generate() continuation, up to and including EOS"""
+    with torch.no_grad():
+        output = model.generate(
+            torch.tensor([input_ids]), attention_mask=torch.ones(1, len(input_ids), dtype=torch.long),
+            max_new_tokens=MAX_NEW_TOKENS, do_sample=False, eos_token_id=EOS, pad_token_id=0,
+        )
+    tokens = output[0, len(input_ids):].tolist()
+    return tokens[:tokens.index(EOS) + 1] if EOS in tokens else tokens
+
+def test_find_draft_uses_latest_match():
+    assert find_draft([1, 2, 3, 1, 2, 4, 1, 2], ngram_max=2, ngram_min=1, num_draft=3) == [4, 1, 2]
+    assert find_draft([1, 2, 3], ngram_max=2, ngram_min=1, num_draft=3) == []
+
+def test_matches_greedy_without_prefix(model, decoder):
+    assert decoder.generate(PROMPT, MAX_NEW_TOKENS) == greedy(model, PROMPT)
+    assert decoder.stats["drafted_tokens"] > 0
+
+def test_matches_greedy_with_prefix(model, decoder):
+    prefix_ids = PROMPT[:4]
+    with torch.no_grad():
+        outputs = model(input_ids=torch.tensor([prefix_ids]), use_cache=True)
+    prefix = PrefixEntry("test", prefix_ids, to_legacy_cache(outputs.past_key_values))
+    assert decoder.generate(PROMPT, MAX_NEW_TOKENS, prefix=prefix) == greedy(model, PROMPT)
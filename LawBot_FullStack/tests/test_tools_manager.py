@@ -0,0 +1,73 @@
+"""
+Tool detection: the built-in dictionary (per instance) and imported glossary terms
+"""
+
+import pytest
+
+from config.settings import LEGAL_TOOLS
+from backend.core.glossary_store import GlossaryStore
+from backend.core.tools_manager import ToolsManager
+
+@pytest.fixture
+def glossary_path(tmp_path, monkeypatch):
+    path = tmp_path / "glossary.db"
+    monkeypatch.setitem(LEGAL_TOOLS, "glossary_path", str(path))
+    return path
+
+def legal_terms(tools, query):
+    return [(hit["term"], hit["definition"]) for hit in tools.detect_tool_usage(query)
+            if hit["tool"] == "legal_dictionary"]
+
+def test_detects_glossary_terms(glossary_path):
+    tools = ToolsManager()
+    assert legal_terms(tools, "Can I get anticipatory bail?") == [("bail", LEGAL_TOOLS["dictionary"]["bail"])]
+
+    store = GlossaryStore(glossary_path)
+    store.import_terms([
+        ("Anticipatory Bail", "Bail granted in anticipation of arrest (CrPC Section 438)", "CrPC"),
+        ("Bail", "Release on security pending trial", "Glossary"),
+    ])
+    store.close()
+
+    # The glossary is picked up once it exists and wins over the dictionary's "bail"
+    assert legal_terms(tools, "Can I get anticipatory bail?") == [
+        ("Anticipatory Bail", "Bail granted in anticipation of arrest (CrPC Section 438)"),
+        ("Bail", "Release on security pending trial"),
+    ]
+    assert legal_terms(tools, "Is theft bailable?") == [("theft", LEGAL_TOOLS["dictionary"]["theft"])]
+
+def test_glossary_detect_terms_limit(glossary_path, monkeypatch):
+    store = GlossaryStore(glossary_path)
+    store.import_terms([("res judicata", "A matter already judged", None), ("sub judice", "Under consideration", None)])
+    store.close()
+    monkeypatch.setitem(LEGAL_TOOLS, "glossary_detect_terms", 1)
+
+    tools = ToolsManager()
+    assert [term for term, _ in legal_terms(tools, "Is it res judicata or sub judice?")] == ["res judicata"]
+
+def test_update_dictionary_is_per_instance(glossary_path):
+    tools, other = ToolsManager(), ToolsManager()
+    tools.update_dictionary({"Habeas Corpus": "Writ to produce a detained person"})
+
+    assert [term for term, _ in legal_terms(tools, "Can I file habeas corpus?")] == ["habeas corpus"]
+    assert legal_terms(other, "Can I file habeas corpus?") == []
+    assert "habeas corpus" not in LEGAL_TOOLS["dictionary"]
+
+def test_lookup_falls_back_to_dictionary(glossary_path):
+    store = GlossaryStore(glossary_path)
+    store.import_terms([("res judicata", "A matter already judged", None),
+                        ("theft", "Dishonest taking of movable property", "IPC")])
+    store.close()
+    tools = ToolsManager()
+    tools.update_dictionary({"Habeas Corpus": "Writ to produce a detained person"})
+
+    assert [term for term, _ in legal_terms(tools, "habeas corpus and bail")] == ["habeas corpus", "bail"]
+    for term, definition in (("bail", LEGAL_TOOLS["dictionary"]["bail"]),
+                             ("Habeas  Corpus", "Writ to produce a detained person"),
+                             ("res judicata", "A matter already judged"),
+                             ("theft", "Dishonest taking of movable property")):
+        result = tools.lookup_legal_term(term)
+        assert (result["found"], result["definition"]) == (True, definition)
+    assert tools.lookup_legal_term("bail")["source"] == "Legal Dictionary"
+    assert tools.lookup_legal_term("res judicat")["source"] == "Legal Glossary"  # partial glossary match
+    assert not tools.lookup_legal_term("mandamus")["found"]